@@ -0,0 +1,591 @@
+# benchmarks.py | 대시보드 데이터 경로 성능 측정 스크립트
+# =============================================================================
+# 사용법:
+#   python benchmarks.py cache [CSV 경로 ...]
+#   python benchmarks.py encoding [CSV 경로 ...]
+#   python benchmarks.py numeric [--rows N] [--years K]
+#   python benchmarks.py projection [--copies N]
+#   python benchmarks.py stream [--copies N] [--chunk-size N]
+#   python benchmarks.py sqlite [--copies N] [--threads N]
+#   python benchmarks.py amenity [--copies N]
+#   python benchmarks.py haversine [--max-exp K] [--loop-max N]
+#   python benchmarks.py spatial [--stores N] [--queries N] [--k K] [--radius M]
+#   python benchmarks.py districts [--points N] [--loop-max N] [--source 경로]
+#   python benchmarks.py layers [--source 경로] [--vertices N]
+#
+# 각 하위 명령은 기존 방식과 개선된 방식의 소요 시간을 표로 출력합니다.
+# =============================================================================
+import argparse
+import json
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import boundary_geometry
+import data_loader
+import geo
+import room_amenities
+import room_data
+import room_db
+import safety_data
+import seoul_boundary
+import spatial_index
+from seoul_regions import DISTRICT_NAMES
+
+# 기본 측정 대상 (dashboard.py가 읽는 파일)
+DEFAULT_CSVS = ["data/cctv.csv", "data/police.csv", "data/crime.csv", "data/martdata.csv"]
+ROOM_CSV = "room_data_export.csv"
+
+
+# ---------------------------------------------------------------------
+# [1] 공통 헬퍼
+# ---------------------------------------------------------------------
+def timeit(fn, repeat=5):
+    """fn을 repeat회 실행하여 중앙값 소요 시간(ms)을 반환합니다."""
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(times)
+
+
+def print_table(title, headers, rows):
+    """측정 결과를 고정 폭 표로 출력합니다."""
+    print(f"\n## {title}")
+    widths = [max(len(str(h)), *(len(str(r[i])) for r in rows)) for i, h in enumerate(headers)]
+    print("  ".join(str(h).ljust(w) for h, w in zip(headers, widths)))
+    for r in rows:
+        print("  ".join(str(v).ljust(w) for v, w in zip(r, widths)))
+
+
+# ---------------------------------------------------------------------
+# [2] 하위 명령
+# ---------------------------------------------------------------------
+def bench_cache(args):
+    """CSV 직접 파싱 vs 컬럼형 캐시 콜드/웜 로드를 비교합니다."""
+    paths = [p for p in (args.paths or DEFAULT_CSVS) if Path(p).exists()]
+    if not paths:
+        print("측정할 CSV 파일이 없습니다.")
+        return
+    if data_loader.pa is None:
+        print("pyarrow가 설치되어 있지 않아 캐시를 측정할 수 없습니다.")
+        return
+
+    rows = []
+    for p in paths:
+        baseline = timeit(lambda: data_loader.read_csv_safely(p), args.repeat)
+
+        cache_dir = Path(tempfile.mkdtemp(prefix="columnar-"))
+        try:
+            def cold():
+                shutil.rmtree(cache_dir, ignore_errors=True)
+                data_loader.load_csv_cached(p, cache_dir=cache_dir)
+            cold_ms = timeit(cold, args.repeat)
+            warm_ms = timeit(lambda: data_loader.load_csv_cached(p, cache_dir=cache_dir), args.repeat)
+        finally:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
+        rows.append([p, f"{baseline:.2f}", f"{cold_ms:.2f}", f"{warm_ms:.2f}", f"x{baseline / warm_ms:.1f}"])
+
+    print_table("컬럼형 캐시 (중앙값, ms)", ["파일", "read_csv_safely", "캐시 콜드", "캐시 웜", "웜 개선"], rows)
+
+
+def _read_csv_retry(path, encodings=("utf-8", "cp949", "euc-kr")):
+    """개선 전 read_csv_safely: 인코딩마다 전체 파싱을 재시도합니다."""
+    last_err = None
+    for enc in encodings:
+        try:
+            return pd.read_csv(path, encoding=enc)
+        except Exception as e:
+            last_err = e
+    raise last_err
+
+
+def bench_encoding(args):
+    """파싱 재시도 방식 vs 인코딩 선판별 후 단일 파싱을 비교합니다."""
+    paths = [p for p in (args.paths or DEFAULT_CSVS) if Path(p).exists()]
+    if not paths:
+        print("측정할 CSV 파일이 없습니다.")
+        return
+
+    rows = []
+    for p in paths:
+        legacy = timeit(lambda: _read_csv_retry(p), args.repeat)
+        data_loader._ENCODING_CACHE.clear()
+        first = timeit(lambda: data_loader.read_csv_safely(p), 1)
+        cached = timeit(lambda: data_loader.read_csv_safely(p), args.repeat)
+        enc = data_loader.detect_encoding(p)
+        rows.append([p, enc, f"{legacy:.2f}", f"{first:.2f}", f"{cached:.2f}", f"x{legacy / cached:.1f}"])
+
+    print_table(
+        "인코딩 판별 (중앙값, ms)",
+        ["파일", "인코딩", "재시도 방식", "판별(첫 호출)", "판별(캐시)", "개선"], rows,
+    )
+
+
+def _to_numeric_df_regex(df, cols):
+    """개선 전 to_numeric_df: 전체 복사 + 정규식 치환 + 컬럼별 to_numeric."""
+    out = df.copy()
+    out[cols] = out[cols].replace({",": ""}, regex=True)
+    for c in cols:
+        out[c] = pd.to_numeric(out[c], errors="coerce")
+    return out
+
+
+def make_district_table(rows, years, seed=0):
+    """'구분' + 'YYYY년' 컬럼에 '1,234' 형식 문자열이 들어간 합성 구별 표를 만듭니다."""
+    rng = np.random.default_rng(seed)
+    gu = np.array([f"{i:02d}구" for i in range(25)], dtype=object)
+    data = {"구분": gu[rng.integers(0, len(gu), rows)]}
+    for y in range(years):
+        v = pd.Series(rng.integers(0, 200_000, rows))
+        grouped = (v // 1000).astype(str) + "," + (v % 1000).astype(str).str.zfill(3)
+        data[f"{2016 + y}년"] = grouped.where(v >= 1000, v.astype(str))
+    return pd.DataFrame(data)
+
+
+def bench_numeric(args):
+    """쉼표 천 단위 숫자 변환: 정규식 치환 vs 문자열 커널 vs 읽기 시점 파싱."""
+    df = make_district_table(args.rows, args.years)
+    year_cols = [c for c in df.columns if c.endswith("년")]
+
+    regex_ms = timeit(lambda: _to_numeric_df_regex(df, year_cols), args.repeat)
+    kernel_ms = timeit(lambda: safety_data.to_numeric_df(df, year_cols), args.repeat)
+
+    fd, path = tempfile.mkstemp(suffix=".csv")
+    os.close(fd)
+    try:
+        df.to_csv(path, index=False)
+        read_regex_ms = timeit(
+            lambda: _to_numeric_df_regex(pd.read_csv(path), year_cols), args.repeat
+        )
+        read_thousands_ms = timeit(lambda: pd.read_csv(path, thousands=","), args.repeat)
+    finally:
+        os.remove(path)
+
+    rows = [
+        ["변환만", "정규식 치환(기존)", f"{regex_ms:.1f}", "x1.0"],
+        ["변환만", "parse_thousands 커널", f"{kernel_ms:.1f}", f"x{regex_ms / kernel_ms:.1f}"],
+        ["읽기+변환", "read_csv + 정규식 치환(기존)", f"{read_regex_ms:.1f}", "x1.0"],
+        ["읽기+변환", "read_csv(thousands=',')", f"{read_thousands_ms:.1f}", f"x{read_regex_ms / read_thousands_ms:.1f}"],
+    ]
+    print_table(f"천 단위 숫자 변환 ({args.rows:,}행 x {args.years}개 연도, 중앙값, ms)",
+                ["구간", "방식", "소요(ms)", "개선"], rows)
+
+
+def make_room_sqlite(path, copies):
+    """room_data_export.csv를 copies배로 복제해 SQLite 'room' 테이블로 저장합니다."""
+    room = pd.read_csv(ROOM_CSV)
+    with sqlite3.connect(path) as conn:
+        pd.concat([room] * copies, ignore_index=True).to_sql("room", conn, index=False)
+        room_db.create_room_indexes(conn)
+
+
+def _rent_summary_pandas(df):
+    """개선 전 tab_rent: 전체 테이블을 받은 뒤 pandas에서 필터/집계합니다."""
+    df = df.copy()
+    df["building_type"] = df["building_type"].fillna("unknown")
+    bt = df[["building_type", "rent"]].dropna()
+    bt = bt[~bt["building_type"].astype(str).str.strip().str.contains(
+        r"^(?:unknown|다가구\s*\(미등기\)|빌라\s*\(미등기\))$", na=False, regex=True)]
+    return bt.groupby("building_type")["rent"].agg(["mean", "median", "count"]).reset_index()
+
+
+def bench_projection(args):
+    """가격 탭: SELECT * + pandas 집계 vs 컬럼 투영 / SQL 집계 pushdown."""
+    if not Path(ROOM_CSV).exists():
+        print(f"{ROOM_CSV} 파일이 없습니다.")
+        return
+
+    fd, path = tempfile.mkstemp(suffix=".sqlite")
+    os.close(fd)
+    try:
+        make_room_sqlite(path, args.copies)
+
+        def fetch(q):
+            # 캐시 효과를 빼고 전송 + DataFrame 생성 비용만 측정
+            conn = sqlite3.connect(path)
+            try:
+                return room_db.RoomDB(lambda: conn, pool_size=1).query(*q)
+            finally:
+                conn.close()
+
+        table_cols = fetch(("SELECT * FROM room LIMIT 0", ())).columns
+        queries = [
+            ("산점도 (전체 컬럼)", ("SELECT * FROM room", ()), None),
+            ("산점도 (x/y/색상 투영)",
+             room_data.price_query(["exclusive_area", "rent", "building_type"], table_cols).build(), None),
+            ("건물유형 요약 (SELECT * + pandas)", ("SELECT * FROM room", ()), _rent_summary_pandas),
+            ("건물유형 요약 (SQL 집계)", room_data.rent_summary_query().build(), None),
+        ]
+        rows = []
+        for label, q, post in queries:
+            def run(q=q, post=post):
+                df = fetch(q)
+                return post(df) if post else df
+            ms = timeit(run, args.repeat)
+            df = fetch(q)
+            rows.append([label, f"{len(df):,}", df.shape[1], f"{df.memory_usage(deep=True).sum() / 1e6:,.2f}", f"{ms:.1f}"])
+    finally:
+        os.remove(path)
+
+    print_table(f"가격 탭 쿼리 ({args.copies}배 복제 room 테이블, 중앙값)",
+                ["쿼리", "행", "열", "메모리(MB)", "소요(ms)"], rows)
+
+
+def _peak_mb(fn):
+    """fn 실행 중 Python 힙 최대 사용량(MB)과 결과를 반환합니다."""
+    tracemalloc.start()
+    try:
+        result = fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1e6, result
+
+
+def bench_stream(args):
+    """전체 fetchall(object 컬럼) vs 청크 스트리밍 + 작은 dtype 변환."""
+    if not Path(ROOM_CSV).exists():
+        print(f"{ROOM_CSV} 파일이 없습니다.")
+        return
+
+    fd, path = tempfile.mkstemp(suffix=".sqlite")
+    os.close(fd)
+    try:
+        make_room_sqlite(path, args.copies)
+        db = room_db.RoomDB(lambda: sqlite3.connect(path, check_same_thread=False), pool_size=1)
+        sql = "SELECT * FROM room"
+        variants = [
+            ("fetchall (기존)", lambda: db.query(sql, use_cache=False)),
+            (f"read_chunked ({args.chunk_size:,}행)", lambda: db.read_chunked(sql, chunk_size=args.chunk_size)),
+        ]
+        rows = []
+        for label, fn in variants:
+            ms = timeit(fn, args.repeat)
+            peak, df = _peak_mb(fn)
+            final = df.memory_usage(deep=True).sum() / 1e6
+            rows.append([label, f"{len(df):,}", f"{final:,.1f}", f"{peak:,.1f}", f"{ms:.1f}"])
+    finally:
+        os.remove(path)
+
+    print_table(f"room 테이블 읽기 ({args.copies}배 복제, 중앙값)",
+                ["방식", "행", "최종(MB)", "Python 힙 최대(MB)", "소요(ms)"], rows)
+
+
+def bench_sqlite(args):
+    """SQLite 백엔드: CSV로 DB 생성(콜드/재사용) + 가격 탭 쿼리 동시 부하."""
+    if not Path(ROOM_CSV).exists():
+        print(f"{ROOM_CSV} 파일이 없습니다.")
+        return
+
+    tmp_dir = Path(tempfile.mkdtemp(prefix="roomdb-"))
+    try:
+        csv_path, db_path = tmp_dir / "room.csv", tmp_dir / "room.sqlite"
+        room = pd.read_csv(ROOM_CSV)
+        pd.concat([room] * args.copies, ignore_index=True).to_csv(csv_path, index=False)
+
+        build_ms = timeit(lambda: room_db.build_room_sqlite(csv_path, db_path, force=True), 1)
+        reuse_ms = timeit(lambda: room_db.build_room_sqlite(csv_path, db_path), args.repeat)
+        db = room_db.open_room_db("sqlite", csv_path=csv_path, db_path=db_path)
+
+        queries = {
+            "투영 (x/y/색상)": room_data.price_query(
+                ["exclusive_area", "rent", "building_type"], db.columns()).build(),
+            "건물유형 요약 (SQL 집계)": room_data.rent_summary_query().build(),
+            "월세 구간 + 거래유형 (인덱스)": room_db.RoomQuery().select("id", "rent", "deposit")
+                .where("transaction_type = ?", "월세").where("rent BETWEEN ? AND ?", 400_000, 600_000).build(),
+        }
+        rows = []
+        for label, (sql, params) in queries.items():
+            single = timeit(lambda: db.query(sql, params, use_cache=False), args.repeat)
+            n_req = args.threads * 10
+            t0 = time.perf_counter()
+            with ThreadPoolExecutor(args.threads) as ex:
+                list(ex.map(lambda _: db.query(sql, params, use_cache=False), range(n_req)))
+            qps = n_req / (time.perf_counter() - t0)
+            rows.append([label, f"{single:.1f}", f"{qps:,.0f}"])
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    print(f"DB 생성 {build_ms:,.0f} ms · 재사용 확인 {reuse_ms:,.1f} ms ({len(room) * args.copies:,}행)")
+    print_table(f"SQLite 백엔드 쿼리 (캐시 없음, {args.threads}스레드 부하)",
+                ["쿼리", "단건(ms)", "처리량(q/s)"], rows)
+
+
+def bench_amenity(args):
+    """편의시설 다중 옵션 필터: 문자열 부분 검색 vs uint64 비트마스크 AND."""
+    if not Path(ROOM_CSV).exists():
+        print(f"{ROOM_CSV} 파일이 없습니다.")
+        return
+
+    room = pd.concat([pd.read_csv(ROOM_CSV)] * args.copies, ignore_index=True)
+    fields = [f for f in room_amenities.AMENITY_FIELDS if f in room.columns]
+    wanted = ["에어컨", "냉장고", "세탁기", "CCTV"]
+
+    def substring():
+        cols = [room[f].fillna("") for f in fields]
+        text = cols[0].str.cat(cols[1:], sep=", ")
+        ok = pd.Series(True, index=room.index)
+        for w in wanted:
+            ok &= text.str.contains(w, regex=False)
+        return ok.to_numpy()
+
+    encode_ms = timeit(lambda: room_amenities.encode_amenities(room), args.repeat)
+    masks = room_amenities.encode_amenities(room)["amenity_mask"].to_numpy()
+    assert (substring() == room_amenities.filter_amenities(masks, wanted)).all()
+
+    rows = [
+        ["인코딩 (1회)", f"{encode_ms:.1f}"],
+        ["필터: 문자열 부분 검색", f"{timeit(substring, args.repeat):.1f}"],
+        ["필터: 비트마스크 AND", f"{timeit(lambda: room_amenities.filter_amenities(masks, wanted), args.repeat):.3f}"],
+        ["옵션별 개수 (popcount)", f"{timeit(lambda: room_amenities.facet_counts(masks), args.repeat):.2f}"],
+    ]
+    print_table(f"편의시설 필터 {wanted} ({len(room):,}행, 중앙값)", ["구간", "소요(ms)"], rows)
+
+
+def _nearest_iterrows(df, lat, lon):
+    """기존 거리 페이지 방식: iterrows + math 모듈 haversine으로 최단 점포 찾기."""
+    def haversine(lat1, lon1, lat2, lon2):
+        lat1, lon1, lat2, lon2 = map(math.radians, [lat1, lon1, lat2, lon2])
+        a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+        return 2 * geo.EARTH_RADIUS_M * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+    closest, best = None, float("inf")
+    for _, row in df.iterrows():
+        d = haversine(lat, lon, row["latitude"], row["longitude"])
+        if d < best:
+            best, closest = d, row
+    return closest, best
+
+
+def bench_haversine(args):
+    """최단 마트 찾기: iterrows + 스칼라 haversine vs 벡터화 haversine + argmin (점포 10^2 ~ 10^K개)."""
+    rng = np.random.default_rng(0)
+    lat, lon = 37.518658826456, 126.90620617355
+    rows = []
+    for exp in range(2, args.max_exp + 1):
+        n = 10 ** exp
+        stores = pd.DataFrame({
+            "latitude": rng.uniform(37.42, 37.70, n),
+            "longitude": rng.uniform(126.76, 127.18, n),
+        })
+        lats, lons = stores["latitude"].to_numpy(), stores["longitude"].to_numpy()
+        repeat = args.repeat if n <= 1_000_000 else 1
+        vec_ms = timeit(lambda: geo.nearest(lat, lon, lats, lons), repeat)
+        pos, best, _ = geo.nearest(lat, lon, lats, lons)
+        if n <= args.loop_max:
+            loop_ms = timeit(lambda: _nearest_iterrows(stores, lat, lon), 1)
+            closest, loop_best = _nearest_iterrows(stores, lat, lon)
+            assert closest.name == pos and abs(loop_best - best) < 1e-6
+            rows.append([f"{n:,}", f"{loop_ms:.1f}", f"{vec_ms:.3f}", f"{loop_ms / vec_ms:,.0f}x"])
+        else:
+            rows.append([f"{n:,}", "-", f"{vec_ms:.3f}", "-"])
+    print_table("최단 마트 찾기 (중앙값)", ["점포 수", "iterrows(ms)", "벡터화(ms)", "배수"], rows)
+
+
+def bench_spatial(args):
+    """k-최근접 / 반경 질의: 전체 점포 거리 계산(brute force) vs 격자 공간 인덱스."""
+    rng = np.random.default_rng(0)
+    lats, lons = rng.uniform(37.42, 37.70, args.stores), rng.uniform(126.76, 127.18, args.stores)
+    qlats, qlons = rng.uniform(37.42, 37.70, args.queries), rng.uniform(126.76, 127.18, args.queries)
+    lat, lon = qlats[0], qlons[0]
+
+    def brute_knn():
+        d = geo.haversine_m(lat, lon, lats, lons)
+        return np.argsort(d)[:args.k]
+
+    def brute_radius():
+        return np.flatnonzero(geo.haversine_m(lat, lon, lats, lons) <= args.radius)
+
+    def brute_batch():
+        return [np.argsort(geo.haversine_m(a, b, lats, lons))[:args.k] for a, b in zip(qlats, qlons)]
+
+    build_ms = timeit(lambda: spatial_index.SpatialIndex(lats, lons), args.repeat)
+    index = spatial_index.SpatialIndex(lats, lons)
+    assert (index.knearest(lat, lon, args.k)[0] == brute_knn()).all()
+    assert set(index.query_radius(lat, lon, args.radius)[0]) == set(brute_radius())
+
+    rows = [
+        ["인덱스 생성", "-", f"{build_ms:.1f}"],
+        [f"k-최근접 (k={args.k}, 질의 1개)", f"{timeit(brute_knn, args.repeat):.3f}",
+         f"{timeit(lambda: index.knearest(lat, lon, args.k), args.repeat):.3f}"],
+        [f"반경 {args.radius:,.0f}m (질의 1개)", f"{timeit(brute_radius, args.repeat):.3f}",
+         f"{timeit(lambda: index.query_radius(lat, lon, args.radius), args.repeat):.3f}"],
+        [f"k-최근접 (질의 {args.queries:,}개)", f"{timeit(brute_batch, 1):.1f}",
+         f"{timeit(lambda: index.knearest_many(qlats, qlons, args.k), args.repeat):.1f}"],
+    ]
+    print_table(f"공간 질의 (점포 {args.stores:,}개, 중앙값)", ["질의", "brute force(ms)", "인덱스(ms)"], rows)
+
+
+def synthetic_boundary(vertices=400, seed=0):
+    """서울 범위를 5x5 칸으로 나눠 변을 구불구불하게 만든 25개 자치구 경계 (경계 파일이 없을 때 대체용)."""
+    rng = np.random.default_rng(seed)
+    xs, ys = np.linspace(126.76, 127.18, 6), np.linspace(37.42, 37.70, 6)
+    n = vertices // 4
+    # 이웃 칸이 같은 변을 공유하도록 칸 모서리 격자점만 흔들고, 변은 두 점 사이를 사인파로 이음
+    gx, gy = np.meshgrid(xs, ys, indexing="ij")
+    gx[1:-1, 1:-1] += rng.uniform(-0.01, 0.01, (4, 4))
+    gy[1:-1, 1:-1] += rng.uniform(-0.01, 0.01, (4, 4))
+
+    def edge(a, b):
+        t = np.linspace(0, 1, n + 1)[:, None]
+        d = b - a
+        wave = 0.003 * np.sin(np.pi * 3 * t) * np.sin(1000 * (a + b).sum())
+        return a + d * t + wave * np.array([-d[1], d[0]]) / np.hypot(*d)
+
+    features = []
+    for k in range(25):
+        i, j = divmod(k, 5)
+        c = [np.array([gx[a, b], gy[a, b]]) for a, b in [(i, j), (i + 1, j), (i + 1, j + 1), (i, j + 1)]]
+        # 변은 항상 격자 번호가 작은 쪽에서 만들고(이웃과 같은 점), 위/왼쪽 변은 뒤집어 붙임
+        sides = [edge(c[0], c[1]), edge(c[1], c[2]), edge(c[3], c[2])[::-1], edge(c[0], c[3])[::-1]]
+        ring = np.concatenate([e[:-1] for e in sides])
+        ring = np.vstack([ring, ring[:1]])
+        features.append({
+            "type": "Feature", "properties": {"name": DISTRICT_NAMES[k]},
+            "geometry": {"type": "Polygon", "coordinates": [ring.tolist()]},
+        })
+    raw = json.dumps({"type": "FeatureCollection", "features": features}).encode()
+    return seoul_boundary._parse(raw, "synthetic")
+
+
+def load_bench_boundary(path, vertices=400):
+    """--source의 동봉 파일 / 캐시 경계를 쓰고, 없으면(오프라인) 합성 경계(자치구당 꼭짓점 vertices개)를 씁니다."""
+    try:
+        source = data_loader.open_source(path) if path else None
+        return seoul_boundary.load_boundary(source, timeout=3)
+    except OSError:
+        return synthetic_boundary(vertices)
+
+
+def bench_districts(args):
+    """매물 자치구 배정: 점마다 모든 경계를 검사하는 반복문 vs bbox 선별 + 위도 정렬 ray casting 일괄 판정."""
+    boundary = load_bench_boundary(args.source)
+    rings = [(flat, bbox) for flat, bbox in boundary_geometry._feature_rings(boundary)]
+    rng = np.random.default_rng(0)
+    lats, lons = rng.uniform(37.42, 37.70, args.points), rng.uniform(126.76, 127.18, args.points)
+
+    def loop(n):
+        out = np.full(n, -1)
+        for q in range(n):
+            for pos, (flat, _) in enumerate(rings):
+                if flat and boundary_geometry._point_in_rings(lons[q], lats[q], flat):
+                    out[q] = pos
+                    break
+        return out
+
+    m = min(args.loop_max, args.points)
+    batch = boundary_geometry.assign_features(lats, lons, boundary)
+    assert (batch[:m] == loop(m)).all()
+    loop_ms = timeit(lambda: loop(m), 1) * args.points / m
+    batch_ms = timeit(lambda: boundary_geometry.assign_features(lats, lons, boundary), args.repeat)
+    edges = sum(len(r) for flat, _ in rings for r in flat)
+    rows = [
+        [f"점마다 반복 (x{m:,}개 측정 후 환산)", f"{loop_ms:,.0f}"],
+        ["bbox + ray casting 일괄", f"{batch_ms:,.1f}"],
+        ["배수", f"{loop_ms / batch_ms:,.0f}x"],
+    ]
+    title = f"자치구 배정 (점 {args.points:,}개, 경계 {boundary.origin} 변 {edges:,}개, 배정 {(batch >= 0).mean():.1%})"
+    print_table(title, ["방식", "ms"], rows)
+
+
+def bench_layers(args):
+    """히트맵 경계 레이어: 원본 GeoJSON 매번 직렬화 vs 단순화 단계별 크기 / 캐시된 레이어 조회."""
+    boundary = load_bench_boundary(args.source, args.vertices)
+    full_text = json.dumps(boundary.geojson, ensure_ascii=False)
+    full_ms = timeit(lambda: json.dumps(boundary.geojson, ensure_ascii=False), args.repeat)
+    full_vertices = sum(len(r) for f in boundary.geojson["features"]
+                        for outer, holes in boundary_geometry.feature_polygons(f) for r in [outer, *holes])
+    rows = [["원본", "-", f"{full_vertices:,}", f"{len(full_text) / 1024:,.1f}", "-", f"{full_ms:.2f}"]]
+    for level, (tolerance, decimals) in enumerate(boundary_geometry.SIMPLIFY_LEVELS):
+        build_ms = timeit(lambda: boundary_geometry.boundary_layer(boundary, level=level), 1)
+        layer = boundary_geometry.boundary_layer(boundary, level=level)
+        hit_ms = timeit(lambda: boundary_geometry.boundary_layer(boundary, level=level), args.repeat)
+        rows.append([
+            f"단계 {level} ({tolerance}m, 소수 {decimals}자리)", f"{build_ms:.1f}", f"{layer.vertices:,}",
+            f"{len(layer.text) / 1024:,.1f}", f"{len(full_text) / len(layer.text):.1f}x", f"{hit_ms:.4f}",
+        ])
+    zooms = ", ".join(f"줌 {z}->단계 {boundary_geometry.pick_level(boundary, zoom=z)}" for z in (10, 11, 12, 13, 15))
+    print_table(
+        f"자치구 경계 레이어 ({boundary.origin}; {zooms})",
+        ["레이어", "최초 생성(ms)", "꼭짓점", "크기(KB)", "축소", "재실행 비용(ms)"], rows,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="대시보드 데이터 경로 벤치마크")
+    parser.add_argument("--repeat", type=int, default=5, help="측정 반복 횟수")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_cache = sub.add_parser("cache", help="CSV 컬럼형 캐시 콜드/웜 로드")
+    p_cache.add_argument("paths", nargs="*", help="측정할 CSV 경로")
+    p_cache.set_defaults(func=bench_cache)
+
+    p_enc = sub.add_parser("encoding", help="인코딩 재시도 vs 선판별 단일 파싱")
+    p_enc.add_argument("paths", nargs="*", help="측정할 CSV 경로")
+    p_enc.set_defaults(func=bench_encoding)
+
+    p_num = sub.add_parser("numeric", help="쉼표 천 단위 숫자 변환")
+    p_num.add_argument("--rows", type=int, default=1_000_000, help="합성 표 행 수")
+    p_num.add_argument("--years", type=int, default=5, help="연도 컬럼 수")
+    p_num.set_defaults(func=bench_numeric)
+
+    p_proj = sub.add_parser("projection", help="가격 탭 컬럼 투영 / SQL 집계 pushdown")
+    p_proj.add_argument("--copies", type=int, default=100, help="room 데이터 복제 배수")
+    p_proj.set_defaults(func=bench_projection)
+
+    p_stream = sub.add_parser("stream", help="room 테이블 청크 스트리밍 읽기 메모리")
+    p_stream.add_argument("--copies", type=int, default=100, help="room 데이터 복제 배수")
+    p_stream.add_argument("--chunk-size", type=int, default=room_db.DEFAULT_CHUNK_SIZE, help="청크 행 수")
+    p_stream.set_defaults(func=bench_stream)
+
+    p_sqlite = sub.add_parser("sqlite", help="SQLite 백엔드 생성 + 가격 탭 쿼리 부하")
+    p_sqlite.add_argument("--copies", type=int, default=20, help="room 데이터 복제 배수")
+    p_sqlite.add_argument("--threads", type=int, default=4, help="동시 요청 스레드 수")
+    p_sqlite.set_defaults(func=bench_sqlite)
+
+    p_amen = sub.add_parser("amenity", help="편의시설 비트마스크 필터")
+    p_amen.add_argument("--copies", type=int, default=100, help="room 데이터 복제 배수")
+    p_amen.set_defaults(func=bench_amenity)
+
+    p_hav = sub.add_parser("haversine", help="최단 마트 찾기 (벡터화 haversine)")
+    p_hav.add_argument("--max-exp", type=int, default=7, help="최대 점포 수 10^K")
+    p_hav.add_argument("--loop-max", type=int, default=100_000, help="iterrows 기준선을 측정할 최대 점포 수")
+    p_hav.set_defaults(func=bench_haversine)
+
+    p_sp = sub.add_parser("spatial", help="마트 공간 인덱스 k-최근접 / 반경 질의")
+    p_sp.add_argument("--stores", type=int, default=1_000_000, help="합성 점포 수")
+    p_sp.add_argument("--queries", type=int, default=100, help="대량 질의 수")
+    p_sp.add_argument("--k", type=int, default=5, help="k-최근접 개수")
+    p_sp.add_argument("--radius", type=float, default=500.0, help="반경 질의 반경(m)")
+    p_sp.set_defaults(func=bench_spatial)
+
+    p_dist = sub.add_parser("districts", help="매물 좌표 -> 자치구 경계 일괄 배정")
+    p_dist.add_argument("--points", type=int, default=1_000_000, help="합성 매물 수")
+    p_dist.add_argument("--loop-max", type=int, default=2_000, help="반복문 기준선을 실제로 측정할 점 수")
+    p_dist.add_argument("--source", default=None, help="경계 파일을 찾을 데이터 폴더/zip (없으면 캐시, 그래도 없으면 합성 경계)")
+    p_dist.set_defaults(func=bench_districts)
+
+    p_layer = sub.add_parser("layers", help="히트맵 경계 레이어 단순화 단계별 크기 / 직렬화")
+    p_layer.add_argument("--source", default=None, help="경계 파일을 찾을 데이터 폴더/zip (없으면 캐시, 그래도 없으면 합성 경계)")
+    p_layer.add_argument("--vertices", type=int, default=2_000, help="합성 경계의 자치구당 꼭짓점 수")
+    p_layer.set_defaults(func=bench_layers)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
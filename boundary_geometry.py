@@ -0,0 +1,476 @@
+# boundary_geometry.py | 자치구 경계 기하 계산 (경계 버전별 캐시)
+# =============================================================================
+# 기능 요약:
+# - feature_polygons: GeoJSON Polygon/MultiPolygon을 (외곽, 구멍들) NumPy 좌표 배열로 변환
+# - polygon_centroid: 면적 가중 무게중심 (신발끈 공식, 구멍 면적은 뺌)
+# - polylabel: 다각형 내부에서 경계와 가장 먼 점(pole of inaccessibility)
+# - label_points: 자치구 이름 -> 라벨 위치 (lat, lon).
+#   무게중심이 다각형 안이면 무게중심, 오목한 모양이라 밖으로 나가면 polylabel 점.
+#   경계 버전(Boundary.version)마다 한 번만 계산하고, 재실행 때는 딕셔너리 조회만 합니다.
+# - points_in_rings: 점 배열 전체에 대한 짝홀 규칙(ray casting) 판정.
+#   점을 위도순으로 정렬해 두고 변마다 그 변의 위도 구간에 드는 점만 잘라 계산합니다.
+# - assign_features: 위경도 배열 -> 점이 속한 경계 feature 위치 (bbox로 먼저 후보를 추림)
+# - boundary_layer: 지도 줌/크기에 맞는 단순화 단계의 경계 레이어(GeoJSON + 직렬화 문자열).
+#   단계마다 좌표를 격자에 맞춰 반올림(양자화)하고 Douglas–Peucker로 꼭짓점을 줄이되,
+#   이웃 자치구가 공유하는 경계의 분기점은 고정해 두 구가 같은 선으로 줄어듭니다(틈/겹침 없음).
+#   경계 버전 x 단계마다 한 번만 만들어 두므로 재실행 때 단순화/직렬화를 반복하지 않습니다.
+#
+# 좌표 계산은 기준 위도의 cos로 경도를 줄인 평면(등장방형) 좌표에서 합니다.
+# (서울 정도의 범위에서는 면적/거리 왜곡이 무시할 만함)
+# =============================================================================
+import heapq
+import json
+import math
+import threading
+from collections import namedtuple
+
+import numpy as np
+
+# 경계 버전 -> 계산 결과 캐시
+_LABEL_CACHE = {}
+_RINGS_CACHE = {}
+_LAYER_CACHE = {}
+_JUNCTIONS_CACHE = {}
+_LOCK = threading.Lock()
+
+# polylabel 정밀도 (도 단위, 약 10m)
+DEFAULT_PRECISION = 1e-4
+
+# 경계 단순화 단계: (Douglas–Peucker 허용 오차(m), 좌표 소수 자릿수)
+# 자릿수 5 = 약 1m 격자, 4 = 약 11m 격자 (허용 오차보다 충분히 작게)
+SIMPLIFY_LEVELS = ((0, 6), (5, 5), (20, 5), (60, 4), (150, 4))
+
+# 지도 한 픽셀(m)에 대해 허용할 단순화 오차 비율 (1이면 오차가 1픽셀 이하)
+TOLERANCE_PX = 1.0
+
+# 위도 1도의 길이 (m)
+_M_PER_DEG = 111_320.0
+
+BoundaryLayer = namedtuple("BoundaryLayer", ["geojson", "text", "level", "tolerance_m", "vertices"])
+
+
+# ---------------------------------------------------------------------
+# [1] GeoJSON -> NumPy
+# ---------------------------------------------------------------------
+def feature_polygons(feature):
+    """feature의 geometry를 [(외곽 (N, 2) [lon, lat], [구멍 (M, 2), ...]), ...] 목록으로 변환합니다."""
+    geom = feature["geometry"]
+    polys = geom["coordinates"] if geom["type"] == "MultiPolygon" else [geom["coordinates"]]
+    return [
+        (np.asarray(rings[0], dtype=np.float64)[:, :2], [np.asarray(h, dtype=np.float64)[:, :2] for h in rings[1:]])
+        for rings in polys if rings
+    ]
+
+
+def _ring_area_centroid(ring, kx):
+    """링 하나의 부호 있는 면적과 무게중심 (x는 kx배 줄인 평면 좌표)."""
+    x, y = ring[:, 0] * kx, ring[:, 1]
+    x1, y1 = np.roll(x, -1), np.roll(y, -1)
+    cross = x * y1 - x1 * y
+    area = cross.sum() / 2
+    if area == 0:
+        return 0.0, np.array([x.mean() / kx, y.mean()])
+    cx = ((x + x1) * cross).sum() / (6 * area)
+    cy = ((y + y1) * cross).sum() / (6 * area)
+    return area, np.array([cx / kx, cy])
+
+
+def _scale(polygons):
+    """기준 위도의 cos (경도 -> 평면 x 축척)."""
+    lat0 = np.mean([outer[:, 1].mean() for outer, _ in polygons])
+    return np.cos(np.radians(lat0))
+
+
+# ---------------------------------------------------------------------
+# [2] 무게중심 / 내부 점
+# ---------------------------------------------------------------------
+def polygon_centroid(polygons):
+    """
+    여러 다각형(구멍 포함)의 면적 가중 무게중심 [lon, lat]과 전체 면적(평면 단위)을 반환합니다.
+    - 꼭짓점 평균과 달리 경계가 촘촘한 쪽으로 치우치지 않습니다.
+    """
+    kx = _scale(polygons)
+    total, weighted = 0.0, np.zeros(2)
+    for outer, holes in polygons:
+        for ring, sign in [(outer, 1.0)] + [(h, -1.0) for h in holes]:
+            area, c = _ring_area_centroid(ring, kx)
+            area = sign * abs(area)
+            total += area
+            weighted += area * c
+    if total == 0:
+        return np.concatenate([outer for outer, _ in polygons]).mean(axis=0), 0.0
+    return weighted / total, total
+
+
+def _point_in_rings(x, y, rings):
+    """점 (x, y)가 링들(외곽 + 구멍) 안에 있는지 짝홀 규칙으로 판정합니다."""
+    inside = False
+    for ring in rings:
+        xa, ya = ring[:, 0], ring[:, 1]
+        xb, yb = np.roll(xa, -1), np.roll(ya, -1)
+        crosses = (ya > y) != (yb > y)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            xs = xa + (y - ya) * (xb - xa) / (yb - ya)
+        inside ^= bool(np.count_nonzero(crosses & (x < xs)) % 2)
+    return inside
+
+
+def _segment_distance(x, y, rings):
+    """점 (x, y)에서 링들의 가장 가까운 변까지의 거리."""
+    best = np.inf
+    for ring in rings:
+        a = ring
+        b = np.roll(ring, -1, axis=0)
+        d = b - a
+        len2 = (d ** 2).sum(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t = np.clip(((x - a[:, 0]) * d[:, 0] + (y - a[:, 1]) * d[:, 1]) / len2, 0, 1)
+        t = np.where(len2 == 0, 0, t)
+        px, py = a[:, 0] + t * d[:, 0], a[:, 1] + t * d[:, 1]
+        best = min(best, float(np.sqrt(((px - x) ** 2 + (py - y) ** 2).min())))
+    return best
+
+
+def polylabel(outer, holes=(), precision=DEFAULT_PRECISION):
+    """
+    다각형 내부에서 경계까지의 거리가 가장 먼 점 [lon, lat]을 찾습니다(격자 분할 + 우선순위 큐).
+    - 오목하거나 가늘고 긴 모양에서도 항상 다각형 안에 있는 라벨 위치를 줍니다.
+    """
+    kx = np.cos(np.radians(outer[:, 1].mean()))
+    rings = [np.column_stack([r[:, 0] * kx, r[:, 1]]) for r in [outer, *holes]]
+    xmin, ymin = rings[0].min(axis=0)
+    xmax, ymax = rings[0].max(axis=0)
+    size = min(xmax - xmin, ymax - ymin)
+    if size == 0:
+        return np.array([xmin / kx, ymin])
+
+    def signed(x, y):
+        d = _segment_distance(x, y, rings)
+        return d if _point_in_rings(x, y, rings) else -d
+
+    def cell(x, y, h):
+        d = signed(x, y)
+        # (우선순위: 이 칸에서 가능한 최대 거리, 중심 거리, x, y, 반변)
+        return (-(d + h * np.sqrt(2)), d, x, y, h)
+
+    h = size / 2
+    queue = [cell(x, y, h) for x in np.arange(xmin + h, xmax + h, size) for y in np.arange(ymin + h, ymax + h, size)]
+    heapq.heapify(queue)
+    c, _ = polygon_centroid([(outer, list(holes))])
+    best = (signed(c[0] * kx, c[1]), c[0] * kx, c[1])
+    while queue:
+        neg_max, d, x, y, h = heapq.heappop(queue)
+        if d > best[0]:
+            best = (d, x, y)
+        if -neg_max - best[0] <= precision:
+            continue
+        h /= 2
+        for dx in (-h, h):
+            for dy in (-h, h):
+                heapq.heappush(queue, cell(x + dx, y + dy, h))
+    return np.array([best[1] / kx, best[2]])
+
+
+def label_point(polygons, precision=DEFAULT_PRECISION):
+    """
+    라벨 위치 [lon, lat]: 면적 가중 무게중심이 가장 큰 다각형 안에 있으면 그대로,
+    아니면 가장 큰 다각형의 polylabel 점을 씁니다.
+    """
+    centroid, _ = polygon_centroid(polygons)
+    kx = _scale(polygons)
+    largest = max(polygons, key=lambda p: abs(_ring_area_centroid(p[0], kx)[0]))
+    if _point_in_rings(centroid[0], centroid[1], [largest[0], *largest[1]]):
+        return centroid
+    return polylabel(largest[0], largest[1], precision)
+
+
+# ---------------------------------------------------------------------
+# [3] 경계 버전별 캐시
+# ---------------------------------------------------------------------
+def label_points(boundary, key="name"):
+    """
+    자치구 이름 -> 라벨 위치 (lat, lon) 딕셔너리를 반환합니다.
+    - boundary: seoul_boundary.load_boundary() 결과. 같은 버전은 한 번만 계산합니다.
+    """
+    cache_key = (boundary.version, key)
+    labels = _LABEL_CACHE.get(cache_key)
+    if labels is None:
+        with _LOCK:
+            labels = _LABEL_CACHE.get(cache_key)
+            if labels is None:
+                labels = {}
+                for feature in boundary.geojson["features"]:
+                    polygons = feature_polygons(feature)
+                    if polygons:
+                        lon, lat = label_point(polygons)
+                        labels[feature["properties"].get(key)] = (float(lat), float(lon))
+                _LABEL_CACHE[cache_key] = labels
+    return labels
+
+
+# ---------------------------------------------------------------------
+# [4] 점-다각형 판정 (대량)
+# ---------------------------------------------------------------------
+def points_in_rings(px, py, rings):
+    """
+    점 배열 (px, py)가 링들(외곽 + 구멍, 여러 다각형 가능) 안에 있는지 짝홀 규칙으로 판정한 bool 배열.
+    - py는 오름차순으로 정렬되어 있어야 합니다. 변 (a, b)를 가로지르는 수평 반직선은
+      min(ya, yb) <= y < max(ya, yb)인 점뿐이므로, 변마다 searchsorted로 그 구간만 잘라 계산합니다.
+      (점 수 x 변 수 행렬 없이, 일은 변의 위도 폭에 드는 점 수에 비례)
+    """
+    inside = np.zeros(len(px), dtype=bool)
+    for ring in rings:
+        xa, ya = ring[:, 0], ring[:, 1]
+        xb, yb = np.roll(xa, -1), np.roll(ya, -1)
+        lo = np.searchsorted(py, np.minimum(ya, yb), side="left")
+        hi = np.searchsorted(py, np.maximum(ya, yb), side="left")
+        for e in np.flatnonzero(hi > lo):
+            i, j = lo[e], hi[e]
+            xs = xa[e] + (py[i:j] - ya[e]) * ((xb[e] - xa[e]) / (yb[e] - ya[e]))
+            inside[i:j] ^= px[i:j] < xs
+    return inside
+
+
+def _feature_rings(boundary):
+    """경계 버전별 feature마다 (모든 링 목록, bbox [xmin, ymin, xmax, ymax]) 목록."""
+    rings = _RINGS_CACHE.get(boundary.version)
+    if rings is None:
+        rings = []
+        for feature in boundary.geojson["features"]:
+            polygons = feature_polygons(feature)
+            flat = [r for outer, holes in polygons for r in [outer, *holes]]
+            if flat:
+                pts = np.concatenate(flat)
+                rings.append((flat, np.concatenate([pts.min(axis=0), pts.max(axis=0)])))
+            else:
+                rings.append(([], None))
+        _RINGS_CACHE[boundary.version] = rings
+    return rings
+
+
+def assign_features(lats, lons, boundary):
+    """
+    위경도 배열의 각 점이 속한 경계 feature의 위치(boundary.geojson["features"]의 iloc)를 int32 배열로 반환합니다.
+    - 어느 feature에도 속하지 않거나 좌표가 결측이면 -1
+    - 점을 위도순으로 한 번 정렬한 뒤, feature마다 bbox의 위도 구간(연속 구간)과 경도 범위로
+      후보를 추리고 아직 배정되지 않은 후보만 points_in_rings로 판정합니다.
+    """
+    lats = np.asarray(lats, dtype=np.float64)
+    lons = np.asarray(lons, dtype=np.float64)
+    out = np.full(len(lats), -1, dtype=np.int32)
+    ok = np.flatnonzero(~(np.isnan(lats) | np.isnan(lons)))
+    order = ok[np.argsort(lats[ok], kind="stable")]
+    ys, xs = lats[order], lons[order]
+    assigned = np.zeros(len(order), dtype=bool)
+    for pos, (rings, bbox) in enumerate(_feature_rings(boundary)):
+        if bbox is None:
+            continue
+        i = np.searchsorted(ys, bbox[1], side="left")
+        j = np.searchsorted(ys, bbox[3], side="right")
+        cand = i + np.flatnonzero(~assigned[i:j] & (xs[i:j] >= bbox[0]) & (xs[i:j] <= bbox[2]))
+        if len(cand) == 0:
+            continue
+        hit = cand[points_in_rings(xs[cand], ys[cand], rings)]
+        assigned[hit] = True
+        out[order[hit]] = pos
+    return out
+
+
+# ---------------------------------------------------------------------
+# [5] 다단계 단순화 레이어 (Choropleth 용)
+# ---------------------------------------------------------------------
+def _douglas_peucker(xy, tolerance):
+    """열린 선 xy (N, 2) (평면 좌표, m)에서 남길 꼭짓점 bool 배열 (양 끝점은 항상 남김)."""
+    keep = np.zeros(len(xy), dtype=bool)
+    keep[[0, -1]] = True
+    stack = [(0, len(xy) - 1)]
+    while stack:
+        i, j = stack.pop()
+        if j - i < 2:
+            continue
+        a, b = xy[i], xy[j]
+        d = b - a
+        p = xy[i + 1:j] - a
+        len2 = d @ d
+        if len2 == 0:
+            dist = np.hypot(p[:, 0], p[:, 1])
+        else:
+            t = np.clip((p @ d) / len2, 0, 1)
+            dist = np.hypot(p[:, 0] - t * d[0], p[:, 1] - t * d[1])
+        k = int(np.argmax(dist))
+        if dist[k] > tolerance:
+            m = i + 1 + k
+            keep[m] = True
+            stack += [(i, m), (m, j)]
+    return keep
+
+
+def _junctions(boundary):
+    """
+    feature마다 [[(링 (N, 2), 고정 여부 bool (N,)), ...], ...] 목록 (닫는 중복점은 뺌).
+    - 꼭짓점을 공유하는 feature 집합이 앞/뒤 꼭짓점과 다르면 분기점(고정)입니다.
+      (두 구가 공유하는 경계 구간의 양 끝) -> 구간 안쪽만 단순화하므로 이웃과 같은 결과
+    - 양자화로 떨어진 점들이 우연히 겹치지 않도록 원래 좌표로 판정합니다.
+    """
+    features = []
+    for feature in boundary.geojson["features"]:
+        polygons = []
+        for outer, holes in feature_polygons(feature):
+            rings = []
+            for ring in [outer, *holes]:
+                if len(ring) > 1 and (ring[0] == ring[-1]).all():
+                    ring = ring[:-1]
+                rings.append(ring)
+            polygons.append(rings)
+        features.append(polygons)
+
+    owners = {}
+    for f, polygons in enumerate(features):
+        for rings in polygons:
+            for ring in rings:
+                for v in map(tuple, ring):
+                    owners.setdefault(v, set()).add(f)
+    out = []
+    for polygons in features:
+        flagged = []
+        for rings in polygons:
+            pairs = []
+            for ring in rings:
+                sig = [frozenset(owners[v]) for v in map(tuple, ring)]
+                fixed = np.array([
+                    sig[i] != sig[i - 1] or sig[i] != sig[(i + 1) % len(sig)] for i in range(len(sig))
+                ], dtype=bool)
+                pairs.append((ring, fixed))
+            flagged.append(pairs)
+        out.append(flagged)
+    return out
+
+
+def _quantize(ring, fixed, decimals):
+    """링을 소수 decimals자리로 반올림하고 연속 중복점을 하나로 합칩니다(합친 점은 하나라도 고정이면 고정)."""
+    q = np.round(ring, decimals)
+    if len(q) == 0:
+        return q, fixed
+    first = np.flatnonzero(np.r_[True, (np.diff(q, axis=0) != 0).any(axis=1)])
+    q, fixed = q[first], np.logical_or.reduceat(fixed, first)
+    if len(q) > 1 and (q[0] == q[-1]).all():
+        fixed[0] |= fixed[-1]
+        q, fixed = q[:-1], fixed[:-1]
+    return q, fixed
+
+
+def _simplify_ring(ring, fixed, tolerance, kx):
+    """닫히지 않은 링(꼭짓점 N개)을 분기점 사이 구간별로 단순화해 닫힌 링으로 반환합니다."""
+    n = len(ring)
+    anchors = np.flatnonzero(fixed)
+    if len(anchors) == 0:
+        # 이웃이 없는 링: 첫 점과 가장 먼 점을 고정
+        far = int(np.argmax(((ring - ring[0]) ** 2).sum(axis=1)))
+        anchors = np.unique([0, far])
+    keep = np.zeros(n, dtype=bool)
+    keep[anchors] = True
+    if tolerance > 0:
+        xy = ring * [kx * _M_PER_DEG, _M_PER_DEG]
+        for a, b in zip(anchors, np.roll(anchors, -1)):
+            idx = np.arange(a, b + 1) if b > a else np.r_[np.arange(a, n), np.arange(0, b + 1)]
+            # 방향에 따라 결과가 달라지지 않도록 끝점 좌표가 작은 쪽에서 시작
+            flip = tuple(ring[idx[-1]]) < tuple(ring[idx[0]])
+            seg = idx[::-1] if flip else idx
+            keep[seg[_douglas_peucker(xy[seg], tolerance)]] = True
+    else:
+        keep[:] = True
+    out = ring[keep]
+    return np.vstack([out, out[:1]])
+
+
+def simplify_boundary(boundary, tolerance_m, decimals):
+    """
+    경계 GeoJSON을 좌표 양자화 + 분기점 고정 Douglas–Peucker로 단순화한 새 FeatureCollection을 반환합니다.
+    - 단순화 후 꼭짓점이 3개 미만이 되는 링은 구멍이면 빼고, 외곽이면 양자화만 한 링을 씁니다.
+    """
+    features = _JUNCTIONS_CACHE.get(boundary.version)
+    if features is None:
+        features = _JUNCTIONS_CACHE[boundary.version] = _junctions(boundary)
+    lat0 = np.mean([rings[0][0][:, 1].mean() for polygons in features for rings in polygons])
+    kx = math.cos(math.radians(lat0))
+    out = []
+    for feature, polygons in zip(boundary.geojson["features"], features):
+        coords = []
+        for rings in polygons:
+            simplified = []
+            for k, (ring, fixed) in enumerate(rings):
+                ring, fixed = _quantize(ring, fixed, decimals)
+                s = _simplify_ring(ring, fixed, tolerance_m, kx) if len(ring) else ring
+                if len(s) < 4:
+                    if k > 0 or len(ring) == 0:
+                        continue
+                    s = np.vstack([ring, ring[:1]])
+                simplified.append(s.tolist())
+            if simplified:
+                coords.append(simplified)
+        multi = feature["geometry"]["type"] == "MultiPolygon"
+        out.append({
+            "type": "Feature",
+            "properties": feature.get("properties", {}),
+            "geometry": {"type": "MultiPolygon" if multi else "Polygon", "coordinates": coords if multi else (coords[0] if coords else [])},
+        })
+    return {"type": "FeatureCollection", "features": out}
+
+
+def _fit_zoom(boundary, width, height):
+    """경계 전체가 width x height 픽셀 지도에 들어가는 최대 줌 (Leaflet fitBounds와 같은 계산)."""
+    bboxes = np.array([bbox for _, bbox in _feature_rings(boundary) if bbox is not None])
+    xmin, ymin = bboxes[:, :2].min(axis=0)
+    xmax, ymax = bboxes[:, 2:].max(axis=0)
+
+    def merc_y(lat):
+        return math.log(math.tan(math.pi / 4 + math.radians(lat) / 2))
+
+    zx = math.log2(width * 360 / (256 * (xmax - xmin)))
+    zy = math.log2(height * 2 * math.pi / (256 * (merc_y(ymax) - merc_y(ymin))))
+    return max(0, math.floor(min(zx, zy)))
+
+
+def pick_level(boundary, zoom=None, width=None, height=None, lat=37.55):
+    """
+    지도 줌(또는 줌이 없으면 width x height 픽셀에 경계가 맞는 줌)에서
+    오차가 TOLERANCE_PX 픽셀 이하인 가장 거친 단순화 단계 번호를 고릅니다.
+    """
+    if zoom is None:
+        zoom = _fit_zoom(boundary, width or 800, height or 600)
+    m_per_px = 156_543.03 * math.cos(math.radians(lat)) / 2 ** zoom
+    level = 0
+    for i, (tolerance, _) in enumerate(SIMPLIFY_LEVELS):
+        if tolerance <= m_per_px * TOLERANCE_PX:
+            level = i
+    return level
+
+
+def boundary_layer(boundary, zoom=None, width=None, height=None, level=None):
+    """
+    Choropleth에 넘길 단순화 경계 레이어(BoundaryLayer)를 반환합니다.
+    - level을 주지 않으면 pick_level(zoom, width, height)로 고릅니다.
+    - 경계 버전 x 단계마다 한 번만 만들며, geojson은 세션 간 공유되므로 제자리 수정 금지.
+    - text: 직렬화한 GeoJSON 문자열 (구분자 공백 없음). folium.Choropleth(geo_data=...)에는 이 문자열을
+      넘깁니다(folium이 자기 복사본으로 파싱하므로 공유 geojson이 외부 라이브러리에 넘어가지 않음).
+    """
+    if level is None:
+        level = pick_level(boundary, zoom, width, height)
+    key = (boundary.version, level)
+    layer = _LAYER_CACHE.get(key)
+    if layer is None:
+        with _LOCK:
+            layer = _LAYER_CACHE.get(key)
+            if layer is None:
+                tolerance, decimals = SIMPLIFY_LEVELS[level]
+                geojson = simplify_boundary(boundary, tolerance, decimals)
+                vertices = sum(
+                    len(r) for f in geojson["features"]
+                    for poly in (f["geometry"]["coordinates"] if f["geometry"]["type"] == "MultiPolygon"
+                                 else [f["geometry"]["coordinates"]])
+                    for r in poly
+                )
+                text = json.dumps(geojson, ensure_ascii=False, separators=(",", ":"))
+                layer = BoundaryLayer(geojson, text, level, tolerance, vertices)
+                _LAYER_CACHE[key] = layer
+    return layer
@@ -8,7 +8,8 @@
 # - CCTV/경찰서/범죄 현황: '구'를 멀티셀렉트(가나다순, 기본 전체 선택)로 필터
 # - 시각화: plotly.express로만 구성 (연속형 팔레트 사용)
 # - '가격' 페이지: MariaDB(room 테이블)에서 데이터 조회 후 산점도/막대/라인/박스 플롯 등 표시
-# - '거리' 페이지: 특정 주소와 가장 가까운 마트 계산 및 folium 지도 시각화
+# - '거리' 페이지: 기본 주소 또는 선택한 매물과 가장 가까운 마트 표시 및 folium 지도 시각화
+#   (매물은 스냅샷에 미리 계산된 마트 접근성 컬럼을 조회만 함)
 # =============================================================================
 
 # ---------------------------------------------------------------------
@@ -16,19 +17,28 @@
 # ---------------------------------------------------------------------
 import io
 import json
-import locale
-import re
-from math import radians, sin, cos, sqrt, atan2
 
 import folium
-import mariadb
 import numpy as np
 import pandas as pd
 import plotly.express as px
-import requests
 import streamlit as st
 from streamlit_folium import st_folium
 
+from boundary_geometry import boundary_layer, label_points
+from data_loader import open_source
+from hangul import sort_korean
+from room_data import (
+    prepare_price_frame, price_columns, price_query,
+    rent_rows_query, rent_summary_query,
+)
+from room_db import get_room_db
+from room_features import MART_FEATURE_LABELS, listing_districts
+from room_snapshot import get_room_snapshot
+from safety_data import get_dataset, registry_report
+from seoul_boundary import load_boundary
+from spatial_index import get_mart_index
+
 # ---------------------------------------------------------------------
 # [2] 전역 설정 및 상수
 # ---------------------------------------------------------------------
@@ -41,70 +51,12 @@ PLOTLY_SCALES = [
     "Teal", "Agsunset", "YlGnBu", "YlOrRd", "IceFire", "Magma"
 ]
 
+# 치안/거리 페이지 CSV가 들어 있는 데이터 소스 (data 폴더)
+DATA_SOURCE = open_source("data")
+
 # ---------------------------------------------------------------------
 # [3] 공통 헬퍼 함수
 # ---------------------------------------------------------------------
-def read_csv_safely(path, encodings=("utf-8", "cp949", "euc-kr")):
-    """CSV를 여러 인코딩으로 시도하여 안전하게 읽어옵니다."""
-    last_err = None
-    for enc in encodings:
-        try:
-            return pd.read_csv(path, encoding=enc)
-        except Exception as e:
-            last_err = e
-    raise last_err
-
-def to_numeric_df(df, cols):
-    """쉼표를 제거하고 지정된 컬럼들을 숫자형으로 변환합니다."""
-    out = df.copy()
-    out[cols] = out[cols].replace({",": ""}, regex=True)
-    for c in cols:
-        out[c] = pd.to_numeric(out[c], errors="coerce")
-    return out
-
-def extract_year_cols(df, include_preinstalled=False):
-    """
-    '년'이 포함된 컬럼만 추출합니다.
-    - include_preinstalled=False: '이전'이 들어간 누계형 컬럼은 제외합니다.
-    """
-    year_cols = [c for c in df.columns if "년" in str(c)]
-    if not include_preinstalled:
-        year_cols = [c for c in year_cols if "이전" not in str(c)]
-    return year_cols
-
-def police_sum_by_year(df):
-    """
-    경찰 데이터에서 같은 연도의 세부 컬럼(지구대, 파출소 등)을 합쳐
-    '{YYYY}년' 단일 컬럼으로 만들고 원본 세부 컬럼은 제거합니다.
-    """
-    year_pattern = re.compile(r"(20[0-3]\d)")
-    year_groups = {}
-    for col in df.columns:
-        m = year_pattern.search(str(col))
-        if m:
-            year = m.group(1)
-            year_groups.setdefault(year, []).append(col)
-
-    out = df.copy()
-    for year, cols in year_groups.items():
-        tmp = out[cols].replace({",": ""}, regex=True)
-        for c in cols:
-            tmp[c] = pd.to_numeric(tmp[c], errors="coerce")
-        out[f"{year}년"] = tmp.sum(axis=1)
-
-    cols_to_drop = [c for cols in year_groups.values() for c in cols]
-    out = out.drop(columns=cols_to_drop, errors="ignore")
-
-    def is_year_col(c):
-        return bool(year_pattern.search(str(c)))
-
-    id_cols = [c for c in out.columns if not is_year_col(c)]
-    year_cols = sorted(
-        [c for c in out.columns if is_year_col(c)],
-        key=lambda x: int(re.search(r"(20[0-3]\d)", x).group(1))
-    )
-    return out[id_cols + year_cols]
-
 def apply_sort(df, value_col, order_choice):
     """정렬 옵션(내림/오름/원본)에 따라 데이터프레임을 정렬합니다."""
     if "내림차순" in order_choice:
@@ -113,44 +65,29 @@ def apply_sort(df, value_col, order_choice):
         return df.sort_values(value_col, ascending=True)
     return df
 
-def sort_korean(items):
-    """한글 '가나다' 순으로 정렬합니다."""
-    try:
-        for loc in ("ko_KR.UTF-8", "Korean_Korea.949", "ko_KR"):
-            try:
-                locale.setlocale(locale.LC_ALL, loc)
-                break
-            except Exception:
-                pass
-        return sorted(items, key=locale.strxfrm)
-    except Exception:
-        return sorted(items)
-
-def get_room2_data():
-    """MariaDB에서 'room' 테이블 데이터를 조회하여 DataFrame으로 반환합니다."""
+def get_room2_data(query=None):
+    """
+    'room' 테이블 데이터를 DataFrame으로 반환합니다(연결 풀 + TTL 캐시 공유).
+    - query: room_db.RoomQuery (없으면 전체 테이블을 로컬 스냅샷에서 증분 동기화 후 반환)
+    """
     try:
-        conn = mariadb.connect(
-            host='localhost', port=3310, database='bangu',
-            user='root', password='1234'
-        )
-        df = pd.read_sql("SELECT * FROM room", conn)
-        conn.close()
-        return df
+        if query is None:
+            snapshot = get_room_snapshot()
+            # 경계 파일이 생기기 전에 적재된 매물에도 자치구를 채움 (스냅샷/경계 버전마다 한 번만 검사)
+            listing_districts(snapshot)
+            return snapshot.frame()
+        return get_room_db().fetch(query)
     except Exception as e:
         st.error(f"데이터 조회 실패: {e}")
         return None
 
-def add_day_to_date(s):
-    """'YYYY', 'YYYY-MM' 형식의 날짜 문자열을 'YYYY-MM-DD'로 보정합니다."""
-    if pd.isna(s):
-        return s
-    s = str(s).replace('.', '-')
-    parts = s.split('-')
-    if len(parts) == 1:
-        return f"{parts[0]}-01-01"
-    elif len(parts) == 2:
-        return f"{parts[0]}-{parts[1]}-01"
-    return s
+def get_room_columns():
+    """'room' 테이블 컬럼 목록을 반환합니다(조회 실패 시 None)."""
+    try:
+        return get_room_db().columns("room")
+    except Exception as e:
+        st.error(f"데이터 조회 실패: {e}")
+        return None
 
 def get_scale_list(name: str):
     """이름에 맞는 Plotly 색상 시퀀스를 반환합니다."""
@@ -167,16 +104,6 @@ def make_discrete_from_scale(scale_name: str, n: int):
     idx = np.linspace(0, len(base) - 1, n)
     return [base[int(round(i))] for i in idx]
 
-def haversine(lat1, lon1, lat2, lon2):
-    """두 지점의 위도/경도를 받아 거리를 미터(m) 단위로 계산합니다."""
-    R = 6371000  # 지구 반지름 (미터)
-    lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
-    dlon = lon2 - lon1
-    dlat = lat2 - lat1
-    a = sin(dlat / 2)**2 + cos(lat1) * cos(lat2) * sin(dlon / 2)**2
-    c = 2 * atan2(sqrt(a), sqrt(1 - a))
-    return R * c
-
 # ---------------------------------------------------------------------
 # [4] 사이드바 메뉴
 # ---------------------------------------------------------------------
@@ -194,15 +121,15 @@ st.title("셀렉 대시보드")
 if page == "가격":
     st.subheader("💰 가격 분석")
 
-    # DB 조회
-    df = get_room2_data()
-    if df is not None:
-        # ===== 전처리 =====
-        df['building_type'] = df.get('building_type', pd.Series(index=df.index)).fillna('unknown')
-        df['room_living_type'] = df.get('room_living_type', pd.Series(index=df.index)).fillna('unknown')
-        if 'completion_date' in df.columns:
-            df['completion_date'] = df['completion_date'].apply(add_day_to_date)
-            df['completion_date'] = pd.to_datetime(df['completion_date'], errors='coerce')
+    # DB 조회: 헤더만 먼저 읽고, 각 차트는 필요한 컬럼/집계만 조회
+    room_cols = get_room_columns()
+    if room_cols is not None:
+        available_cols = price_columns(room_cols)
+        db_stats = get_room_db().stats()
+        st.caption(
+            f"{get_room_db().name} · DB 캐시 적중률 {db_stats['hit_rate']:.0%} ({db_stats['requests']:,}회 요청) · "
+            f"평균 조회 {db_stats['avg_ms']:,.1f} ms · 최근 조회 {db_stats['last_ms']:,.1f} ms"
+        )
 
         # ===== 탭 구성 =====
         tab_scatter, tab_rent = st.tabs(["📈 조건에 따른 월세/보증금 요약", "🏢 건물유형별 월세 요약"])
@@ -214,20 +141,25 @@ if page == "가격":
             LABELS = {
                 "exclusive_area": "전용면적(㎡)", "supply_area": "공급면적(㎡)",
                 "completion_date": "준공인가일", "built_year": "준공년도",
-                "floor": "층", "total_floor": "건물층수",
+                "floor": "층", "total_floor": "건물층수", "floor_level": "층 구분",
                 "room_count": "방 개수", "bath_count": "욕실 개수", "parking_count": "주차 대수",
                 "building_type": "건물유형", "room_living_type": "거주 형태",
                 "parking_info": "주차 정보", "main_room_direction": "주실 방향",
                 "deposit": "보증금", "rent": "월세",
+                **MART_FEATURE_LABELS,
             }
             x_keys_fixed = [
                 "exclusive_area", "supply_area", "completion_date", "built_year",
-                "floor", "total_floor", "room_count", "bath_count", "parking_count",
+                "floor", "total_floor", "floor_level", "room_count", "bath_count", "parking_count",
                 "building_type", "room_living_type", "parking_info", "main_room_direction",
+                "mart_nearest_m", "mart_count_300m", "mart_count_500m", "mart_count_1000m",
             ]
-            x_keys = [c for c in x_keys_fixed if c in df.columns]
-            y_keys = [c for c in ["deposit", "rent"] if c in df.columns]
-            hue_keys = [c for c in ["building_type", "room_living_type", "parking_info", "main_room_direction"] if c in df.columns]
+            # 마트 접근성 컬럼은 DB가 아니라 스냅샷에만 있음 (동기화 때 매물마다 미리 계산)
+            # -> 선택지는 고정 스키마로 만들고, 스냅샷은 마트 컬럼을 고른 경우에만 읽음
+            mart_cols = set(MART_FEATURE_LABELS)
+            x_keys = [c for c in x_keys_fixed if c in available_cols or c in mart_cols]
+            y_keys = [c for c in ["deposit", "rent"] if c in available_cols]
+            hue_keys = [c for c in ["building_type", "room_living_type", "parking_info", "main_room_direction", "floor_level"] if c in available_cols]
 
             x_map = {LABELS.get(k, k): k for k in x_keys}
             y_map = {LABELS.get(k, k): k for k in y_keys}
@@ -242,7 +174,23 @@ if page == "가격":
             y_option = y_map.get(y_label)
             hue_option = None if hue_label == "없음" else hue_map.get(hue_label)
 
-            df_plot = df.copy()
+            # 현재 차트가 쓰는 컬럼만 조회 (라인 차트는 월세 + 준공년도 추가)
+            plot_cols = [x_option, y_option, hue_option]
+            if chart_type != "산점도(기본)":
+                plot_cols += ["rent", "built_year"]
+            if not (x_option and y_option):
+                df_plot = None
+            elif mart_cols.intersection(plot_cols):
+                snapshot_df = get_room2_data()
+                if snapshot_df is not None and mart_cols.intersection(plot_cols) <= set(snapshot_df.columns):
+                    df_plot = snapshot_df[[c for c in dict.fromkeys(plot_cols) if c in snapshot_df.columns]]
+                else:
+                    if snapshot_df is not None:
+                        st.warning("스냅샷에 마트 접근성 컬럼이 없습니다. `python room_features.py`로 계산한 뒤 다시 시도하세요.")
+                    df_plot = None
+            else:
+                df_plot = get_room2_data(price_query(plot_cols, room_cols))
+            df_plot = prepare_price_frame(df_plot) if df_plot is not None else pd.DataFrame()
             if "main_room_direction" in df_plot.columns and (x_option == "main_room_direction" or hue_option == "main_room_direction"):
                 df_plot.dropna(subset=["main_room_direction"], inplace=True)
                 split_vals = df_plot["main_room_direction"].astype(str).str.split("/", expand=True)
@@ -279,7 +227,7 @@ if page == "가격":
                             group_cols = ["연도"]
                             if hue_option:
                                 group_cols.append(hue_option)
-                            grp = df_line.groupby(group_cols)["월세"].median().reset_index()
+                            grp = df_line.groupby(group_cols, observed=True)["월세"].median().reset_index()
 
                             fig = px.line(
                                 grp, x="연도", y="월세", color=hue_option, markers=True,
@@ -295,17 +243,13 @@ if page == "가격":
         # ----------------------------------
         with tab_rent:
             st.markdown("### 🏢 건물유형별 월세 요약")
-            if "building_type" not in df.columns or "rent" not in df.columns:
+            if "building_type" not in room_cols or "rent" not in room_cols:
                 st.warning("`building_type` 또는 `rent` 컬럼이 없어 요약 그래프를 표시할 수 없습니다.")
             else:
-                df_bt = df[["building_type", "rent"]].copy()
-                df_bt["rent"] = pd.to_numeric(df_bt["rent"], errors="coerce")
-                df_bt.dropna(subset=["building_type", "rent"], inplace=True)
-                
-                exclude_pattern = r'^(unknown|다가구\s*\(미등기\)|빌라\s*\(미등기\))$'
-                df_bt = df_bt[~df_bt['building_type'].astype(str).str.strip().str.contains(exclude_pattern, na=False, regex=True)]
+                # 제외 유형 필터와 평균/중앙값/건수 집계는 SQL에서 처리
+                summary = get_room2_data(rent_summary_query())
 
-                if df_bt.empty:
+                if summary is None or summary.empty:
                     st.info("집계할 데이터가 없습니다.")
                 else:
                     view_mode = st.radio("보기", ["요약(막대)", "분포(박스)", "분포(바이올린)"], horizontal=True, key="bt_view_mode")
@@ -316,7 +260,7 @@ if page == "가격":
                         scale_choice = st.selectbox("색상 팔레트", PLOTLY_SCALES, index=PLOTLY_SCALES.index("Blues"), key="bt_rent_scale")
                         
                         y_col = "mean" if stat_choice == "평균" else "median"
-                        grouped = df_bt.groupby("building_type")["rent"].agg(['mean', 'median', 'count']).reset_index()
+                        grouped = summary.sort_values("building_type")
                         
                         if "내림차순" in order_choice: grouped = grouped.sort_values(y_col, ascending=False)
                         elif "오름차순" in order_choice: grouped = grouped.sort_values(y_col, ascending=True)
@@ -329,21 +273,27 @@ if page == "가격":
                         fig_bt.update_layout(xaxis_tickangle=-30, plot_bgcolor="white", coloraxis_colorbar_title_text=f"월세({stat_choice})")
                         st.plotly_chart(fig_bt, use_container_width=True)
                     
-                    elif view_mode == "분포(박스)":
-                        fig_box = px.box(
-                            df_bt, x="building_type", y="rent", points="all", height=520,
-                            labels={"building_type": "건물유형", "rent": "월세"}, title="<b>건물유형별 월세 분포 (박스)</b>"
-                        )
-                        fig_box.update_layout(xaxis_tickangle=-20)
-                        st.plotly_chart(fig_box, use_container_width=True)
+                    else:
+                        # 분포 차트는 (건물유형, 월세) 두 컬럼만 조회
+                        df_bt = get_room2_data(rent_rows_query())
+                        if df_bt is None:
+                            df_bt = pd.DataFrame(columns=["building_type", "rent"])
+
+                        if view_mode == "분포(박스)":
+                            fig_box = px.box(
+                                df_bt, x="building_type", y="rent", points="all", height=520,
+                                labels={"building_type": "건물유형", "rent": "월세"}, title="<b>건물유형별 월세 분포 (박스)</b>"
+                            )
+                            fig_box.update_layout(xaxis_tickangle=-20)
+                            st.plotly_chart(fig_box, use_container_width=True)
                     
-                    else:  # 분포(바이올린)
-                        fig_vio = px.violin(
-                            df_bt, x="building_type", y="rent", box=True, points="all", height=520,
-                            labels={"building_type": "건물유형", "rent": "월세"}, title="<b>건물유형별 월세 분포 (바이올린)</b>"
-                        )
-                        fig_vio.update_layout(xaxis_tickangle=-20)
-                        st.plotly_chart(fig_vio, use_container_width=True)
+                        else:  # 분포(바이올린)
+                            fig_vio = px.violin(
+                                df_bt, x="building_type", y="rent", box=True, points="all", height=520,
+                                labels={"building_type": "건물유형", "rent": "월세"}, title="<b>건물유형별 월세 분포 (바이올린)</b>"
+                            )
+                            fig_vio.update_layout(xaxis_tickangle=-20)
+                            st.plotly_chart(fig_vio, use_container_width=True)
 
 # ==============================
 # 페이지 2: 치안
@@ -358,21 +308,17 @@ elif page == "치안":
     with tab_cctv:
         st.subheader("CCTV 지표")
         try:
-            df_cctv_raw = read_csv_safely("data/cctv.csv")
+            cctv_ds = get_dataset(DATA_SOURCE, "cctv")
         except Exception as e:
             st.error(f"CCTV 데이터를 불러올 수 없습니다(data/cctv.csv): {e}")
             st.stop()
+        df_cctv_raw, df_cctv, cctv_year_cols = cctv_ds.raw, cctv_ds.frame, list(cctv_ds.year_cols)
         
         st.markdown("**원본 미리보기**")
+        st.caption(f"인코딩: {df_cctv_raw.attrs.get('encoding')}")
         st.dataframe(df_cctv_raw.head(), use_container_width=True)
 
-        cctv_year_cols = extract_year_cols(df_cctv_raw, include_preinstalled=False)
-        cctv_drop_cols = [c for c in ["총 계", "총계", "합계"] if c in df_cctv_raw.columns]
-        df_cctv = df_cctv_raw.drop(columns=cctv_drop_cols, errors="ignore")
-        df_cctv = to_numeric_df(df_cctv, cctv_year_cols)
-
         if "구분" in df_cctv.columns:
-            df_cctv = df_cctv[df_cctv["구분"] != "계"]
             cctv_districts = sort_korean(df_cctv["구분"].dropna().unique().tolist())
             cctv_selected = st.multiselect("구 선택", options=cctv_districts, default=cctv_districts, key="cctv_gu_select")
             df_cctv_view = df_cctv[df_cctv["구분"].isin(cctv_selected)] if cctv_selected else pd.DataFrame()
@@ -416,15 +362,16 @@ elif page == "치안":
     with tab_police:
         st.subheader("경찰서 지표")
         try:
-            df_pol_raw = read_csv_safely("data/police.csv")
+            pol_ds = get_dataset(DATA_SOURCE, "police")
         except Exception as e:
             st.error(f"경찰 데이터를 불러올 수 없습니다(data/police.csv): {e}")
             st.stop()
+        df_pol_raw, df_pol = pol_ds.raw, pol_ds.frame
 
         st.markdown("**원본 미리보기**")
+        st.caption(f"인코딩: {df_pol_raw.attrs.get('encoding')}")
         st.dataframe(df_pol_raw.head(), use_container_width=True)
 
-        df_pol = police_sum_by_year(df_pol_raw)
         st.markdown("**연도별 합친 데이터(미리보기)**")
         st.dataframe(df_pol.head(), use_container_width=True)
 
@@ -458,6 +405,21 @@ elif page == "치안":
                 )
                 fig_pol.update_layout(plot_bgcolor="white", coloraxis_colorbar_title_text="합계")
                 st.plotly_chart(fig_pol, use_container_width=True)
+
+                # 유형별(지구대/파출소/치안센터) 드릴다운: 레지스트리의 (연도, 유형) 세부 표를 그대로 사용
+                pol_year_num = int(pol_year_choice[:4])
+                if pol_ds.detail is not None and pol_year_num in pol_ds.detail.columns.get_level_values("연도"):
+                    st.markdown(f"**{pol_year_choice} 유형별 세부**")
+                    df_type = pol_ds.detail.loc[plot_df.index, pol_year_num]
+                    df_type.insert(0, id_col, plot_df[id_col])
+                    df_type_long = df_type.melt(id_vars=id_col, var_name="유형", value_name="개수")
+                    fig_pol_type = px.bar(
+                        df_type_long, y=id_col, x="개수", color="유형", barmode="stack",
+                        title=f"{pol_year_choice} {id_col}별 유형 구성", height=700,
+                        category_orders={id_col: plot_df[id_col].tolist()}
+                    )
+                    fig_pol_type.update_layout(plot_bgcolor="white")
+                    st.plotly_chart(fig_pol_type, use_container_width=True)
             else:
                 st.info("연도 컬럼을 찾지 못했습니다. 원본 컬럼명을 확인해 주세요.")
 
@@ -467,7 +429,7 @@ elif page == "치안":
     with tab_crime:
         st.subheader("연도별 자치구 범죄 발생 현황")
         try:
-            df_crime = pd.read_csv("data/crime.csv")
+            df_crime = get_dataset(DATA_SOURCE, "crime").frame
         except Exception as e:
             st.error(f"범죄 데이터를 불러올 수 없습니다(data/crime.csv): {e}")
             st.stop()
@@ -484,10 +446,6 @@ elif page == "치안":
         df_view_crime = df_crime[df_crime["자치구별"].astype(str).isin(selected_districts)] if selected_districts else pd.DataFrame()
         
         if not df_view_crime.empty:
-            year_cols = [c for c in df_view_crime.columns if c.endswith("년")]
-            for col in year_cols:
-                df_view_crime[col] = pd.to_numeric(df_view_crime[col], errors='coerce').fillna(0).astype(int)
-
             df_long = pd.melt(df_view_crime, id_vars=['자치구별'], var_name='년도', value_name='발생 횟수')
             df_long.sort_values(by=['년도', '발생 횟수'], ascending=[True, False], inplace=True)
             
@@ -513,7 +471,15 @@ elif page == "치안":
 
         # --- 지도 히트맵 ---
         st.subheader("서울시 자치구별 연도별 범죄 데이터 히트맵")
-        seoul_geojson_url = "https://raw.githubusercontent.com/southkorea/seoul-maps/master/kostat/2013/json/seoul_municipalities_geo_simple.json"
+        # 자치구 경계: 프로세스당 한 번 읽은 공유 GeoJSON 객체 (Choropleth 레이어와 라벨 위치 모두 이 객체에서 계산)
+        try:
+            boundary = load_boundary(DATA_SOURCE)
+            # 지도 줌(11)에 맞춰 미리 단순화/양자화해 직렬화해 둔 경계 문자열 (경계 버전별 캐시, 라벨은 원본 경계로 계산)
+            # 공유 dict 대신 문자열을 넘기므로 folium은 자기 복사본으로 파싱 (공유 객체를 건드리지 않음)
+            seoul_geo = boundary_layer(boundary, zoom=11).text
+        except Exception as e:
+            st.error(f"자치구 경계(GeoJSON)를 불러올 수 없습니다: {e}")
+            st.stop()
         
         year_list = [c for c in df_crime.columns if c.endswith("년")]
         color_map_list = ['YlOrRd', 'YlGnBu', 'BuPu', 'GnBu', 'PuRd', 'RdPu', 'OrRd', 'BuGn', 'YlGn']
@@ -540,27 +506,19 @@ elif page == "치안":
         final_bins = sorted(list(set(bins)))
 
         folium.Choropleth(
-            geo_data=seoul_geojson_url, data=df_crime, columns=['자치구별', selected_year],
+            geo_data=seoul_geo, data=df_crime, columns=['자치구별', selected_year],
             key_on='feature.properties.name', fill_color=selected_color,
             fill_opacity=0.8, line_opacity=0.3, legend_name=f'{selected_year} 범죄 발생 건수', bins=final_bins
         ).add_to(m)
 
-        geo_data = requests.get(seoul_geojson_url).json()
         crime_data = df_crime.set_index('자치구별')[selected_year].to_dict()
-        for feature in geo_data['features']:
-            gu_name = feature['properties']['name']
+        # 라벨 위치는 경계 버전별로 한 번 계산해 둔 값(면적 가중 무게중심 / 내부 점)을 조회만 함
+        for gu_name, anchor in label_points(boundary).items():
             value = crime_data.get(gu_name, 0)
             rounded_value = int(round(value, -2))
-            
-            coords = feature['geometry']['coordinates']
-            if feature['geometry']['type'] == 'MultiPolygon':
-                coords = max(coords, key=lambda polygon: len(polygon[0]))
-            
-            lon, lat = zip(*coords[0])
-            centroid = [sum(lat) / len(lat), sum(lon) / len(lon)]
-            
+
             folium.Marker(
-                location=centroid,
+                location=list(anchor),
                 icon=folium.DivIcon(
                     icon_size=(150, 40), icon_anchor=(75, 20),
                     html=f'<div style="font-size: 9pt; font-weight: bold; color: #333; text-align: center; width: 150px; text-shadow: -1px 0 white, 0 1px white, 1px 0 white, 0 -1px white;">{gu_name}<br>{rounded_value:,}</div>'
@@ -581,23 +539,52 @@ elif page == "거리":
     villa_address = "서울특별시 영등포구 영등포동2가 34-136"
     villa_latitude = 37.518658826456
     villa_longitude = 126.90620617355
+
+    # 기준 위치: 기본 빌라 또는 스냅샷 매물 (매물은 동기화 때 계산해 둔 마트 접근성 컬럼을 읽기만 함)
+    # 스냅샷은 매물 기준을 켰을 때만 읽고, 동기화에 실패하면 조용히 기본 빌라를 씀 (DB 없이도 동작)
+    listing = None
+    if st.toggle("스냅샷 매물 중에서 기준 위치 선택", key="distance_use_listing"):
+        try:
+            listings = get_room_snapshot().frame()
+            listings = listings.dropna(subset=["property_address", "latitude", "longitude"])
+        except Exception:
+            listings = pd.DataFrame()
+        if listings.empty:
+            st.caption("매물 스냅샷을 불러오지 못해 기본 위치를 사용합니다.")
+        else:
+            listing_pos = st.selectbox(
+                "기준 위치", options=range(len(listings)),
+                format_func=lambda i: str(listings["property_address"].iloc[i]),
+                key="distance_listing",
+            )
+            listing = listings.iloc[listing_pos]
+            villa_address = str(listing["property_address"])
+            villa_latitude, villa_longitude = float(listing["latitude"]), float(listing["longitude"])
     st.write(f"**기준 주소**: {villa_address}")
 
     try:
-        stores_df = pd.read_csv("data/martdata.csv")
-        stores_df.dropna(subset=['latitude', 'longitude'], inplace=True)
+        stores_df = get_dataset(DATA_SOURCE, "mart").frame
     except Exception as e:
         st.error(f"마트 데이터를 불러오는 중 에러가 발생했습니다: {e}")
         stores_df = pd.DataFrame()
 
+    # 가장 가까운 마트의 위치(closest_pos): 매물은 미리 계산된 위치(mart_nearest_pos)를 그대로 쓰고,
+    # 기본 빌라이거나 마트 데이터가 바뀌어 위치가 맞지 않으면 마트 공간 인덱스로 찾음
+    closest_pos = -1
     if not stores_df.empty:
-        closest_store, min_distance = None, float('inf')
-        for _, row in stores_df.iterrows():
-            d = haversine(villa_latitude, villa_longitude, row['latitude'], row['longitude'])
-            if d < min_distance:
-                min_distance, closest_store = d, row
-        if closest_store is not None:
-            st.info(f"가장 가까운 마트는 **{closest_store['name']}** 입니다. (거리: 약 {min_distance:,.0f} 미터)")
+        if listing is not None and pd.notna(listing.get("mart_nearest_pos")):
+            pos = int(listing["mart_nearest_pos"])
+            if pos < len(stores_df) and stores_df["name"].iloc[pos] == listing["mart_nearest_name"]:
+                closest_pos, min_distance = pos, float(listing["mart_nearest_m"])
+        count_cols = [c for c in MART_FEATURE_LABELS if c.startswith("mart_count_")]
+        if listing is not None and all(pd.notna(listing.get(c)) for c in count_cols):
+            st.caption(" · ".join(f"{MART_FEATURE_LABELS[c]} {int(listing[c])}개" for c in count_cols))
+        if closest_pos < 0:
+            nearest_pos, nearest_dist = get_mart_index(DATA_SOURCE).knearest(villa_latitude, villa_longitude, k=1)
+            if len(nearest_pos):
+                closest_pos, min_distance = int(nearest_pos[0]), float(nearest_dist[0])
+        if closest_pos >= 0:
+            st.info(f"가장 가까운 마트는 **{stores_df['name'].iloc[closest_pos]}** 입니다. (거리: 약 {min_distance:,.0f} 미터)")
 
     m = folium.Map(location=[villa_latitude, villa_longitude], zoom_start=17)
     folium.Marker(
@@ -605,16 +592,22 @@ elif page == "거리":
         icon=folium.Icon(color='red', icon='home', prefix='fa')
     ).add_to(m)
 
-    if not stores_df.empty and closest_store is not None:
-        for _, row in stores_df.iterrows():
-            is_closest = row.equals(closest_store)
+    if not stores_df.empty:
+        for pos, row in enumerate(stores_df[['name', 'latitude', 'longitude']].itertuples(index=False)):
+            is_closest = pos == closest_pos
             icon_color = 'green' if is_closest else 'blue'
             icon_shape = 'star' if is_closest else 'shopping-cart'
-            popup_text = f"**가장 가까운 마트:** {row['name']}" if is_closest else f"**{row['name']}**"
-            
+            popup_text = f"**가장 가까운 마트:** {row.name}" if is_closest else f"**{row.name}**"
+
             folium.Marker(
-                location=[row['latitude'], row['longitude']], popup=popup_text,
+                location=[row.latitude, row.longitude], popup=popup_text,
                 icon=folium.Icon(color=icon_color, icon=icon_shape, prefix='fa')
             ).add_to(m)
 
-    st_folium(m, width='100%', height=800)
\ No newline at end of file
+    st_folium(m, width='100%', height=800)
+
+# ---------------------------------------------------------------------
+# [6] 사이드바: 공유 데이터셋 메모리 (모든 세션이 같은 DataFrame을 공유)
+# ---------------------------------------------------------------------
+with st.sidebar.expander("공유 데이터셋 메모리"):
+    st.dataframe(registry_report(), use_container_width=True, hide_index=True)
@@ -3,8 +3,18 @@ import pandas as pd
 import folium
 from streamlit_folium import st_folium
 import json
-import requests # GeoJSON 데이터를 URL에서 직접 로드하기 위해 추가
 import numpy as np # 범례 구간 계산을 위해 numpy 추가
+import sys
+from pathlib import Path
+
+# 공통 로더(data_loader.py 등)는 저장소 루트에 있으므로 import 경로에 추가
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from boundary_geometry import boundary_layer, label_points
+from data_loader import open_source
+from seoul_boundary import load_boundary
+
+# 앱 파일과 같은 디렉토리의 데이터 묶음 (crime.csv, 자치구 경계 GeoJSON)
+DATA_ZIP = Path(__file__).resolve().parent / "data.zip"
 
 # 페이지 레이아웃을 'wide'로 설정하여 넓게 표시합니다.
 st.set_page_config(layout="wide")
@@ -12,15 +22,20 @@ st.title("서울시 자치구별 연도별 범죄 데이터 시각화 🗺️")
 
 # --- 데이터 로드 ---
 
-# 1. 서울시 자치구 경계 GeoJSON 데이터 URL
-seoul_geojson_url = "https://raw.githubusercontent.com/southkorea/seoul-maps/master/kostat/2013/json/seoul_municipalities_geo_simple.json"
+# 1. 서울시 자치구 경계: 프로세스당 한 번 읽은 공유 경계 객체
+#    (data.zip 동봉 파일/로컬 캐시 우선, 재실행마다 네트워크 요청 없음)
+try:
+    boundary = load_boundary(open_source(DATA_ZIP))
+except Exception as e:
+    st.error(f"자치구 경계(GeoJSON)를 불러올 수 없습니다: {e}")
+    st.stop()
 
-# 2. 'crime2.csv' 파일 로드
-# 파일이 streamlit 앱 파일과 같은 디렉토리에 있어야 합니다.
+# 2. data.zip의 'crime.csv' 멤버 로드 (압축 해제 없이 바로 읽음)
+# data.zip이 streamlit 앱 파일과 같은 디렉토리에 있어야 합니다.
 try:
-    df_year = pd.read_csv('data/crime2.csv')
+    df_year = open_source(DATA_ZIP).read_csv("crime.csv")
 except FileNotFoundError:
-    st.error("'crime2.csv' 파일을 찾을 수 없습니다. 앱 파일과 같은 디렉토리에 업로드해주세요.")
+    st.error("data.zip에서 'crime.csv' 파일을 찾을 수 없습니다. 앱 파일과 같은 디렉토리에 data.zip을 두어주세요.")
     st.stop() # 파일이 없으면 앱 실행 중지
 
 # --- 메인 화면 설정 (연도 및 색상 선택) ---
@@ -92,8 +107,9 @@ final_bins = sorted(list(set(bins))) # 중복 제거 및 정렬
 
 
 # Choropleth (단계 구분도) 레이어 추가
+# 지도 줌(11)에 맞춰 미리 단순화/양자화해 직렬화해 둔 경계 문자열 (경계 버전별 캐시)
 folium.Choropleth(
-    geo_data=seoul_geojson_url,
+    geo_data=boundary_layer(boundary, zoom=11).text,
     data=df_year,
     columns=['자치구별', selected_year],
     key_on='feature.properties.name',
@@ -107,36 +123,20 @@ folium.Choropleth(
 
 # --- 지도에 자치구 이름과 반올림된 값 표시 ---
 
-# URL에서 GeoJSON 데이터를 직접 로드하여 파이썬 객체로 변환
-geo_data = requests.get(seoul_geojson_url).json()
-
 # 표시할 데이터 (자치구별 범죄 건수)
 crime_data = df_year.set_index('자치구별')[selected_year].to_dict()
 
-# GeoJSON 데이터를 사용하여 각 자치구의 중심점을 계산하고 이름과 값을 표시합니다.
-for feature in geo_data['features']:
-    gu_name = feature['properties']['name']
-    
+# 라벨 위치는 경계 버전별로 한 번 계산해 둔 값(면적 가중 무게중심 / 내부 점)을 조회만 함
+for gu_name, anchor in label_points(boundary).items():
     # 해당 자치구의 범죄 건수 가져오기
     value = crime_data.get(gu_name, 0)
     # 값을 백의 자리로 반올림 (10의 자리에서 반올림)
     rounded_value = int(round(value, -2))
 
-    # 자치구의 중심점(centroid)을 간단히 계산합니다.
-    coords = feature['geometry']['coordinates']
-    
-    # MultiPolygon의 경우, 가장 큰 폴리곤의 중심점을 사용합니다.
-    if feature['geometry']['type'] == 'MultiPolygon':
-        largest_polygon = max(coords, key=lambda polygon: len(polygon[0]))
-        coords = largest_polygon
-
-    lon, lat = zip(*coords[0])
-    centroid = [sum(lat) / len(lat), sum(lon) / len(lon)]
-
     # folium.Marker와 DivIcon을 사용하여 텍스트 라벨을 추가합니다.
     # 자치구 이름과 반올림된 값을 함께 표시합니다.
     folium.Marker(
-        location=centroid,
+        location=list(anchor),
         icon=folium.DivIcon(
             icon_size=(150,40), # 아이콘 크기 높이 조절
             icon_anchor=(75,20), # 아이콘 앵커 조절
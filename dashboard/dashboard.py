@@ -10,7 +10,9 @@
 # =============================================================================
 
 import io
-import re
+import sys
+from pathlib import Path
+
 import pandas as pd
 import numpy as np
 import streamlit as st
@@ -19,78 +21,26 @@ import streamlit as st
 import folium
 from streamlit_folium import st_folium
 import json
-import requests 
+
+# 공통 로더(data_loader.py)는 저장소 루트에 있으므로 import 경로에 추가
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from boundary_geometry import boundary_layer, label_points
+from data_loader import open_source
+from hangul import sort_korean
+from room_data import prepare_price_frame
+from room_features import MART_FEATURE_LABELS, listing_districts
+from room_snapshot import get_room_snapshot
+from safety_data import get_dataset
+from seoul_boundary import load_boundary
 
 st.set_page_config(page_title="Select Dashboard", layout="wide")
 
+# 입력 데이터는 data.zip 하나로 배포 (압축 해제 없이 탭에서 필요할 때 멤버를 직접 읽음)
+DATA_ZIP = Path(__file__).resolve().parent / "data.zip"
+
 # ---------------------------------------------------------------------
 # [Helpers] 공통 유틸 함수
 # ---------------------------------------------------------------------
-def read_csv_safely(path, encodings=("utf-8", "cp949", "euc-kr")):
-    """CSV를 인코딩 후보 목록을 바꿔가며 안전하게 읽기."""
-    last_err = None
-    for enc in encodings:
-        try:
-            return pd.read_csv(path, encoding=enc)
-        except Exception as e:
-            last_err = e
-    raise last_err
-
-
-def to_numeric_df(df, cols):
-    """쉼표 제거 후, 지정한 컬럼들을 숫자형으로 변환."""
-    out = df.copy()
-    out[cols] = out[cols].replace({",": ""}, regex=True)
-    for c in cols:
-        out[c] = pd.to_numeric(out[c], errors="coerce")
-    return out
-
-
-def extract_year_cols(df, include_preinstalled=False):
-    """
-    '년'이 포함된 컬럼만 추출 (연도형 컬럼 후보).
-    - include_preinstalled=False 이면 '이전' 이 들어간 누계형 컬럼은 제외
-    """
-    year_cols = [c for c in df.columns if "년" in str(c)]
-    if not include_preinstalled:
-        year_cols = [c for c in year_cols if "이전" not in str(c)]
-    return year_cols
-
-
-def police_sum_by_year(df):
-    """
-    (경찰 데이터) 같은 연도의 지구대/파출소/치안센터 등 세부 컬럼을 합쳐
-    '{YYYY}년' 단일 컬럼으로 만들고 원본 세부 컬럼은 제거.
-    """
-    year_pattern = re.compile(r"(20[0-3]\d)")
-    year_groups = {}
-    for col in df.columns:
-        m = year_pattern.search(str(col))
-        if m:
-            year = m.group(1)
-            year_groups.setdefault(year, []).append(col)
-
-    out = df.copy()
-    for year, cols in year_groups.items():
-        tmp = out[cols].replace({",": ""}, regex=True)
-        for c in cols:
-            tmp[c] = pd.to_numeric(tmp[c], errors="coerce")
-        out[f"{year}년"] = tmp.sum(axis=1)
-
-    cols_to_drop = [c for cols in year_groups.values() for c in cols]
-    out = out.drop(columns=cols_to_drop, errors="ignore")
-
-    def is_year_col(c):
-        return bool(year_pattern.search(str(c)))
-
-    id_cols = [c for c in out.columns if not is_year_col(c)]
-    year_cols = sorted(
-        [c for c in out.columns if is_year_col(c)],
-        key=lambda x: int(re.search(r"(20[0-3]\d)", x).group(1))
-    )
-    return out[id_cols + year_cols]
-
-
 def apply_sort(df, value_col, order_choice):
     """정렬 옵션(내림/오름/원본)에 따라 정렬 적용."""
     if order_choice == "내림차순(많은→적은)":
@@ -100,21 +50,6 @@ def apply_sort(df, value_col, order_choice):
     return df
 
 
-def sort_korean(items):
-    """한글 '가나다' 순 정렬 (로케일 미지원 환경에서는 일반 정렬 폴백)."""
-    try:
-        import locale
-        for loc in ("ko_KR.UTF-8", "Korean_Korea.949", "ko_KR"):
-            try:
-                locale.setlocale(locale.LC_ALL, loc)
-                break
-            except Exception:
-                pass
-        return sorted(items, key=locale.strxfrm)
-    except Exception:
-        return sorted(items)
-
-
 # plotly 연속형 팔레트 목록
 PLOTLY_SCALES = [
     "Blues", "Viridis", "Plasma", "Cividis", "Turbo",
@@ -138,51 +73,30 @@ st.title("셀렉 대시보드")
 if page == "가격":
     st.subheader("💰 가격 분석")
 
-    # mariadb는 설치 환경에 따라 없을 수 있으므로 페이지 내부에서 import
-    try:
-        import mariadb
-    except Exception as e:
-        st.error(f"mariadb 모듈이 필요합니다. 설치 후 다시 시도하세요. (pip install mariadb)\n에러: {e}")
-        st.stop()
-
     def get_room2_data():
-        """MariaDB에서 room 테이블 전체 데이터를 조회하여 DataFrame으로 반환."""
+        """room 테이블 전체 데이터를 DataFrame으로 반환 (로컬 스냅샷에 새 매물만 증분 동기화)."""
         try:
-            conn = mariadb.connect(
-                host='localhost',
-                port=3310,
-                database='bangu',
-                user='root',
-                password='1234'
-            )
-            df = pd.read_sql("SELECT * FROM room", conn)
-            conn.close()
-            return df
+            snapshot = get_room_snapshot()
+            # 경계 파일이 생기기 전에 적재된 매물에도 자치구를 채움 (스냅샷/경계 버전마다 한 번만 검사)
+            listing_districts(snapshot)
+            return snapshot.frame()
         except Exception as e:
             st.error(f"데이터 조회 실패: {e}")
             return None
 
-    def add_day_to_date(s):
-        """날짜 문자열 보정: 'YYYY' → 'YYYY-01-01', 'YYYY-MM' → 'YYYY-MM-01'."""
-        if pd.isna(s):
-            return s
-        s = str(s).replace('.', '-')
-        parts = s.split('-')
-        if len(parts) == 1:
-            return f"{parts[0]}-01-01"
-        elif len(parts) == 2:
-            return f"{parts[0]}-{parts[1]}-01"
-        return s
-
     # DB 조회
     df = get_room2_data()
     if df is not None:
+        sync = get_room_snapshot().last_sync
+        st.caption(
+            f"스냅샷 {sync.get('rows', len(df)):,}행 · 이번 동기화 {sync.get('fetched', 0):,}행 "
+            f"({'전체' if sync.get('full') else '증분'}, {sync.get('ms', 0):,.1f} ms) · 기준 {sync.get('created_at')}"
+        )
+        if sync.get("error"):
+            st.warning(f"DB 동기화에 실패해 저장된 스냅샷을 표시합니다. ({sync['error']})")
         # ===== 전처리 (기존 그대로) =====
-        df['building_type'] = df.get('building_type', pd.Series(index=df.index)).fillna('unknown')
-        df['room_living_type'] = df.get('room_living_type', pd.Series(index=df.index)).fillna('unknown')
-        if 'completion_date' in df.columns:
-            df['completion_date'] = df['completion_date'].apply(add_day_to_date)
-            df['completion_date'] = pd.to_datetime(df['completion_date'], errors='coerce')
+        # 결측 유형 'unknown' 처리 + 준공일 정규화/준공년도(built_year) 생성
+        df = prepare_price_frame(df)
 
         # ===== 탭 구성 =====
         tab_scatter, tab_rent = st.tabs(["📈 조건에 따른 월세/보증금 요약", "🏢 건물유형별 월세 요약"])
@@ -201,10 +115,12 @@ if page == "가격":
                 "room_living_type": "거주 형태",
                 "parking_info": "주차 정보",
                 "main_room_direction": "주실 방향",
+                # 마트 접근성 (스냅샷 동기화 때 미리 계산된 컬럼)
+                **MART_FEATURE_LABELS,
             }
 
             # 존재하는 컬럼만 대상
-            x_keys = [c for c in ['exclusive_area', 'completion_date'] if c in df.columns]
+            x_keys = [c for c in ['exclusive_area', 'completion_date', 'mart_nearest_m', 'mart_count_1000m'] if c in df.columns]
             y_keys = [c for c in ['deposit', 'rent'] if c in df.columns]
             hue_keys = [c for c in ['building_type','room_living_type','parking_info','main_room_direction'] if c in df.columns]
 
@@ -288,9 +204,8 @@ if page == "가격":
                 df_bt["rent"] = pd.to_numeric(df_bt["rent"], errors="coerce")
                 df_bt = df_bt.dropna(subset=["building_type", "rent"])
 
-                # ✅ 여기 추가: 미등기·unknown 제외
-                exclude_pattern = r'^(unknown|다가구\s*\(미등기\)|빌라\s*\(미등기\))$'
-                df_bt = df_bt[~df_bt['building_type'].astype(str).str.strip().str.contains(exclude_pattern, na=False)]
+                # 미등기·unknown 제외 (적재 때 카테고리 단위로 미리 계산한 마스크 사용)
+                df_bt = df_bt[~df.loc[df_bt.index, "building_type_excluded"].to_numpy()]
 
                 if df_bt.empty:
                     st.info("집계할 데이터가 없습니다.")
@@ -302,7 +217,7 @@ if page == "가격":
 
                     # 집계
                     grouped = (
-                        df_bt.groupby("building_type")["rent"]
+                        df_bt.groupby("building_type", observed=True)["rent"]
                         .agg(mean="mean", median="median", count="count")
                         .reset_index()
                     )
@@ -344,7 +259,7 @@ elif page == "거리":
     # 필요한 라이브러리
     import folium
     from streamlit_folium import st_folium
-    from math import radians, sin, cos, sqrt, atan2
+    from spatial_index import get_mart_index
 
     # --- 1) 빌라 정보 & UI ---
     st.markdown("### 지도에 영등포구 주소 표시하기")
@@ -360,37 +275,25 @@ elif page == "거리":
 
     # --- 2) martdata.csv 읽기 ---
     try:
-        stores_df = pd.read_csv("./EDA/data/martdata.csv")  # 필요 시 'data/martdata.csv'로 변경
+        # 위도/경도 없는 행은 레지스트리에서 한 번만 제거
+        stores_df = get_dataset(open_source(DATA_ZIP), "mart").frame
         st.success("대규모점포 데이터를 성공적으로 불러왔습니다.")
-        # 위도/경도 없는 행 제거
-        stores_df = stores_df.dropna(subset=['latitude', 'longitude']).copy()
         st.write(f"지도에 표시될 유효한 데이터 수: **{len(stores_df)}**개")
     except FileNotFoundError:
-        st.error("`martdata.csv` 파일을 찾을 수 없습니다. 파일을 업로드하거나 올바른 경로에 위치시켜주세요.")
+        st.error("data.zip에서 `martdata.csv` 파일을 찾을 수 없습니다. 앱 파일과 같은 디렉토리에 data.zip을 두어주세요.")
         stores_df = pd.DataFrame()
     except Exception as e:
         st.error(f"데이터를 불러오는 중 에러가 발생했습니다: {e}")
         stores_df = pd.DataFrame()
 
-    # --- 3) 가장 가까운 마트 계산 (Haversine) ---
-    def haversine(lat1, lon1, lat2, lon2):
-        R = 6371000  # m
-        lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
-        dlon = lon2 - lon1
-        dlat = lat2 - lat1
-        a = sin(dlat / 2)**2 + cos(lat1) * cos(lat2) * sin(dlon / 2)**2
-        c = 2 * atan2(sqrt(a), sqrt(1 - a))
-        return R * c
-
-    closest_store, min_distance = None, float('inf')
+    # --- 3) 가장 가까운 마트 계산 (공간 인덱스) ---
+    # 마트 공간 인덱스(프로세스당 한 번 생성)로 가장 가까운 마트를 찾고, 위치(closest_pos)로 기억
+    closest_pos = -1
     if not stores_df.empty:
-        for _, row in stores_df.iterrows():
-            d = haversine(villa_latitude, villa_longitude, row['latitude'], row['longitude'])
-            if d < min_distance:
-                min_distance, closest_store = d, row
-
-        if closest_store is not None:
-            st.info(f"가장 가까운 마트는 **{closest_store['name']}** 입니다. (거리: 약 {min_distance:,.0f} 미터)")
+        nearest_pos, nearest_dist = get_mart_index(open_source(DATA_ZIP)).knearest(villa_latitude, villa_longitude, k=1)
+        if len(nearest_pos):
+            closest_pos, min_distance = int(nearest_pos[0]), float(nearest_dist[0])
+            st.info(f"가장 가까운 마트는 **{stores_df['name'].iloc[closest_pos]}** 입니다. (거리: 약 {min_distance:,.0f} 미터)")
 
     # --- 4) Folium 지도 표시 ---
     m = folium.Map(location=[villa_latitude, villa_longitude], zoom_start=17)
@@ -404,18 +307,18 @@ elif page == "거리":
 
     # 마트 마커
     if not stores_df.empty:
-        for _, row in stores_df.iterrows():
-            if closest_store is not None and row.equals(closest_store):
+        for pos, row in enumerate(stores_df[['name', 'latitude', 'longitude']].itertuples(index=False)):
+            if pos == closest_pos:
                 # 가장 가까운 마트: 초록 별
                 icon = folium.Icon(color='green', icon='star', prefix='fa')
-                popup = f"**가장 가까운 마트:** {row['name']}"
+                popup = f"**가장 가까운 마트:** {row.name}"
             else:
                 # 그 외 마트: 파란 쇼핑카트
                 icon = folium.Icon(color='blue', icon='shopping-cart', prefix='fa')
-                popup = f"**{row['name']}**"
+                popup = f"**{row.name}**"
 
             folium.Marker(
-                location=[row['latitude'], row['longitude']],
+                location=[row.latitude, row.longitude],
                 popup=popup,
                 icon=icon
             ).add_to(m)
@@ -442,25 +345,17 @@ elif page == "치안":
         st.subheader("CCTV 지표")
 
         # CCTV CSV 읽기
+        # (연도형 컬럼 숫자 변환 + 총계 컬럼/'계' 행 제거는 레지스트리에서 한 번만 수행)
         try:
-            df_cctv_raw = read_csv_safely("data/cctv.csv")
+            cctv_ds = get_dataset(open_source(DATA_ZIP), "cctv")
         except Exception as e:
-            st.error(f"CCTV 데이터를 불러올 수 없습니다(data/cctv.csv): {e}")
+            st.error(f"CCTV 데이터를 불러올 수 없습니다(data.zip:cctv.csv): {e}")
             st.stop()
+        df_cctv_raw, df_cctv, cctv_year_cols = cctv_ds.raw, cctv_ds.frame, list(cctv_ds.year_cols)
 
         st.markdown("**원본 미리보기**")
         st.dataframe(df_cctv_raw.head(), use_container_width=True)
 
-        # 연도형 컬럼 + 숫자 변환
-        cctv_year_cols = extract_year_cols(df_cctv_raw, include_preinstalled=False)
-        cctv_drop_cols = [c for c in ["총 계","총계","합계"] if c in df_cctv_raw.columns]
-        df_cctv = df_cctv_raw.drop(columns=cctv_drop_cols, errors="ignore")
-        df_cctv = to_numeric_df(df_cctv, cctv_year_cols)
-
-        # '계' 행 제거
-        if "구분" in df_cctv.columns:
-            df_cctv = df_cctv[df_cctv["구분"] != "계"]
-
         # 구 멀티셀렉트(가나다순) — 기본: 전체 선택
         if "구분" in df_cctv.columns:
             cctv_districts = sort_korean(df_cctv["구분"].dropna().unique().tolist())
@@ -532,17 +427,17 @@ elif page == "치안":
         st.subheader("경찰서 지표")
 
         # 경찰 CSV 읽기
+        # 연도별 합치기(지구대/파출소/치안센터 → '{YYYY}년')는 레지스트리에서 한 번만 수행
         try:
-            df_pol_raw = read_csv_safely("data/police.csv")
+            pol_ds = get_dataset(open_source(DATA_ZIP), "police")
         except Exception as e:
-            st.error(f"경찰 데이터를 불러올 수 없습니다(data/police.csv): {e}")
+            st.error(f"경찰 데이터를 불러올 수 없습니다(data.zip:police.csv): {e}")
             st.stop()
+        df_pol_raw, df_pol = pol_ds.raw, pol_ds.frame
 
         st.markdown("**원본 미리보기**")
         st.dataframe(df_pol_raw.head(), use_container_width=True)
 
-        # 연도별 합치기(지구대/파출소/치안센터 → '{YYYY}년')
-        df_pol = police_sum_by_year(df_pol_raw)
         st.markdown("**연도별 합친 데이터(미리보기)**")
         st.dataframe(df_pol.head(), use_container_width=True)
 
@@ -640,24 +535,11 @@ elif page == "치안":
         # -----------------------------
         # (추가) 가나다 정렬 + 구 멀티 선택
         # -----------------------------
-        def sort_korean(items):
-            try:
-                import locale
-                for loc in ("ko_KR.UTF-8", "Korean_Korea.949", "ko_KR"):
-                    try:
-                        locale.setlocale(locale.LC_ALL, loc)
-                        break
-                    except:
-                        pass
-                return sorted(items, key=locale.strxfrm)
-            except:
-                return sorted(items)
-
         try:
-            # 데이터 불러오기 (기존 유지)
-            df_year = pd.read_csv("data/crime2.csv")
+            # 데이터 불러오기 (연도 컬럼 정수 변환은 레지스트리에서 한 번만 수행)
+            df_year = get_dataset(open_source(DATA_ZIP), "crime").frame
         except FileNotFoundError:
-            st.error("범죄 데이터를 불러올 수 없습니다 (./data/crime2.csv 파일을 확인해주세요.)")
+            st.error("범죄 데이터를 불러올 수 없습니다 (data.zip의 crime.csv 파일을 확인해주세요.)")
             st.stop()
         except Exception as e:
             st.error(f"데이터를 불러오는 중 에러가 발생했습니다: {e}")
@@ -680,12 +562,6 @@ elif page == "치안":
         df_year = df_year[df_year["자치구별"].astype(str).isin(selected_districts)] if selected_districts else df_year.iloc[0:0]
         current_order = selected_districts if selected_districts else all_districts
 
-        # 타입 변환 (기존 유지)
-        columns_to_convert = ['2019년', '2020년', '2021년', '2022년', '2023년']
-        for column in columns_to_convert:
-            if column in df_year.columns:
-                df_year[column] = pd.to_numeric(df_year[column], errors='coerce').fillna(0).astype(int)
-
         # Wide → Long (기존 유지)
         df_long = pd.melt(df_year, id_vars=['자치구별'], var_name='년도', value_name='발생 횟수')
         df_long = df_long.sort_values(by=['년도', '발생 횟수'], ascending=[True, False])
@@ -728,15 +604,23 @@ elif page == "치안":
         # 페이지 레이아웃을 'wide'로 설정하여 넓게 표시합니다.
         st.subheader("서울시 자치구별 연도별 범죄 데이터 히트맵")
 
-        # 1. 서울시 자치구 경계 GeoJSON 데이터 URL
-        seoul_geojson_url = "https://raw.githubusercontent.com/southkorea/seoul-maps/master/kostat/2013/json/seoul_municipalities_geo_simple.json"
+        # 1. 서울시 자치구 경계: 프로세스당 한 번 읽은 공유 GeoJSON 객체
+        #    (동봉 파일/로컬 캐시 우선, Choropleth 레이어와 라벨 위치 모두 이 객체에서 계산하므로 재실행마다 네트워크 요청 없음)
+        try:
+            boundary = load_boundary(open_source(DATA_ZIP))
+            # 지도 줌(11)에 맞춰 미리 단순화/양자화해 직렬화해 둔 경계 문자열 (경계 버전별 캐시, 라벨은 원본 경계로 계산)
+            # 공유 dict 대신 문자열을 넘기므로 folium은 자기 복사본으로 파싱 (공유 객체를 건드리지 않음)
+            seoul_geo = boundary_layer(boundary, zoom=11).text
+        except Exception as e:
+            st.error(f"자치구 경계(GeoJSON)를 불러올 수 없습니다: {e}")
+            st.stop()
 
-        # 2. 'crime2.csv' 파일 로드
-        # 파일이 streamlit 앱 파일과 같은 디렉토리에 있어야 합니다.
+        # 2. data.zip의 'crime.csv' 멤버 로드
+        # data.zip이 streamlit 앱 파일과 같은 디렉토리에 있어야 합니다.
         try:
-            df_year = pd.read_csv('data/crime2.csv')
+            df_year = get_dataset(open_source(DATA_ZIP), "crime").frame
         except FileNotFoundError:
-            st.error("'crime2.csv' 파일을 찾을 수 없습니다. 앱 파일과 같은 디렉토리에 업로드해주세요.")
+            st.error("data.zip에서 'crime.csv' 파일을 찾을 수 없습니다. 앱 파일과 같은 디렉토리에 data.zip을 두어주세요.")
             st.stop() # 파일이 없으면 앱 실행 중지
 
         # --- 메인 화면 설정 (연도 및 색상 선택) ---
@@ -805,7 +689,7 @@ elif page == "치안":
 
         # Choropleth (단계 구분도) 레이어 추가
         folium.Choropleth(
-            geo_data=seoul_geojson_url,
+            geo_data=seoul_geo,
             data=df_year,
             columns=['자치구별', selected_year],
             key_on='feature.properties.name',
@@ -819,36 +703,21 @@ elif page == "치안":
 
         # --- 지도에 자치구 이름과 반올림된 값 표시 ---
 
-        # URL에서 GeoJSON 데이터를 직접 로드하여 파이썬 객체로 변환
-        geo_data = requests.get(seoul_geojson_url).json()
-
         # 표시할 데이터 (자치구별 범죄 건수)
         crime_data = df_year.set_index('자치구별')[selected_year].to_dict()
 
-        # GeoJSON 데이터를 사용하여 각 자치구의 중심점을 계산하고 이름과 값을 표시합니다.
-        for feature in geo_data['features']:
-            gu_name = feature['properties']['name']
-            
+        # 자치구별 라벨 위치(면적 가중 무게중심, 다각형 밖이면 내부 점)는
+        # 경계 버전마다 한 번만 계산해 두고 여기서는 조회만 합니다.
+        for gu_name, anchor in label_points(boundary).items():
             # 해당 자치구의 범죄 건수 가져오기
             value = crime_data.get(gu_name, 0)
             # 값을 백의 자리로 반올림 (10의 자리에서 반올림)
             rounded_value = int(round(value, -2))
 
-            # 자치구의 중심점(centroid)을 간단히 계산합니다.
-            coords = feature['geometry']['coordinates']
-            
-            # MultiPolygon의 경우, 가장 큰 폴리곤의 중심점을 사용합니다.
-            if feature['geometry']['type'] == 'MultiPolygon':
-                largest_polygon = max(coords, key=lambda polygon: len(polygon[0]))
-                coords = largest_polygon
-
-            lon, lat = zip(*coords[0])
-            centroid = [sum(lat) / len(lat), sum(lon) / len(lon)]
-
             # folium.Marker와 DivIcon을 사용하여 텍스트 라벨을 추가합니다.
             # 자치구 이름과 반올림된 값을 함께 표시합니다.
             folium.Marker(
-                location=centroid,
+                location=list(anchor),
                 icon=folium.DivIcon(
                     icon_size=(150,40), # 아이콘 크기 높이 조절
                     icon_anchor=(75,20), # 아이콘 앵커 조절
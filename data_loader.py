@@ -0,0 +1,328 @@
+# data_loader.py | 대시보드 공통 데이터 로더
+# =============================================================================
+# 치안/거리 페이지가 읽는 CSV(data/cctv.csv, police.csv, crime.csv, martdata.csv)
+# 로딩을 한곳에 모은 모듈입니다.
+#
+# 기능 요약:
+# - detect_encoding: BOM과 앞부분 표본만 보고 인코딩을 한 번에 판별(파일별 캐시)
+# - read_csv_safely: 판별한 인코딩으로 CSV를 한 번만 파싱
+# - load_csv_cached: 첫 로드 시 CSV를 Arrow(IPC) 파일로 변환해 두고,
+#   이후에는 메모리 맵으로 바로 읽어 CSV 파싱을 건너뜁니다.
+#   캐시는 원본 파일의 mtime/크기/해시(sha1)를 키로 무효화됩니다.
+# - pyarrow가 없는 환경에서는 캐시 없이 read_csv_safely로 동작합니다.
+# - open_source: 데이터 폴더 또는 data.zip을 같은 방식(read_csv(이름))으로 읽는
+#   데이터 소스. zip은 한 번만 열어 멤버를 색인하고, 필요할 때 압축 해제 없이
+#   멤버를 스트림으로 바로 파싱합니다. (CSV가 아닌 파일은 read_bytes(이름))
+# =============================================================================
+import codecs
+import functools
+import hashlib
+import json
+import os
+import zipfile
+from pathlib import Path
+
+import pandas as pd
+
+# pyarrow는 설치 환경에 따라 없을 수 있으므로 선택적으로 import
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+# 컬럼형 캐시 파일을 저장할 기본 디렉터리
+CACHE_DIR = Path(".cache") / "columnar"
+
+
+# ---------------------------------------------------------------------
+# [1] CSV 읽기
+# ---------------------------------------------------------------------
+# BOM으로 바로 판별할 수 있는 인코딩 (긴 BOM을 먼저 검사)
+_BOMS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+# (절대경로, mtime_ns, 크기, 후보 인코딩) -> 판별된 인코딩
+_ENCODING_CACHE = {}
+
+
+def detect_encoding(path, encodings=("utf-8", "cp949", "euc-kr"), sample_size=64 * 1024):
+    """
+    BOM과 앞부분 표본(sample_size 바이트)만 읽어 CSV 인코딩을 판별합니다.
+    - 후보 인코딩 중 표본을 오류 없이 디코딩하는 첫 번째 인코딩을 고릅니다.
+    - 결과는 파일의 mtime/크기가 바뀌기 전까지 캐시됩니다.
+    - 어떤 후보로도 디코딩되지 않으면 None을 반환합니다.
+    """
+    src = Path(path)
+    stat = src.stat()
+    key = (str(src.resolve()), stat.st_mtime_ns, stat.st_size, tuple(encodings))
+    if key in _ENCODING_CACHE:
+        return _ENCODING_CACHE[key]
+
+    with open(src, "rb") as f:
+        sample = f.read(sample_size)
+    detected = sniff_encoding(sample, encodings, is_whole_file=len(sample) == stat.st_size)
+    _ENCODING_CACHE[key] = detected
+    return detected
+
+
+def sniff_encoding(sample, encodings=("utf-8", "cp949", "euc-kr"), is_whole_file=False):
+    """바이트 표본의 BOM과 디코딩 가능 여부로 인코딩을 판별합니다(판별 실패 시 None)."""
+    for bom, enc in _BOMS:
+        if sample.startswith(bom):
+            return enc
+    for enc in encodings:
+        # 표본 끝에서 잘린 멀티바이트 문자는 오류로 보지 않도록 증분 디코더 사용
+        decoder = codecs.getincrementaldecoder(enc)()
+        try:
+            decoder.decode(sample, final=is_whole_file)
+        except UnicodeDecodeError:
+            continue
+        return enc
+    return None
+
+
+def read_csv_safely(path, encodings=("utf-8", "cp949", "euc-kr"), **read_kwargs):
+    """
+    CSV 인코딩을 먼저 판별한 뒤 한 번만 파싱하여 읽어옵니다.
+    - 사용한 인코딩은 df.attrs["encoding"]에 기록됩니다.
+    - 표본 이후 구간에서 디코딩이 실패하면 나머지 후보로 다시 시도합니다.
+    - read_kwargs는 pd.read_csv에 그대로 전달됩니다(예: thousands=",").
+    """
+    detected = detect_encoding(path, encodings)
+    candidates = [detected] if detected else []
+    candidates += [enc for enc in encodings if enc != detected]
+
+    last_err = None
+    for enc in candidates:
+        try:
+            df = pd.read_csv(path, encoding=enc, **read_kwargs)
+        except Exception as e:
+            last_err = e
+            continue
+        df.attrs["encoding"] = enc
+        return df
+    raise last_err
+
+
+# ---------------------------------------------------------------------
+# [2] 컬럼형(Arrow) 캐시
+# ---------------------------------------------------------------------
+def file_sha1(path, chunk_size=1 << 20):
+    """파일 내용의 sha1 해시(hex)를 계산합니다."""
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _cache_paths(src, cache_dir, read_kwargs=None):
+    """원본 경로(+읽기 옵션)별 캐시 파일(.arrow)과 메타 파일(.json) 경로를 만듭니다."""
+    ident = str(src.resolve())
+    if read_kwargs:
+        ident += json.dumps(read_kwargs, sort_keys=True, ensure_ascii=False, default=str)
+    key = hashlib.sha1(ident.encode("utf-8")).hexdigest()[:12]
+    base = Path(cache_dir) / f"{src.stem}-{key}"
+    return base.with_suffix(".arrow"), base.with_suffix(".json")
+
+
+def _read_meta(meta_path):
+    """메타 파일을 읽습니다. 없거나 깨져 있으면 None을 반환합니다."""
+    try:
+        with open(meta_path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_atomic(path, write_fn):
+    """임시 파일에 쓴 뒤 교체하여, 다른 세션이 반쯤 쓰인 파일을 읽지 않게 합니다."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        write_fn(tmp)
+        os.replace(tmp, path)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+
+def _write_meta(meta_path, meta):
+    def write(tmp):
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+    _write_atomic(meta_path, write)
+
+
+def _write_arrow(df, arrow_path):
+    """DataFrame을 비압축 Arrow IPC 파일로 저장합니다(메모리 맵 가능 형식)."""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+
+    def write(tmp):
+        with pa.OSFile(str(tmp), "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+    _write_atomic(arrow_path, write)
+
+
+def _read_arrow(arrow_path):
+    """Arrow IPC 파일을 메모리 맵으로 열어 DataFrame으로 변환합니다."""
+    # 메모리 맵 객체는 반환된 버퍼가 참조하므로 여기서 닫지 않습니다.
+    source = pa.memory_map(str(arrow_path), "r")
+    return pa.ipc.open_file(source).read_all().to_pandas()
+
+
+def _read_cached(arrow_path, meta):
+    """캐시 파일을 읽고 원본 파싱 때의 인코딩 정보를 복원합니다."""
+    df = _read_arrow(arrow_path)
+    df.attrs["encoding"] = meta.get("encoding")
+    return df
+
+
+def load_csv_cached(path, cache_dir=CACHE_DIR, **read_kwargs):
+    """
+    CSV를 컬럼형 캐시를 거쳐 읽어옵니다.
+    - 원본 파싱 때 사용한 인코딩은 df.attrs["encoding"]으로 확인할 수 있습니다.
+    - 캐시가 원본과 일치하면(mtime/크기 또는 해시) Arrow 파일을 메모리 맵으로 읽습니다.
+    - 그렇지 않으면 read_csv_safely로 파싱한 뒤 캐시를 새로 만듭니다.
+    - pyarrow가 없거나 캐시 저장에 실패하면 파싱 결과를 그대로 반환합니다.
+    - read_kwargs(예: thousands=",")가 다르면 별도의 캐시 파일을 사용합니다.
+    """
+    if pa is None:
+        return read_csv_safely(path, **read_kwargs)
+
+    src = Path(path)
+    stat = src.stat()
+    arrow_path, meta_path = _cache_paths(src, cache_dir, read_kwargs)
+    meta = _read_meta(meta_path)
+
+    digest = None
+    if meta is not None and arrow_path.exists():
+        if meta.get("mtime_ns") == stat.st_mtime_ns and meta.get("size") == stat.st_size:
+            return _read_cached(arrow_path, meta)
+        # mtime만 바뀐 경우(복사/체크아웃 등) 내용 해시가 같으면 캐시를 재사용
+        digest = file_sha1(src)
+        if meta.get("sha1") == digest:
+            meta.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+            _write_meta(meta_path, meta)
+            return _read_cached(arrow_path, meta)
+
+    df = read_csv_safely(src, **read_kwargs)
+    try:
+        _write_arrow(df, arrow_path)
+        _write_meta(meta_path, {
+            "source": str(src),
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "sha1": digest or file_sha1(src),
+            "encoding": df.attrs.get("encoding"),
+        })
+    except (pa.ArrowException, OSError, ValueError, TypeError):
+        # 변환할 수 없는 컬럼 구성이면 캐시 없이 원본 파싱 결과를 사용
+        pass
+    return df
+
+
+# ---------------------------------------------------------------------
+# [3] 데이터 소스 (폴더 / zip)
+# ---------------------------------------------------------------------
+class DirectorySource:
+    """폴더 안의 CSV를 이름으로 읽는 데이터 소스 (컬럼형 캐시 사용)."""
+
+    def __init__(self, root):
+        self.root = Path(root)
+
+    def __contains__(self, name):
+        return (self.root / name).is_file()
+
+    def names(self):
+        return sorted(p.name for p in self.root.glob("*.csv"))
+
+    def read_csv(self, name, **read_kwargs):
+        return load_csv_cached(self.root / name, **read_kwargs)
+
+    def read_bytes(self, name):
+        """CSV가 아닌 파일(GeoJSON 등)을 바이트로 읽습니다."""
+        if name not in self:
+            raise FileNotFoundError(f"{self.root}에 {name} 파일이 없습니다.")
+        return (self.root / name).read_bytes()
+
+
+class ZipSource:
+    """
+    zip 아카이브 안의 CSV를 압축 해제 없이 읽는 데이터 소스.
+    - 아카이브는 한 번만 열고, 멤버 목록(파일명 -> ZipInfo)을 색인해 둡니다.
+    - read_csv 호출 시에만 해당 멤버를 스트림으로 열어 바로 파싱합니다.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._zip = zipfile.ZipFile(self.path)
+        self._members = {
+            Path(info.filename).name: info
+            for info in self._zip.infolist()
+            if not info.is_dir() and not info.filename.startswith("__MACOSX/")
+        }
+        # 멤버 이름 -> 판별된 인코딩
+        self._encodings = {}
+
+    def __contains__(self, name):
+        return name in self._members
+
+    def names(self):
+        return sorted(self._members)
+
+    def detect_encoding(self, name, encodings=("utf-8", "cp949", "euc-kr"), sample_size=64 * 1024):
+        """멤버 앞부분 표본만 풀어서 인코딩을 판별합니다(멤버별 캐시)."""
+        if name not in self._encodings:
+            info = self._members[name]
+            with self._zip.open(info) as f:
+                sample = f.read(sample_size)
+            self._encodings[name] = sniff_encoding(
+                sample, encodings, is_whole_file=len(sample) == info.file_size
+            )
+        return self._encodings[name]
+
+    def read_bytes(self, name):
+        """CSV가 아닌 멤버(GeoJSON 등)를 바이트로 읽습니다."""
+        if name not in self._members:
+            raise FileNotFoundError(f"{self.path}에 {name} 파일이 없습니다.")
+        return self._zip.read(self._members[name])
+
+    def read_csv(self, name, encodings=("utf-8", "cp949", "euc-kr"), **read_kwargs):
+        """멤버를 스트림으로 열어 판별한 인코딩으로 한 번만 파싱합니다."""
+        if name not in self._members:
+            raise FileNotFoundError(f"{self.path}에 {name} 파일이 없습니다.")
+        detected = self.detect_encoding(name, encodings)
+        candidates = [detected] if detected else []
+        candidates += [enc for enc in encodings if enc != detected]
+
+        last_err = None
+        for enc in candidates:
+            try:
+                with self._zip.open(self._members[name]) as f:
+                    df = pd.read_csv(f, encoding=enc, **read_kwargs)
+            except Exception as e:
+                last_err = e
+                continue
+            df.attrs["encoding"] = enc
+            return df
+        raise last_err
+
+
+@functools.lru_cache(maxsize=None)
+def _open_source(path):
+    if path.suffix.lower() == ".zip":
+        return ZipSource(path)
+    return DirectorySource(path)
+
+
+def open_source(path):
+    """
+    경로에 맞는 데이터 소스를 반환합니다(.zip이면 ZipSource, 아니면 DirectorySource).
+    - 같은 경로는 프로세스당 한 번만 열어, Streamlit 재실행마다 zip을 다시 열지 않습니다.
+    """
+    return _open_source(Path(path).resolve())
@@ -0,0 +1,39 @@
+# geo.py | 위경도 거리 계산 (NumPy 벡터화)
+# =============================================================================
+# 기능 요약:
+# - haversine_m: 위경도 배열끼리의 대원 거리(미터)를 브로드캐스팅으로 한 번에 계산
+#   (점 하나 vs 점포 N개, 매물 N개 vs 점포 N개 모두 같은 함수)
+# - nearest: 기준점 하나에서 모든 점포까지의 거리 벡터와 가장 가까운 점포의 위치(argmin)를
+#   한 번에 반환합니다. 마커 강조 등은 행 비교 대신 이 위치로 판정하세요.
+# =============================================================================
+import numpy as np
+
+# 지구 평균 반지름 (미터)
+EARTH_RADIUS_M = 6_371_000.0
+
+
+# ---------------------------------------------------------------------
+# [1] 거리
+# ---------------------------------------------------------------------
+def haversine_m(lat1, lon1, lat2, lon2):
+    """
+    두 지점(또는 배열)의 위도/경도로 대원 거리를 미터 단위로 계산합니다.
+    - 인자는 스칼라/배열 모두 가능하며 NumPy 브로드캐스팅 규칙을 따릅니다.
+    - 결측(NaN) 좌표의 거리는 NaN입니다.
+    """
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(v, dtype=np.float64)) for v in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    # 부동소수 오차로 a가 1을 살짝 넘으면 arcsin이 NaN이 되므로 잘라 둠
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def nearest(lat, lon, lats, lons):
+    """
+    기준점 (lat, lon)에서 (lats, lons) 각 점까지의 거리와 가장 가까운 점의 위치를 반환합니다.
+    - 반환: (위치, 최단 거리(m), 전체 거리 배열). 점이 없거나 모두 결측이면 위치는 -1
+    """
+    distances = haversine_m(lat, lon, lats, lons)
+    if distances.size == 0 or np.isnan(distances).all():
+        return -1, float("nan"), distances
+    pos = int(np.nanargmin(distances))
+    return pos, float(distances[pos]), distances
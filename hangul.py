@@ -0,0 +1,59 @@
+# hangul.py | 로케일 없이 한글 '가나다' 순 정렬
+# =============================================================================
+# 기능 요약:
+# - hangul_key: 한글 음절을 초성/중성/종성 인덱스로 분해한 정렬 키
+#   (locale.setlocale을 쓰지 않으므로 여러 세션 스레드에서 동시에 써도 안전)
+# - sort_korean: 같은 항목 목록에 대한 정렬 결과를 메모이즈하여,
+#   재실행 때마다 같은 구 목록을 다시 정렬하지 않습니다.
+# =============================================================================
+import functools
+
+# 한글 음절 블록 (가 ~ 힣): 초성 19 x 중성 21 x 종성 28
+_SYLLABLE_BASE, _SYLLABLE_LAST = 0xAC00, 0xD7A3
+_MEDIAL_COUNT, _FINAL_COUNT = 21, 28
+
+# 호환용 자모 자음(ㄱ, ㄴ, ...) -> 초성 인덱스 (같은 초성의 음절보다 앞에 오도록)
+_INITIALS = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+_INITIAL_INDEX = {ch: i for i, ch in enumerate(_INITIALS)}
+
+# ---------------------------------------------------------------------
+# [1] 정렬 키
+# ---------------------------------------------------------------------
+@functools.lru_cache(maxsize=4096)
+def _char_key(ch):
+    """문자 하나의 정렬 키: 숫자/영문 < 한글(초성, 중성, 종성) < 기타 문자."""
+    code = ord(ch)
+    if _SYLLABLE_BASE <= code <= _SYLLABLE_LAST:
+        offset = code - _SYLLABLE_BASE
+        initial, rest = divmod(offset, _MEDIAL_COUNT * _FINAL_COUNT)
+        medial, final = divmod(rest, _FINAL_COUNT)
+        return (1, initial, medial, final)
+    if ch in _INITIAL_INDEX:
+        return (1, _INITIAL_INDEX[ch], -1, -1)
+    if code < _SYLLABLE_BASE:
+        return (0, code, 0, 0)
+    return (2, code, 0, 0)
+
+def hangul_key(text):
+    """
+    문자열의 '가나다' 정렬 키를 반환합니다.
+    - 공백은 1차 비교에서 무시하고('중 구' == '중구'), 같으면 원문으로 구분합니다.
+    """
+    text = str(text)
+    return tuple(_char_key(ch) for ch in text if not ch.isspace()), text
+
+# ---------------------------------------------------------------------
+# [2] 정렬
+# ---------------------------------------------------------------------
+@functools.lru_cache(maxsize=256)
+def _sorted_korean(items):
+    return tuple(sorted(items, key=hangul_key))
+
+def sort_korean(items):
+    """한글 '가나다' 순으로 정렬합니다(같은 항목 목록은 캐시된 결과를 재사용)."""
+    items = tuple(items)
+    try:
+        return list(_sorted_korean(items))
+    except TypeError:
+        # 해시할 수 없는 항목이 섞인 경우 캐시 없이 정렬
+        return sorted(items, key=hangul_key)
@@ -0,0 +1,306 @@
+# listing_store.py | 스크랩 배치용 파티션 Parquet 매물 저장소 (추가 전용)
+# =============================================================================
+# 기능 요약:
+# - ListingStore.append: 스크랩 배치를 created_at 날짜 / 자치구로 파티션된
+#   Parquet 데이터셋(root/created_date=YYYY-MM-DD/gu=○○구/*.parquet)에 추가
+# - property_url 중복 제거: URL의 64비트 해시를 정렬된 uint64 배열(seen.npy,
+#   URL당 8바이트)로 보관하고, 배치마다 searchsorted 한 번으로 이미 본 URL을 걸러냄
+# - compact: 작은 파일이 여러 개 쌓인 파티션을 하나로 합침 (start_compactor로 백그라운드 실행)
+# - query: 자치구 / 날짜 구간 조건에 맞는 파티션 디렉터리만 읽음 (partition pruning)
+#
+# 사용법:
+#   python listing_store.py ingest room_data_export.csv [--root 경로]
+#   python listing_store.py compact [--root 경로]
+#
+# ⚠️ 파일을 먼저 쓰고 seen-set을 나중에 저장하므로, 그 사이에 중단되면 같은 배치를 다시
+#    넣을 때 중복 행이 생길 수 있습니다(유실은 없음). compact가 파티션 안의 중복 URL을 정리합니다.
+# =============================================================================
+import argparse
+import os
+import shutil
+import threading
+import time
+import uuid
+from pathlib import Path
+from urllib.parse import unquote
+
+import numpy as np
+import pandas as pd
+
+import data_loader
+from seoul_regions import extract_regions
+
+# pyarrow는 설치 환경에 따라 없을 수 있으므로 선택적으로 import
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = ds = pq = None
+
+STORE_DIR = Path(".cache") / "listings"
+
+# 파티션 컬럼 (hive 형식 디렉터리 이름)
+PARTITION_COLUMNS = ("created_date", "gu")
+
+# 주소에서 자치구를 찾지 못한 행의 파티션 이름
+UNKNOWN_GU = "기타"
+
+# URL 해시 키 (바꾸면 저장된 seen-set과 호환되지 않음)
+_HASH_KEY = "bangu-listing-01"
+
+
+# ---------------------------------------------------------------------
+# [1] 헬퍼
+# ---------------------------------------------------------------------
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("pyarrow가 필요합니다. (pip install pyarrow)")
+
+
+def has_url(urls):
+    """URL이 있는 행의 불리언 배열 (결측/빈 문자열은 중복 판정 대상이 아님)."""
+    urls = pd.Series(urls, dtype=object)
+    return (urls.notna() & (urls.astype(str).str.strip() != "")).to_numpy()
+
+
+def url_hashes(urls):
+    """URL Series를 64비트 해시(uint64) 배열로 변환합니다(벡터화, URL이 없는 행은 has_url로 따로 거를 것)."""
+    values = pd.Series(urls, dtype=object).fillna("").astype(str).to_numpy(dtype=object)
+    return pd.util.hash_array(values, hash_key=_HASH_KEY, categorize=False)
+
+
+def partition_keys(df):
+    """created_at / property_address로 파티션 컬럼(created_date, gu)을 만듭니다."""
+    created = pd.Series(pd.NaT, index=df.index)
+    if "created_at" in df.columns:
+        created = pd.to_datetime(df["created_at"], errors="coerce")
+    created_date = created.dt.strftime("%Y-%m-%d").fillna("unknown")
+    address = df["property_address"] if "property_address" in df.columns else pd.Series(None, index=df.index)
+    gu = extract_regions(address)["gu"].astype(object).fillna(UNKNOWN_GU)
+    return pd.DataFrame({"created_date": created_date.astype(str), "gu": gu.astype(str)}, index=df.index)
+
+
+def _to_arrow(df):
+    """저장용 Arrow 테이블: 카테고리는 문자열로, 값이 전부 결측인 컬럼은 string 타입으로 고정."""
+    out = df.copy(deep=False)
+    for c in out.columns:
+        if isinstance(out[c].dtype, pd.CategoricalDtype):
+            out[c] = out[c].astype("string")
+    table = pa.Table.from_pandas(out, preserve_index=False)
+    for i, field in enumerate(table.schema):
+        if pa.types.is_null(field.type):
+            table = table.set_column(i, pa.field(field.name, pa.string()), table.column(i).cast(pa.string()))
+    return table
+
+
+# ---------------------------------------------------------------------
+# [2] seen-set (중복 URL 판정)
+# ---------------------------------------------------------------------
+class SeenSet:
+    """정렬된 uint64 해시 배열로 본 URL을 기억합니다(파일: .npy, URL당 8바이트)."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        try:
+            self.hashes = np.load(self.path)
+        except (OSError, ValueError):
+            self.hashes = np.empty(0, dtype=np.uint64)
+
+    def __len__(self):
+        return len(self.hashes)
+
+    def contains(self, hashes):
+        """hashes 각각이 이미 본 값인지 불리언 배열로 반환합니다."""
+        if len(self.hashes) == 0:
+            return np.zeros(len(hashes), dtype=bool)
+        pos = np.searchsorted(self.hashes, hashes)
+        pos = np.minimum(pos, len(self.hashes) - 1)
+        return self.hashes[pos] == hashes
+
+    def add(self, hashes):
+        self.hashes = np.union1d(self.hashes, np.asarray(hashes, dtype=np.uint64))
+
+    def save(self):
+        def write(tmp):
+            with open(tmp, "wb") as f:
+                np.save(f, self.hashes)
+        data_loader._write_atomic(self.path, write)
+
+
+# ---------------------------------------------------------------------
+# [3] 저장소
+# ---------------------------------------------------------------------
+class ListingStore:
+    """created_date / gu로 파티션된 추가 전용 Parquet 매물 저장소."""
+
+    def __init__(self, root=STORE_DIR):
+        _require_pyarrow()
+        self.root = Path(root)
+        self.data_dir = self.root / "data"
+        self.seen = SeenSet(self.root / "seen.npy")
+        self._lock = threading.Lock()
+        self._compactor = None
+        self.partitioning = ds.partitioning(
+            pa.schema([(c, pa.string()) for c in PARTITION_COLUMNS]), flavor="hive",
+        )
+
+    # --- 추가 -------------------------------------------------------
+    def append(self, batch):
+        """
+        배치를 추가하고 새로 저장한 행 수를 반환합니다.
+        - 이미 저장된 URL과 배치 안의 중복 URL(마지막 행 유지)은 건너뜁니다.
+        - property_url이 없는(결측/빈 문자열) 행은 중복 판정 없이 모두 저장하고 seen-set에도 넣지 않습니다.
+        """
+        if batch.empty:
+            return 0
+        batch = batch.reset_index(drop=True)
+        keyed = has_url(batch["property_url"])
+        hashes = url_hashes(batch["property_url"])
+        with self._lock:
+            dup = np.zeros(len(batch), dtype=bool)
+            dup[keyed] = pd.Series(hashes[keyed]).duplicated(keep="last").to_numpy()
+            fresh = ~(self.seen.contains(hashes) & keyed) & ~dup
+            new = batch[fresh]
+            if new.empty:
+                return 0
+            new = pd.concat([new.drop(columns=list(PARTITION_COLUMNS), errors="ignore"), partition_keys(new)], axis=1)
+
+            # 숨김 작업 디렉터리에 다 쓴 뒤 파일 단위로 옮겨, 읽는 쪽이 반쯤 쓰인 파일을 보지 않게 함
+            staging = self.root / f".staging-{uuid.uuid4().hex}"
+            try:
+                ds.write_dataset(
+                    _to_arrow(new), staging, format="parquet",
+                    partitioning=self.partitioning,
+                    basename_template=f"part-{time.strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}-{{i}}.parquet",
+                )
+                for f in staging.glob("*/*/*.parquet"):
+                    dest = self.data_dir / f.relative_to(staging)
+                    dest.parent.mkdir(parents=True, exist_ok=True)
+                    os.replace(f, dest)
+            finally:
+                shutil.rmtree(staging, ignore_errors=True)
+            self.seen.add(hashes[fresh & keyed])
+            self.seen.save()
+        return len(new)
+
+    # --- 조회 -------------------------------------------------------
+    def dataset(self):
+        """저장된 파일 전체의 Arrow 데이터셋 (배치마다 다른 컬럼 구성은 합친 스키마로 통일)."""
+        files = ds.dataset(self.data_dir, format="parquet", partitioning=self.partitioning)
+        schema = pa.unify_schemas(
+            [frag.physical_schema for frag in files.get_fragments()] + [self.partitioning.schema],
+            promote_options="permissive",
+        )
+        return ds.dataset(self.data_dir, schema=schema, format="parquet", partitioning=self.partitioning)
+
+    def query(self, gu=None, since=None, until=None, columns=None):
+        """
+        조건에 맞는 파티션만 읽어 DataFrame으로 반환합니다.
+        - gu: 자치구 이름 또는 목록
+        - since / until: 'YYYY-MM-DD' (created_date 기준, 양끝 포함)
+        """
+        if not self.data_dir.exists():
+            return pd.DataFrame(columns=columns)
+        cond = None
+        if gu is not None:
+            gus = [gu] if isinstance(gu, str) else list(gu)
+            cond = ds.field("gu").isin(gus)
+        for op, value in (("since", since), ("until", until)):
+            if value is None:
+                continue
+            value = pd.Timestamp(value).strftime("%Y-%m-%d")
+            term = ds.field("created_date") >= value if op == "since" else ds.field("created_date") <= value
+            cond = term if cond is None else cond & term
+        return self.dataset().to_table(columns=columns, filter=cond).to_pandas()
+
+    def partitions(self):
+        """파티션별 파일 수와 행 수를 DataFrame으로 반환합니다."""
+        rows = []
+        for part_dir in sorted(p for p in self.data_dir.glob("*/*") if p.is_dir()):
+            files = sorted(part_dir.glob("*.parquet"))
+            rows.append({
+                # hive 디렉터리 이름은 URL 인코딩되어 있음 (gu=%EB%8F%99...)
+                "created_date": unquote(part_dir.parent.name.split("=", 1)[-1]),
+                "gu": unquote(part_dir.name.split("=", 1)[-1]),
+                "files": len(files),
+                "rows": sum(pq.ParquetFile(f).metadata.num_rows for f in files),
+            })
+        return pd.DataFrame(rows, columns=["created_date", "gu", "files", "rows"])
+
+    # --- 압축 -------------------------------------------------------
+    def compact(self, min_files=2):
+        """
+        파일이 min_files개 이상인 파티션을 파일 하나로 합치고, 합친 파티션 수를 반환합니다.
+        - 시작 시점에 있던 파일만 합치므로 그동안 append된 새 파일은 건드리지 않습니다.
+        - 같은 URL이 여러 번 들어 있으면 마지막 행만 남깁니다.
+        """
+        compacted = 0
+        for part_dir in sorted(p for p in self.data_dir.glob("*/*") if p.is_dir()):
+            files = sorted(part_dir.glob("part-*.parquet"))
+            if len(files) < min_files:
+                continue
+            table = pa.concat_tables([pq.read_table(f, partitioning=None) for f in files], promote_options="permissive")
+            df = table.to_pandas()
+            if "property_url" in df.columns:
+                keyed = has_url(df["property_url"])
+                df = df[~(df["property_url"].duplicated(keep="last") & keyed) | ~keyed]
+            name = f"part-{time.strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}-c.parquet"
+            # 숨김 이름('.')으로 쓴 뒤 교체 (데이터셋 탐색은 '.'으로 시작하는 파일을 무시)
+            tmp = part_dir / f".{name}.tmp"
+            pq.write_table(_to_arrow(df), tmp)
+            os.replace(tmp, part_dir / name)
+            for f in files:
+                f.unlink()
+            compacted += 1
+        return compacted
+
+    def start_compactor(self, interval=600, min_files=2):
+        """interval초마다 compact를 실행하는 데몬 스레드를 시작합니다(이미 실행 중이면 그대로)."""
+        if self._compactor is not None and self._compactor.is_alive():
+            return self._compactor
+        stop = threading.Event()
+
+        def run():
+            while not stop.wait(interval):
+                try:
+                    self.compact(min_files)
+                except Exception:
+                    # 다음 주기에 다시 시도
+                    pass
+
+        self._compactor = threading.Thread(target=run, name="listing-compactor", daemon=True)
+        self._compactor.stop = stop
+        self._compactor.start()
+        return self._compactor
+
+    def stop_compactor(self):
+        if self._compactor is not None:
+            self._compactor.stop.set()
+            self._compactor = None
+
+
+# ---------------------------------------------------------------------
+# [4] 명령행
+# ---------------------------------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description="스크랩 배치 매물 저장소")
+    parser.add_argument("--root", default=str(STORE_DIR), help="저장소 경로")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_ingest = sub.add_parser("ingest", help="CSV 배치 추가")
+    p_ingest.add_argument("paths", nargs="+", help="배치 CSV 경로")
+    sub.add_parser("compact", help="작은 파일 합치기")
+    args = parser.parse_args()
+
+    store = ListingStore(args.root)
+    if args.command == "ingest":
+        for p in args.paths:
+            added = store.append(data_loader.read_csv_safely(p))
+            print(f"{p}: {added:,}행 추가 (누적 URL {len(store.seen):,}개)")
+    else:
+        print(f"{store.compact()}개 파티션을 합쳤습니다.")
+    print(store.partitions().to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+# room_amenities.py | 매물 편의시설 목록 -> uint64 비트마스크
+# =============================================================================
+# 기능 요약:
+# - AmenityVocab: 편의시설 이름 <-> 비트 위치 사전 (최대 64개, 추가만 가능)
+# - encode_amenities: living_facilities / security_facilities / additional_options /
+#   cooling_system의 쉼표 목록을 매물당 uint64 하나(amenity_mask)로 인코딩
+# - filter_amenities: 여러 옵션 조건(예: 에어컨 + 냉장고 + 세탁기)을 전체 매물에 대해
+#   AND/비교 한 번으로 판정 (문자열 부분 검색 없음)
+# - facet_counts / amenity_count: 비트 단위 집계(popcount)로 옵션별/매물별 개수 계산
+#
+# 비트 위치는 DEFAULT_AMENITIES 순서로 고정됩니다. 저장된 마스크와 호환되도록
+# 새 편의시설은 목록 끝에만 추가하세요.
+# =============================================================================
+import numpy as np
+import pandas as pd
+
+# 편의시설을 담은 컬럼 (쉼표 구분 문자열)
+AMENITY_FIELDS = ("living_facilities", "security_facilities", "additional_options", "cooling_system")
+
+# 피터팬 매물 옵션 목록 (비트 0부터 순서대로, 추가만 가능)
+DEFAULT_AMENITIES = (
+    # living_facilities
+    "싱크대", "세탁기", "냉장고", "신발장", "인덕션레인지", "붙박이장", "침대", "전자레인지",
+    "옷장", "TV", "샤워부스", "가스레인지", "책상", "소파", "식탁", "건조기", "비데", "가스오븐",
+    "욕조", "식기세척기",
+    # security_facilities
+    "현관보안", "CCTV", "비디오폰", "인터폰", "방범창", "카드키", "자체경비원", "사설경비",
+    # additional_options
+    "풀옵션", "주차가능", "엘리베이터", "큰길가", "신축", "전세자금대출", "반려동물",
+    # cooling_system
+    "벽걸이에어컨", "천장에어컨", "스탠드에어컨",
+)
+
+# 화면에서 쓰는 묶음 이름 -> 실제 항목 (묶음 안에서는 하나만 있어도 만족)
+AMENITY_ALIASES = {
+    "에어컨": ("벽걸이에어컨", "천장에어컨", "스탠드에어컨"),
+    "주차": ("주차가능",),
+}
+
+# 빈 값 표기
+_EMPTY_TOKENS = {"", "-"}
+
+
+# ---------------------------------------------------------------------
+# [1] 사전
+# ---------------------------------------------------------------------
+class AmenityVocab:
+    """편의시설 이름 -> 비트 위치 사전. 한 번 정한 비트 위치는 바뀌지 않습니다."""
+
+    MAX_BITS = 64
+
+    def __init__(self, names=DEFAULT_AMENITIES):
+        self.names = []
+        self.index = {}
+        self.extend(names)
+
+    def extend(self, names):
+        """새 이름을 끝에 추가합니다(64개를 넘으면 ValueError)."""
+        for name in names:
+            if name in self.index or name in _EMPTY_TOKENS:
+                continue
+            if len(self.names) >= self.MAX_BITS:
+                raise ValueError(f"편의시설은 최대 {self.MAX_BITS}개까지 인코딩할 수 있습니다: {name!r}")
+            self.index[name] = len(self.names)
+            self.names.append(name)
+        return self
+
+    def __len__(self):
+        return len(self.names)
+
+    def bit(self, name):
+        return np.uint64(1) << np.uint64(self.index[name])
+
+    def mask(self, names):
+        """이름 목록(묶음 이름 포함)의 비트를 모두 켠 uint64 마스크를 반환합니다."""
+        out = np.uint64(0)
+        for name in names:
+            for item in AMENITY_ALIASES.get(name, (name,)):
+                if item not in self.index:
+                    raise KeyError(f"알 수 없는 편의시설: {item!r}")
+                out |= self.bit(item)
+        return out
+
+
+def split_tokens(s):
+    """쉼표 목록 Series를 (행 위치, 항목) 긴 형식 Series로 펼칩니다(빈 행도 한 칸 유지)."""
+    tokens = s.astype("string").str.split(",").explode().str.strip()
+    return tokens.where(~tokens.isin(_EMPTY_TOKENS))
+
+
+def build_vocabulary(df, fields=AMENITY_FIELDS, base=DEFAULT_AMENITIES):
+    """
+    데이터에서 편의시설 사전을 만듭니다.
+    - base 항목의 비트 위치는 그대로 두고, 데이터에만 있는 항목을 빈도순으로 뒤에 추가합니다.
+    """
+    counts = pd.concat([split_tokens(df[f]) for f in fields if f in df.columns]).value_counts()
+    return AmenityVocab(base).extend(counts.index)
+
+
+DEFAULT_VOCAB = AmenityVocab()
+
+
+# ---------------------------------------------------------------------
+# [2] 인코딩
+# ---------------------------------------------------------------------
+def _encode_field(s, vocab):
+    """쉼표 목록 Series 하나를 uint64 마스크 배열로 인코딩합니다(사전에 없는 항목은 무시)."""
+    # 같은 목록 문자열은 한 번만 분해 (factorize 후 고유값만 처리하고 코드로 펼침)
+    codes, uniques = pd.factorize(s)
+    if len(uniques) == 0:
+        return np.zeros(len(s), dtype=np.uint64)
+    tokens = split_tokens(pd.Series(uniques))
+    idx = tokens.map(vocab.index).to_numpy(dtype="float64", na_value=np.nan)
+    known = ~np.isnan(idx)
+    bits = np.zeros(len(idx), dtype=np.uint64)
+    bits[known] = np.uint64(1) << idx[known].astype(np.uint64)
+    # explode는 원래 순서를 유지하므로, 행이 바뀌는 지점마다 OR 누적
+    pos = tokens.index.to_numpy()
+    starts = np.flatnonzero(np.r_[True, pos[1:] != pos[:-1]])
+    per_unique = np.bitwise_or.reduceat(bits, starts)
+    return np.where(codes < 0, np.uint64(0), per_unique[codes])
+
+
+def encode_amenities(df, vocab=DEFAULT_VOCAB, fields=AMENITY_FIELDS, column="amenity_mask"):
+    """편의시설 컬럼들을 OR한 uint64 마스크 컬럼(column)을 추가한 DataFrame(얕은 복사본)을 반환합니다."""
+    out = df.copy(deep=False)
+    mask = np.zeros(len(df), dtype=np.uint64)
+    for f in fields:
+        if f in df.columns:
+            mask |= _encode_field(df[f], vocab)
+    out[column] = mask
+    return out
+
+
+# ---------------------------------------------------------------------
+# [3] 필터 / 집계
+# ---------------------------------------------------------------------
+def filter_amenities(masks, names, vocab=DEFAULT_VOCAB):
+    """
+    names의 옵션을 모두 갖춘 매물인지 불리언 배열로 반환합니다.
+    - 일반 항목은 AND (masks & need) == need 한 번으로 판정
+    - 묶음 이름(에어컨 등)은 묶음 안의 항목 중 하나라도 있으면 만족
+    """
+    masks = np.asarray(masks, dtype=np.uint64)
+    plain = [n for n in names if n not in AMENITY_ALIASES]
+    need = vocab.mask(plain)
+    ok = (masks & need) == need
+    for n in names:
+        if n in AMENITY_ALIASES:
+            ok &= (masks & vocab.mask([n])) != 0
+    return ok
+
+
+def _bit_matrix(masks):
+    """uint64 마스크를 (행 수, 64) 0/1 행렬로 풉니다(비트 i가 열 i)."""
+    masks = np.ascontiguousarray(masks, dtype=np.uint64)
+    return np.unpackbits(masks.astype("<u8").view(np.uint8).reshape(-1, 8), axis=1, bitorder="little")
+
+
+def amenity_count(masks):
+    """매물별 편의시설 개수(popcount)를 uint8 배열로 반환합니다."""
+    masks = np.asarray(masks, dtype=np.uint64)
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(masks)
+    return _bit_matrix(masks).sum(axis=1, dtype=np.uint8)
+
+
+def facet_counts(masks, vocab=DEFAULT_VOCAB):
+    """편의시설별 보유 매물 수를 Series(index=이름)로 반환합니다(많은 순)."""
+    counts = _bit_matrix(masks).sum(axis=0)[:len(vocab)]
+    return pd.Series(counts, index=vocab.names, name="매물 수").sort_values(ascending=False)
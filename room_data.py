@@ -0,0 +1,337 @@
+# room_data.py | '가격' 페이지 room 테이블 전처리 헬퍼
+# =============================================================================
+# 기능 요약:
+# - normalize_completion_date: 'YYYY' / 'YYYY.MM' / 'YYYY.MM.DD' / NaN 형식이 섞인
+#   준공일을 정규식 추출 + 정수 조립으로 한 번에 datetime으로 변환하고,
+#   준공년도(built_year)를 작은 정수형 컬럼으로 함께 만듭니다.
+# - price_query / rent_summary_query / rent_rows_query: 가격 탭 차트가 실제로 쓰는
+#   컬럼만 조회하고, 건물유형 필터와 평균/중앙값 집계는 SQL에서 처리하는 쿼리
+# - prepare_price_frame: 조회 결과에 공통 전처리(결측 유형 'unknown', 복합 필드 분해) 적용
+# - parse_room_fields: 텍스트로 저장된 복합 필드(floor_info "고층/4층",
+#   room_bathroom_count "1개/1개", loan_amount "-" 등)를 컬럼당 한 번의
+#   벡터화 정규식 추출로 작은 정수/불리언/카테고리 컬럼으로 분해합니다.
+# - intern_categories: 건물유형 등 저카디널리티 문자열 컬럼을 정규화된 라벨의 Categorical로
+#   한 번 변환하고, 요약 제외 대상(unknown/미등기) 마스크(building_type_excluded)를 미리 계산
+# - ingest_room_rows: 스냅샷 적재용 (복합 필드 분해 + 카테고리 변환 + 편의시설 uint64 비트마스크
+#   + 주소의 자치구/동 코드(district_code, gu, dong))
+# =============================================================================
+import numpy as np
+import pandas as pd
+
+from room_amenities import encode_amenities
+from room_db import RoomQuery
+from seoul_regions import attach_regions
+
+# ---------------------------------------------------------------------
+# [1] 날짜 정규화
+# ---------------------------------------------------------------------
+# 연도(필수) + 월/일(선택), 구분자는 '.', '-', '/' 허용. 뒤에 붙은 시각은 무시
+_DATE_PATTERN = (
+    r"^\s*(?P<year>\d{4})"
+    r"(?:[.\-/]\s*(?P<month>\d{1,2}))?"
+    r"(?:[.\-/]\s*(?P<day>\d{1,2}))?"
+    r"\.?(?:\s.*)?$"
+)
+
+def normalize_completion_date(s):
+    """
+    준공일 Series를 (datetime Series, 준공년도 Int16 Series)로 변환합니다.
+    - 'YYYY' → YYYY-01-01, 'YYYY.MM' → YYYY-MM-01, 'YYYY.MM.DD' → 그대로
+    - 형식이 맞지 않거나 존재하지 않는 날짜, 결측은 NaT / <NA>
+    - Python 행 단위 apply 없이 정규식 추출과 정수 조립으로 처리합니다.
+    """
+    parts = s.astype("string").str.extract(_DATE_PATTERN)
+    year = pd.to_numeric(parts["year"], errors="coerce").astype("float64")
+    month = pd.to_numeric(parts["month"], errors="coerce").astype("float64").fillna(1)
+    day = pd.to_numeric(parts["day"], errors="coerce").astype("float64").fillna(1)
+
+    dates = pd.to_datetime(
+        pd.DataFrame({"year": year, "month": month, "day": day}), errors="coerce"
+    )
+    built_year = year.where(dates.notna()).astype("Int16")
+    return dates, built_year
+
+# ---------------------------------------------------------------------
+# [2] 복합 텍스트 필드 파서
+# ---------------------------------------------------------------------
+# "2층/4층", "고층/4층", "반지층/3층", "B1층/5층"
+_FLOOR_PATTERN = r"^\s*(?P<label>[^\d/]*?)(?P<num>\d+)?\s*층?\s*/\s*(?P<total>\d+)\s*층?\s*$"
+# "1개/1개" (방/욕실)
+_COUNT_PAIR_PATTERN = r"^\s*(?P<room>\d+)\s*개?\s*/\s*(?P<bath>\d+)\s*개?\s*$"
+# "5억 3,000만원 (시세 대비 30% 이상)", "시세 대비 30% 미만", "융자금 없음", "-"
+_LOAN_PATTERN = (
+    r"^\s*(?:(?P<eok>\d+)\s*억)?\s*(?:(?P<man>[\d,]+)\s*만원?)?"
+    r"[^%]*?(?:(?P<pct>\d+)\s*%\s*(?P<cmp>미만|이상))?[^%]*$"
+)
+
+# 층 구분 (낮은 층 -> 높은 층 순서)
+FLOOR_LEVELS = ["지하", "반지층", "저층", "중층", "고층", "옥탑"]
+_FLOOR_LABELS = {"B": "지하", "지하": "지하", "반지": "반지층", "저": "저층", "중": "중층", "고": "고층", "옥탑": "옥탑"}
+
+def _small_int(s, dtype):
+    """숫자 문자열 Series를 nullable 작은 정수형으로 변환합니다(범위 밖 값은 결측)."""
+    values = pd.to_numeric(s, errors="coerce")
+    info = np.iinfo(dtype.lower())
+    return values.where(values.between(info.min, info.max)).astype(dtype)
+
+def _flag(s, mapping):
+    """값 -> True/False 매핑으로 nullable 불리언 Series를 만듭니다(매핑에 없으면 결측)."""
+    return s.map(mapping).astype("boolean")
+
+def parse_floor_info(s):
+    """
+    floor_info -> floor_level(층 구분, 순서형 category), floor(해당 층), total_floor(건물 층수).
+    - "B1층" -> floor -1, 층 구분 '지하' / "고층" 등 표기만 있으면 floor는 결측
+    - 숫자 층은 건물 층수 대비 위치로 저층(1/3 이하)/중층(2/3 이하)/고층을 정합니다.
+    """
+    parts = s.astype("string").str.extract(_FLOOR_PATTERN)
+    label = parts["label"].str.strip()
+    num = pd.to_numeric(parts["num"], errors="coerce")
+    total = _small_int(parts["total"], "Int8")
+
+    basement = label.isin(["B", "지하"]).fillna(False)
+    floor = _small_int(num.where(label.eq("").fillna(False), -num.where(basement)), "Int8")
+
+    ratio = (floor.astype("float64") / total.astype("float64")).to_numpy(dtype="float64", na_value=np.nan)
+    relative = np.select([ratio <= 1 / 3, ratio <= 2 / 3, ratio > 2 / 3], ["저층", "중층", "고층"], default="")
+    level = label.map(_FLOOR_LABELS).where(~label.eq("").fillna(False), pd.Series(relative, index=s.index))
+    level = level.where(level.isin(FLOOR_LEVELS))
+    return pd.DataFrame({
+        "floor_level": pd.Categorical(level, categories=FLOOR_LEVELS, ordered=True),
+        "floor": floor,
+        "total_floor": total,
+    }, index=s.index)
+
+def parse_room_bathroom_count(s):
+    """room_bathroom_count "2개/1개" -> room_count, bath_count (Int8)."""
+    parts = s.astype("string").str.extract(_COUNT_PAIR_PATTERN)
+    return pd.DataFrame({
+        "room_count": _small_int(parts["room"], "Int8"),
+        "bath_count": _small_int(parts["bath"], "Int8"),
+    }, index=s.index)
+
+def parse_parking_info(s):
+    """parking_info "가능"/"불가"/"2대" -> parking_available(불리언), parking_count(Int8, 대수 표기가 있을 때)."""
+    text = s.astype("string").str.strip()
+    count = _small_int(text.str.extract(r"(\d+)\s*대", expand=False), "Int8")
+    available = _flag(text, {"가능": True, "불가": False, "불가능": False})
+    available = available.mask(count.notna(), count.gt(0))
+    return pd.DataFrame({"parking_available": available, "parking_count": count}, index=s.index)
+
+def parse_management_fee(s):
+    """management_fee "60000.0" / "6만원" 외 표기 -> Int32(원). "-"와 결측은 <NA>."""
+    if not pd.api.types.is_numeric_dtype(s.dtype):
+        s = s.astype("string").str.replace(r"[,\s원]", "", regex=True)
+    return pd.DataFrame({"management_fee": _small_int(s, "Int32")}, index=s.index)
+
+def parse_loan_amount(s):
+    """
+    loan_amount -> loan_amount_manwon(융자금, 만원 단위 Int32), loan_ratio(시세 대비, category).
+    - "융자금 없음" -> 0 / '없음', "-"와 결측 -> <NA>
+    """
+    text = s.astype("string")
+    parts = text.str.extract(_LOAN_PATTERN)
+    eok = pd.to_numeric(parts["eok"], errors="coerce")
+    man = pd.to_numeric(parts["man"].str.replace(",", "", regex=False), errors="coerce")
+    none = text.str.contains("없음", regex=False).fillna(False)
+    amount = (eok.fillna(0) * 10_000 + man.fillna(0)).where(eok.notna() | man.notna())
+    amount = amount.mask(none, 0)
+
+    ratio = (parts["pct"] + "% " + parts["cmp"]).mask(none, "없음")
+    return pd.DataFrame({
+        "loan_amount_manwon": _small_int(amount, "Int32"),
+        "loan_ratio": ratio.astype("category"),
+    }, index=s.index)
+
+def parse_completion_date(s):
+    """completion_date -> completion_date(datetime), built_year(Int16). (normalize_completion_date 사용)"""
+    dates, built_year = normalize_completion_date(s)
+    return pd.DataFrame({"completion_date": dates, "built_year": built_year}, index=s.index)
+
+def parse_move_in_date(s):
+    """move_in_date "즉시입주 (협의가능)" -> move_in_now, move_in_negotiable (불리언)."""
+    text = s.astype("string")
+    return pd.DataFrame({
+        "move_in_now": text.str.startswith("즉시").astype("boolean"),
+        "move_in_negotiable": text.str.contains("협의", regex=False).astype("boolean"),
+    }, index=s.index)
+
+def parse_residence_report(s):
+    """residence_report "가능"/"불가능"/"-" -> residence_report_ok (불리언)."""
+    return pd.DataFrame({"residence_report_ok": _flag(s, {"가능": True, "불가능": False})}, index=s.index)
+
+def parse_illegal_building(s):
+    """illegal_building "위반건축물"/"위반건축물 아님"/"-" -> is_illegal_building (불리언)."""
+    return pd.DataFrame({"is_illegal_building": _flag(s, {"위반건축물": True, "위반건축물 아님": False})}, index=s.index)
+
+# 원본 컬럼 -> (파서, 만들어지는 컬럼)
+ROOM_FIELD_PARSERS = {
+    "floor_info": (parse_floor_info, ("floor_level", "floor", "total_floor")),
+    "room_bathroom_count": (parse_room_bathroom_count, ("room_count", "bath_count")),
+    "parking_info": (parse_parking_info, ("parking_available", "parking_count")),
+    "management_fee": (parse_management_fee, ("management_fee",)),
+    "loan_amount": (parse_loan_amount, ("loan_amount_manwon", "loan_ratio")),
+    "completion_date": (parse_completion_date, ("completion_date", "built_year")),
+    "move_in_date": (parse_move_in_date, ("move_in_now", "move_in_negotiable")),
+    "residence_report": (parse_residence_report, ("residence_report_ok",)),
+    "illegal_building": (parse_illegal_building, ("is_illegal_building",)),
+}
+
+# 파생 컬럼 -> 원본 컬럼 (DB에는 원본만 있으므로 조회할 때 원본을 대신 선택)
+DERIVED_SOURCES = {
+    out: src for src, (_, outs) in ROOM_FIELD_PARSERS.items() for out in outs if out != src
+}
+
+def parse_distinct(parser, s):
+    """
+    parser를 고유값에만 적용한 뒤 코드로 펼쳐 원래 길이의 결과를 만듭니다.
+    - 이 필드들은 값 종류가 적어(수십~수백 개) 행 수와 무관하게 정규식 비용이 거의 일정합니다.
+    """
+    codes, uniques = pd.factorize(s, use_na_sentinel=True)
+    # 마지막 자리에 결측 한 칸을 두어 결측 행도 파서가 정한 값으로 채움
+    distinct = pd.Series(list(uniques) + [None], dtype=object)
+    if isinstance(s.dtype, np.dtype) and s.dtype.kind in "biuf":
+        distinct = pd.to_numeric(distinct)
+    parsed = parser(distinct)
+    codes = np.where(codes < 0, len(uniques), codes)
+    out = parsed.iloc[codes]
+    out.index = s.index
+    return out
+
+def parse_room_fields(df, columns=None):
+    """
+    복합 텍스트 필드를 타입이 있는 컬럼으로 분해한 DataFrame(얕은 복사본)을 반환합니다.
+    - columns: 분해할 원본 컬럼 (기본: ROOM_FIELD_PARSERS 중 df에 있는 전부)
+    - 원본 컬럼은 그대로 두고(completion_date, management_fee는 변환값으로 교체) 파생 컬럼을 추가합니다.
+    - 컬럼마다 고유값에 대해 정규식 추출 한 번 + 코드 펼치기 한 번 (행 단위 Python 루프 없음)
+    """
+    out = df.copy(deep=False)
+    for src in (ROOM_FIELD_PARSERS if columns is None else columns):
+        if src not in out.columns:
+            continue
+        parser, _ = ROOM_FIELD_PARSERS[src]
+        parsed = parse_distinct(parser, out[src])
+        for c in parsed.columns:
+            out[c] = parsed[c]
+    return out
+
+# ---------------------------------------------------------------------
+# [3] 카테고리 변환 (라벨 정규화 + 제외 마스크)
+# ---------------------------------------------------------------------
+# 요약 대상에서 제외할 건물유형 (공백 무시 비교, 결측은 'unknown'과 같이 취급)
+RENT_EXCLUDED_TYPES = ("unknown", "다가구(미등기)", "빌라(미등기)")
+
+# Categorical로 저장할 컬럼 -> 결측 대체 라벨 (None이면 결측 유지)
+CATEGORY_COLUMNS = {
+    "building_type": "unknown",
+    "room_living_type": "unknown",
+    "main_room_direction": None,
+    "parking_info": None,
+}
+
+def normalize_label(s):
+    """라벨 정규화: 앞뒤 공백 제거, 연속 공백은 하나로, 괄호 앞 공백 제거 ('다가구 (미등기)' -> '다가구(미등기)')."""
+    s = s.astype("string").str.strip().str.replace(r"\s+", " ", regex=True)
+    s = s.str.replace(r"\s+\(", "(", regex=True)
+    return s.mask(s.eq(""))
+
+def intern_category(s, fill=None):
+    """
+    문자열 Series를 정규화된 라벨의 Categorical로 변환합니다.
+    - 정규화는 고유값에만 적용하고, 같은 라벨로 합쳐진 값은 같은 코드가 됩니다.
+    - fill: 결측을 채울 라벨 (None이면 결측 유지)
+    """
+    codes, uniques = pd.factorize(s)
+    labels = normalize_label(pd.Series(uniques, dtype=object))
+    if fill is not None:
+        labels = labels.fillna(fill)
+    categories = pd.Index(labels.dropna().unique())
+    if fill is not None and fill not in categories:
+        categories = categories.append(pd.Index([fill]))
+    remap = categories.get_indexer(labels)
+    remap = np.append(remap, categories.get_loc(fill) if fill is not None else -1)
+    return pd.Series(pd.Categorical.from_codes(remap[codes], categories=categories), index=s.index, name=s.name)
+
+def category_mask(s, labels):
+    """Categorical Series에서 라벨(공백 무시 비교)이 labels에 속하는 행의 불리언 배열 (결측은 True)."""
+    wanted = {str(v).replace(" ", "") for v in labels}
+    flags = np.array([str(c).replace(" ", "") in wanted for c in s.cat.categories] + [True])
+    return flags[s.cat.codes.to_numpy()]
+
+def intern_categories(df, columns=None):
+    """
+    CATEGORY_COLUMNS를 Categorical로 바꾼 DataFrame(얕은 복사본)을 반환합니다.
+    - building_type이 있으면 요약 제외 대상 마스크 building_type_excluded(bool)도 함께 만듭니다.
+    - 이후 groupby/색상 구분/필터는 문자열 대신 정수 코드로 동작합니다.
+    """
+    out = df.copy(deep=False)
+    for c, fill in (CATEGORY_COLUMNS if columns is None else columns).items():
+        if c in out.columns:
+            out[c] = intern_category(out[c], fill)
+    if "building_type" in out.columns and isinstance(out["building_type"].dtype, pd.CategoricalDtype):
+        out["building_type_excluded"] = category_mask(out["building_type"], RENT_EXCLUDED_TYPES)
+    return out
+
+def ingest_room_rows(df):
+    """새로 적재하는 room 행 전처리: 복합 필드 분해 + 카테고리 변환 + 편의시설 비트마스크(amenity_mask) + 자치구/동 코드."""
+    return attach_regions(encode_amenities(intern_categories(parse_room_fields(df))))
+
+# ---------------------------------------------------------------------
+# [4] 가격 페이지 쿼리
+# ---------------------------------------------------------------------
+
+def price_columns(table_columns):
+    """테이블 컬럼 + 원본이 있는 파생 컬럼(built_year, floor, room_count 등)을 합친 선택 가능 컬럼 집합."""
+    available = set(table_columns)
+    available |= {out for out, src in DERIVED_SOURCES.items() if src in available}
+    return available
+
+def price_query(columns, table_columns, table="room"):
+    """
+    차트에 필요한 컬럼만 조회하는 RoomQuery를 만듭니다.
+    - 테이블에 없는 파생 컬럼은 원본 컬럼을 대신 조회해 전처리(parse_room_fields)에서 만듭니다.
+    """
+    table_columns = set(table_columns)
+    cols = []
+    for c in columns:
+        if c is None:
+            continue
+        if c not in table_columns:
+            c = DERIVED_SOURCES.get(c, c)
+        if c in table_columns and c not in cols:
+            cols.append(c)
+    return RoomQuery(table).select(*cols)
+
+def _rent_filter(q):
+    return q.not_null("building_type", "rent").exclude("building_type", RENT_EXCLUDED_TYPES)
+
+def rent_summary_query(table="room"):
+    """건물유형별 월세 평균/중앙값/건수를 SQL에서 집계하는 쿼리."""
+    return _rent_filter(RoomQuery(table)).aggregate("building_type", "rent", ("mean", "median", "count"))
+
+def rent_rows_query(table="room"):
+    """분포(박스/바이올린) 차트용 (건물유형, 월세) 두 컬럼만 조회하는 쿼리."""
+    return _rent_filter(RoomQuery(table).select("building_type", "rent"))
+
+def _needs_parse(df, src, outs):
+    derived = [o for o in outs if o != src]
+    if derived:
+        return any(o not in df.columns for o in derived)
+    return not pd.api.types.is_integer_dtype(df[src].dtype)
+
+def prepare_price_frame(df):
+    """
+    조회된 컬럼에 한해 가격 페이지 공통 전처리를 적용한 DataFrame을 반환합니다.
+    - 유형 컬럼은 Categorical로 변환(결측은 'unknown')하고 제외 마스크를 만듭니다.
+    - 아직 분해되지 않은 복합 필드만 parse_room_fields로 분해
+      (스냅샷은 동기화 때 미리 처리해 두므로 재실행마다 다시 파싱하지 않음)
+    """
+    todo = [src for src, (_, outs) in ROOM_FIELD_PARSERS.items()
+            if src in df.columns and _needs_parse(df, src, outs)]
+    if todo:
+        df = parse_room_fields(df, todo)
+    pending = {c: fill for c, fill in CATEGORY_COLUMNS.items()
+               if c in df.columns and not isinstance(df[c].dtype, pd.CategoricalDtype)}
+    if pending or ("building_type" in df.columns and "building_type_excluded" not in df.columns):
+        df = intern_categories(df)
+    return df
@@ -0,0 +1,594 @@
+# room_db.py | '가격' 페이지 room 테이블 DB 접근 계층
+# =============================================================================
+# 기능 요약:
+# - ConnectionPool: DB 연결을 미리 만들어 두고 재사용 (재실행마다 connect/close 제거)
+# - RoomDB.query: (SQL, 파라미터) 단위 TTL 결과 캐시 + single-flight
+#   (여러 세션이 같은 쿼리를 동시에 요청하면 한 번만 실행하고 결과를 공유)
+# - RoomDB.stats: 캐시 적중률과 쿼리 지연 시간 보고
+# - RoomQuery: 필요한 컬럼만 SELECT하고 필터/그룹 집계(평균·중앙값 등)를 SQL로
+#   내려 보내는 쿼리 빌더 (전송량과 pandas 메모리가 테이블 폭이 아닌 차트에 비례)
+#
+# - 저장소 백엔드: 기본은 MariaDB(localhost:3310). 환경 변수 ROOM_DB_BACKEND=sqlite면
+#   room_data_export.csv로 만든 인덱스 포함 SQLite 파일을 사용합니다(서비스 없이 로컬 실행/벤치마크).
+#     예) ROOM_DB_BACKEND=sqlite streamlit run dashboard.py
+#   직접 만들 때: RoomDB(lambda: sqlite3.connect(path, check_same_thread=False))
+# =============================================================================
+import functools
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import data_loader
+
+# mariadb는 설치 환경에 따라 없을 수 있으므로 선택적으로 import
+try:
+    import mariadb
+except ImportError:
+    mariadb = None
+
+# 기본 MariaDB 접속 정보
+MARIADB_CONFIG = dict(host="localhost", port=3310, database="bangu", user="root", password="1234")
+
+# SQLite 백엔드: 원본 CSV와 생성할 DB 파일 경로 (환경 변수로 변경 가능)
+ROOM_CSV = Path(os.environ.get("ROOM_CSV", "room_data_export.csv"))
+SQLITE_PATH = Path(os.environ.get("ROOM_SQLITE_PATH", Path(".cache") / "room.sqlite"))
+
+# SQLite room 테이블 인덱스: 가격 필터/정렬 컬럼, 좌표, 증분 동기화 워터마크
+ROOM_INDEXES = {
+    "idx_room_transaction_type": ("transaction_type",),
+    "idx_room_deposit": ("deposit",),
+    "idx_room_rent": ("rent",),
+    "idx_room_exclusive_area": ("exclusive_area",),
+    "idx_room_lat_lon": ("latitude", "longitude"),
+    "idx_room_id": ("id",),
+    "idx_room_created_at": ("created_at",),
+}
+
+# 기본 캐시 유지 시간(초)과 풀 크기, 스트리밍 청크 크기(행)
+DEFAULT_TTL = 300
+DEFAULT_POOL_SIZE = 4
+DEFAULT_CHUNK_SIZE = 10_000
+
+# room 테이블 컬럼별 저장 dtype (read_chunked 기본값, 목록에 없는 컬럼은 문자열 그대로)
+# - 정수 컬럼은 결측이 있으면 nullable(Int32)로 만들어집니다.
+ROOM_DTYPES = {
+    "id": "int32", "deposit": "int32", "rent": "int32",
+    "management_fee": "float32", "exclusive_area": "float32",
+    "latitude": "float32", "longitude": "float32",
+    "transaction_type": "category", "building_usage": "category", "building_type": "category",
+    "room_living_type": "category", "main_room_direction": "category", "parking_info": "category",
+    "created_at": "datetime64[ns]",
+}
+
+
+# ---------------------------------------------------------------------
+# [1] 연결 풀
+# ---------------------------------------------------------------------
+class ConnectionPool:
+    """연결 팩토리로 만든 DB 연결을 최대 size개까지 재사용하는 풀."""
+
+    def __init__(self, connect, size=DEFAULT_POOL_SIZE):
+        self._connect = connect
+        self._idle = queue.LifoQueue(maxsize=size)
+        self._slots = threading.BoundedSemaphore(size)
+
+    @contextmanager
+    def connection(self):
+        """풀에서 연결을 빌려 주고, 사용 후 돌려받습니다(오류가 난 연결은 폐기)."""
+        self._slots.acquire()
+        try:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self._connect()
+            try:
+                yield conn
+            except Exception:
+                _close_quietly(conn)
+                raise
+            else:
+                self._idle.put_nowait(conn)
+        finally:
+            self._slots.release()
+
+    def close(self):
+        """유휴 연결을 모두 닫습니다."""
+        while True:
+            try:
+                _close_quietly(self._idle.get_nowait())
+            except queue.Empty:
+                break
+
+
+def _streaming_cursor(conn):
+    """결과를 클라이언트에 한꺼번에 버퍼링하지 않는 커서 (지원하지 않으면 기본 커서)."""
+    try:
+        return conn.cursor(buffered=False)
+    except TypeError:
+        return conn.cursor()
+
+
+def _close_quietly(conn):
+    try:
+        conn.close()
+    except Exception:
+        pass
+
+
+# ---------------------------------------------------------------------
+# [2] 캐시 + single-flight 쿼리 실행
+# ---------------------------------------------------------------------
+class _Flight:
+    """실행 중인 쿼리 하나를 기다리는 세션들이 공유하는 결과 자리."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class RoomDB:
+    """
+    연결 풀 위에서 SELECT 결과를 TTL 동안 캐시하는 room 테이블 조회기.
+    - 캐시 키: (SQL, 파라미터)
+    - 반환 DataFrame은 캐시 원본의 얕은 복사본이므로 컬럼 추가/교체는 안전합니다.
+    """
+
+    def __init__(self, connect, pool_size=DEFAULT_POOL_SIZE, ttl=DEFAULT_TTL, name="db"):
+        self.name = name
+        self.pool = ConnectionPool(connect, pool_size)
+        self.ttl = ttl
+        self._cache = {}
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._stats = dict(hits=0, shared=0, misses=0, errors=0, total_ms=0.0, max_ms=0.0, last_ms=0.0)
+
+    def query(self, sql, params=(), use_cache=True):
+        """
+        SQL을 실행하여 DataFrame으로 반환합니다(캐시/진행 중 쿼리 우선 사용).
+        - use_cache=False: 캐시를 거치지 않고 항상 DB에서 조회 (증분 동기화 등)
+        """
+        if not use_cache:
+            return self._execute(sql, tuple(params))
+        key = (sql, tuple(params))
+        now = time.monotonic()
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None and cached[0] > now:
+                self._stats["hits"] += 1
+                return cached[1].copy(deep=False)
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+            else:
+                self._stats["shared"] += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result.copy(deep=False)
+
+        try:
+            df = self._execute(sql, key[1])
+            flight.result = df
+            with self._lock:
+                self._prune(now)
+                self._cache[key] = (time.monotonic() + self.ttl, df)
+            return df.copy(deep=False)
+        except Exception as e:
+            flight.error = e
+            with self._lock:
+                self._stats["errors"] += 1
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.done.set()
+
+    def _execute(self, sql, params):
+        """풀의 연결로 쿼리를 실행하고 지연 시간을 기록합니다."""
+        t0 = time.perf_counter()
+        with self.pool.connection() as conn:
+            cur = conn.cursor()
+            try:
+                cur.execute(sql, params)
+                columns = [d[0] for d in cur.description]
+                df = pd.DataFrame.from_records(cur.fetchall(), columns=columns, coerce_float=True)
+            finally:
+                cur.close()
+        self._record((time.perf_counter() - t0) * 1000)
+        return df
+
+    def _record(self, elapsed):
+        with self._lock:
+            self._stats["misses"] += 1
+            self._stats["total_ms"] += elapsed
+            self._stats["max_ms"] = max(self._stats["max_ms"], elapsed)
+            self._stats["last_ms"] = elapsed
+
+    def read_chunked(self, sql, params=(), dtypes=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        SQL 결과를 chunk_size 행씩 읽어 dtypes대로 변환한 DataFrame을 반환합니다(캐시 없음).
+        - 먼저 COUNT(*)로 행 수를 구해 컬럼 배열을 한 번에 할당하고, 청크마다 채웁니다.
+        - dtypes: {컬럼: "int32" | "float32" | "category" | "datetime64[ns]" ...} (기본 ROOM_DTYPES)
+        """
+        dtypes = ROOM_DTYPES if dtypes is None else dtypes
+        t0 = time.perf_counter()
+        with self.pool.connection() as conn:
+            cur = _streaming_cursor(conn)
+            try:
+                cur.execute(f"SELECT COUNT(*) FROM ({sql}) AS counted", tuple(params))
+                expected = int(cur.fetchone()[0])
+                cur.execute(sql, tuple(params))
+                names = [d[0] for d in cur.description]
+                buffers = [_make_buffer(dtypes.get(n), expected) for n in names]
+                n = 0
+                while True:
+                    rows = cur.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    for buf, values in zip(buffers, zip(*rows)):
+                        buf.append(n, values)
+                    n += len(rows)
+            finally:
+                cur.close()
+        df = pd.DataFrame({name: buf.finish(n) for name, buf in zip(names, buffers)}, copy=False)
+        self._record((time.perf_counter() - t0) * 1000)
+        return df
+
+    def _prune(self, now):
+        """만료된 캐시 항목을 제거합니다(잠금을 잡은 상태에서 호출)."""
+        for k in [k for k, (expires, _) in self._cache.items() if expires <= now]:
+            del self._cache[k]
+
+    def fetch(self, q, use_cache=True):
+        """RoomQuery를 실행하여 DataFrame으로 반환합니다."""
+        sql, params = q.build()
+        return self.query(sql, params, use_cache=use_cache)
+
+    def columns(self, table="room"):
+        """테이블 컬럼 목록을 반환합니다(행 없이 헤더만 조회, 결과는 캐시)."""
+        return list(self.query(f"SELECT * FROM {_ident(table)} LIMIT 0").columns)
+
+    def invalidate(self):
+        """캐시를 비웁니다(데이터가 갱신된 직후 사용)."""
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self):
+        """캐시 적중률과 쿼리 지연 시간(ms)을 dict로 반환합니다."""
+        with self._lock:
+            s = dict(self._stats)
+        total = s["hits"] + s["shared"] + s["misses"]
+        s["requests"] = total
+        s["hit_rate"] = (s["hits"] + s["shared"]) / total if total else 0.0
+        s["avg_ms"] = s["total_ms"] / s["misses"] if s["misses"] else 0.0
+        return s
+
+
+# ---------------------------------------------------------------------
+# [3] 스트리밍 읽기용 컬럼 버퍼
+# ---------------------------------------------------------------------
+class _ArrayBuffer:
+    """미리 할당한 NumPy 배열에 청크를 채웁니다(부족하면 1.5배씩 늘림)."""
+
+    def __init__(self, dtype, capacity):
+        self.values = np.empty(capacity, dtype=dtype)
+
+    def _reserve(self, end):
+        if end > len(self.values):
+            grown = np.empty(max(end, int(len(self.values) * 1.5)), dtype=self.values.dtype)
+            grown[:len(self.values)] = self.values
+            self.values = grown
+
+    def append(self, start, values):
+        self._reserve(start + len(values))
+        self.values[start:start + len(values)] = self._convert(values)
+
+    def _convert(self, values):
+        return values
+
+    def finish(self, n):
+        return self.values[:n]
+
+
+class _ChunkBuffer:
+    """
+    dtype을 지정하지 않은 컬럼(주로 문자열): 청크마다 pandas 기본 추론 배열로 바꿔 두고
+    마지막에 한 번 이어 붙입니다. (행 수만큼의 object 배열을 따로 두지 않음)
+    """
+
+    def __init__(self, dtype, capacity):
+        self.chunks = []
+
+    def append(self, start, values):
+        self.chunks.append(pd.Series(pd.array(np.array(values, dtype=object))))
+
+    def finish(self, n):
+        if not self.chunks:
+            return pd.Series([], dtype=object)
+        if len(self.chunks) == 1:
+            return self.chunks[0]
+        return pd.concat(self.chunks, ignore_index=True)
+
+
+def _to_float64(values):
+    """DB 값 튜플(Decimal/문자열/None 포함)을 float64 배열로 변환합니다(결측은 NaN)."""
+    try:
+        # 숫자/None만 있으면 NumPy가 바로 변환 (None -> NaN)
+        return np.array(values, dtype="float64")
+    except (TypeError, ValueError):
+        pass
+    return pd.to_numeric(pd.Series(values, dtype=object), errors="coerce").to_numpy(dtype="float64")
+
+
+class _FloatBuffer(_ArrayBuffer):
+    def _convert(self, values):
+        return _to_float64(values)
+
+
+class _IntBuffer(_ArrayBuffer):
+    """정수 값 + 결측 마스크. 결측이 있으면 nullable 정수(Int32 등)로 마무리합니다."""
+
+    def __init__(self, dtype, capacity):
+        super().__init__(dtype, capacity)
+        self.mask = np.zeros(capacity, dtype=bool)
+
+    def _reserve(self, end):
+        if end > len(self.mask):
+            mask = np.zeros(max(end, int(len(self.mask) * 1.5)), dtype=bool)
+            mask[:len(self.mask)] = self.mask
+            self.mask = mask
+        super()._reserve(end)
+
+    def append(self, start, values):
+        floats = _to_float64(values)
+        missing = np.isnan(floats)
+        info = np.iinfo(self.values.dtype)
+        present = floats[~missing]
+        if present.size and (present.min() < info.min or present.max() > info.max):
+            # 범위를 넘는 값이 들어오면 지금까지 채운 값째로 int64로 승격
+            self.values = self.values.astype(np.int64)
+        self._reserve(start + len(values))
+        end = start + len(values)
+        self.values[start:end] = np.where(missing, 0, floats)
+        self.mask[start:end] = missing
+
+    def finish(self, n):
+        values, mask = self.values[:n], self.mask[:n]
+        if mask.any():
+            return pd.arrays.IntegerArray(values, mask)
+        return values
+
+
+class _DatetimeBuffer(_ArrayBuffer):
+    def _convert(self, values):
+        return pd.to_datetime(pd.Series(values, dtype=object), errors="coerce").to_numpy(dtype=self.values.dtype)
+
+
+class _CategoryBuffer(_ArrayBuffer):
+    """청크별 factorize 결과를 전역 카테고리 코드(int32)로 옮겨 담습니다."""
+
+    def __init__(self, dtype, capacity):
+        super().__init__(np.int32, capacity)
+        self.lookup = {}
+
+    def _convert(self, values):
+        codes, uniques = pd.factorize(pd.Series(values, dtype=object))
+        mapping = np.array([self.lookup.setdefault(u, len(self.lookup)) for u in uniques], dtype=np.int32)
+        return np.where(codes < 0, -1, mapping[codes] if len(mapping) else -1)
+
+    def finish(self, n):
+        return pd.Categorical.from_codes(self.values[:n], categories=list(self.lookup))
+
+
+def _make_buffer(dtype, capacity):
+    """dtype 이름에 맞는 컬럼 버퍼를 만듭니다."""
+    if dtype is None or dtype == "object":
+        return _ChunkBuffer(dtype, capacity)
+    if dtype == "category":
+        return _CategoryBuffer(dtype, capacity)
+    kind = np.dtype(dtype).kind
+    if kind in "iu":
+        return _IntBuffer(dtype, capacity)
+    if kind == "f":
+        return _FloatBuffer(dtype, capacity)
+    if kind == "M":
+        return _DatetimeBuffer(dtype, capacity)
+    raise ValueError(f"지원하지 않는 dtype: {dtype!r}")
+
+
+# ---------------------------------------------------------------------
+# [4] 쿼리 빌더 (컬럼 투영 + 조건/집계 pushdown)
+# ---------------------------------------------------------------------
+_IDENT_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+# 통계 이름 -> SQL 집계 함수 ('median'은 윈도 함수로 별도 처리)
+AGGREGATES = {"mean": "AVG", "sum": "SUM", "min": "MIN", "max": "MAX", "count": "COUNT"}
+
+def _ident(name):
+    """SQL 식별자(테이블/컬럼명)를 검증합니다. 화면 선택값이 SQL에 그대로 들어가므로 필수."""
+    if not _IDENT_PATTERN.match(str(name)):
+        raise ValueError(f"허용되지 않는 식별자: {name!r}")
+    return name
+
+class RoomQuery:
+    """
+    SELECT 문을 조립하는 간단한 빌더. build()는 (sql, params)를 반환합니다.
+    - select: 필요한 컬럼만 조회 (지정하지 않으면 *)
+    - where / not_null / exclude: 조건을 SQL WHERE로 전달 (값은 ? 파라미터)
+    - aggregate: GROUP BY 집계를 SQL에서 계산 (mean/sum/min/max/count/median)
+      median은 ROW_NUMBER/COUNT 윈도 함수로 계산하므로 MariaDB 10.2+ / SQLite 3.25+에서 동작
+    """
+
+    def __init__(self, table="room"):
+        self.table = _ident(table)
+        self._columns = []
+        self._where = []
+        self._params = []
+        self._group = None
+        self._limit = None
+
+    def select(self, *columns):
+        for c in columns:
+            if c not in self._columns:
+                self._columns.append(_ident(c))
+        return self
+
+    def where(self, clause, *params):
+        """임의 조건식을 추가합니다(값은 ?로 두고 params로 전달)."""
+        self._where.append(clause)
+        self._params.extend(params)
+        return self
+
+    def not_null(self, *columns):
+        for c in columns:
+            self.where(f"{_ident(c)} IS NOT NULL")
+        return self
+
+    def exclude(self, column, values, ignore_spaces=True):
+        """column 값이 values 중 하나면 제외합니다(ignore_spaces면 공백을 지우고 비교)."""
+        values = list(values)
+        if not values:
+            return self
+        expr = f"REPLACE({_ident(column)}, ' ', '')" if ignore_spaces else _ident(column)
+        if ignore_spaces:
+            values = [str(v).replace(" ", "") for v in values]
+        return self.where(f"{expr} NOT IN ({', '.join('?' * len(values))})", *values)
+
+    def aggregate(self, by, value, stats=("mean", "median", "count")):
+        """by 컬럼별 value 통계를 SQL에서 계산합니다(결과 컬럼명은 통계 이름)."""
+        for st_name in stats:
+            if st_name != "median" and st_name not in AGGREGATES:
+                raise ValueError(f"지원하지 않는 통계: {st_name!r}")
+        self._group = (_ident(by), _ident(value), tuple(stats))
+        return self
+
+    def limit(self, n):
+        self._limit = int(n)
+        return self
+
+    def build(self):
+        params = list(self._params)
+        where = f" WHERE {' AND '.join(self._where)}" if self._where else ""
+
+        if self._group is None:
+            cols = ", ".join(self._columns) or "*"
+            sql = f"SELECT {cols} FROM {self.table}{where}"
+        else:
+            by, value, stats = self._group
+            aggs = [f"{AGGREGATES[s]}({value}) AS {s}" for s in stats if s != "median"]
+            if "median" in stats:
+                # 그룹 내 순위가 가운데(짝수 개면 가운데 두 개)인 값의 평균 = 중앙값
+                aggs.insert(
+                    list(stats).index("median"),
+                    f"AVG(CASE WHEN 2 * _rn BETWEEN _cnt AND _cnt + 2 THEN {value} END) AS median",
+                )
+                not_null = f"{value} IS NOT NULL"
+                inner_where = f"{where} AND {not_null}" if where else f" WHERE {not_null}"
+                source = (
+                    f"(SELECT {by}, {value}, "
+                    f"ROW_NUMBER() OVER (PARTITION BY {by} ORDER BY {value}) AS _rn, "
+                    f"COUNT(*) OVER (PARTITION BY {by}) AS _cnt "
+                    f"FROM {self.table}{inner_where}) AS ranked"
+                )
+                sql = f"SELECT {by}, {', '.join(aggs)} FROM {source} GROUP BY {by}"
+            else:
+                sql = f"SELECT {by}, {', '.join(aggs)} FROM {self.table}{where} GROUP BY {by}"
+
+        if self._limit is not None:
+            sql += f" LIMIT {self._limit}"
+        return sql, tuple(params)
+
+
+# ---------------------------------------------------------------------
+# [5] 저장소 백엔드 (MariaDB / SQLite)
+# ---------------------------------------------------------------------
+def mariadb_connect():
+    """MARIADB_CONFIG로 MariaDB 연결을 만듭니다."""
+    if mariadb is None:
+        raise ImportError("mariadb 모듈이 필요합니다. (pip install mariadb)")
+    return mariadb.connect(**MARIADB_CONFIG)
+
+
+def sqlite_connect(db_path=SQLITE_PATH):
+    """SQLite 연결을 만듭니다(풀에서 여러 스레드가 번갈아 쓰므로 스레드 검사 해제)."""
+    return sqlite3.connect(str(db_path), check_same_thread=False)
+
+
+def create_room_indexes(conn, table="room", indexes=None):
+    """ROOM_INDEXES의 인덱스 중 테이블에 컬럼이 있는 것만 만듭니다."""
+    cols = {row[1] for row in conn.execute(f"PRAGMA table_info({_ident(table)})")}
+    for name, idx_cols in (ROOM_INDEXES if indexes is None else indexes).items():
+        if all(c in cols for c in idx_cols):
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {_ident(name)} ON {_ident(table)} "
+                f"({', '.join(_ident(c) for c in idx_cols)})"
+            )
+
+
+def build_room_sqlite(csv_path=ROOM_CSV, db_path=SQLITE_PATH, force=False):
+    """
+    room_data_export.csv로 인덱스가 있는 SQLite room 테이블을 만들고 경로를 반환합니다.
+    - CSV 내용(SHA1)이 그대로면 기존 파일을 재사용합니다(force=True면 항상 재생성).
+    - 임시 파일에 다 만든 뒤 교체하므로, 열려 있는 연결은 이전 파일을 계속 봅니다.
+    """
+    csv_path, db_path = Path(csv_path), Path(db_path)
+    digest = data_loader.file_sha1(csv_path)
+    if not force and db_path.exists():
+        try:
+            with sqlite3.connect(str(db_path)) as conn:
+                row = conn.execute("SELECT sha1 FROM room_source").fetchone()
+            if row and row[0] == digest:
+                return db_path
+        except sqlite3.Error:
+            pass
+
+    df = data_loader.read_csv_safely(csv_path)
+
+    def write(tmp):
+        conn = sqlite3.connect(str(tmp))
+        try:
+            df.to_sql("room", conn, index=False, if_exists="replace", chunksize=10_000)
+            create_room_indexes(conn)
+            conn.execute("CREATE TABLE room_source (sha1 TEXT, csv TEXT)")
+            conn.execute("INSERT INTO room_source VALUES (?, ?)", (digest, str(csv_path)))
+            conn.commit()
+        finally:
+            conn.close()
+    data_loader._write_atomic(db_path, write)
+    return db_path
+
+
+def open_room_db(backend=None, **kwargs):
+    """
+    백엔드 이름으로 RoomDB를 만듭니다.
+    - "mariadb": MARIADB_CONFIG 서버
+    - "sqlite": build_room_sqlite()로 만든 로컬 파일 (kwargs의 csv_path/db_path 사용)
+    """
+    backend = (backend or os.environ.get("ROOM_DB_BACKEND", "mariadb")).lower()
+    if backend == "mariadb":
+        return RoomDB(mariadb_connect, name="mariadb")
+    if backend == "sqlite":
+        path = build_room_sqlite(**kwargs)
+        return RoomDB(lambda: sqlite_connect(path), name=f"sqlite:{path}")
+    raise ValueError(f"알 수 없는 백엔드: {backend!r} (mariadb / sqlite)")
+
+
+# ---------------------------------------------------------------------
+# [6] 기본 인스턴스 (프로세스당 하나)
+# ---------------------------------------------------------------------
+@functools.lru_cache(maxsize=None)
+def get_room_db():
+    """대시보드 전체 세션이 공유하는 RoomDB를 반환합니다(ROOM_DB_BACKEND로 백엔드 선택)."""
+    return open_room_db()
@@ -0,0 +1,239 @@
+# room_features.py | 매물별 주변 마트 접근성 컬럼 (일괄 계산)
+# =============================================================================
+# 기능 요약:
+# - mart_features: 매물 위경도로 가장 가까운 마트 거리/이름, 반경 300m·500m·1km 안의
+#   마트 수를 마트 공간 인덱스(spatial_index)의 대량 질의로 한 번에 계산합니다.
+# - attach_mart_features: 위 컬럼을 매물 옆에 붙인 DataFrame을 반환합니다.
+# - ingest_listing_features: 스냅샷 적재용 (room_data.ingest_room_rows + 마트 접근성 + 경계 기반 자치구)
+#   -> 동기화 때 새 매물에만 계산해 스냅샷에 저장하므로, 가격/거리 페이지는
+#      요청마다 거리 계산 없이 컬럼을 읽기만 합니다.
+# - 마트 데이터가 바뀌면 일괄 작업으로 스냅샷 전체를 다시 계산합니다.
+# - attach_districts: 매물 위경도로 자치구 경계 안에 드는지 판정해 geo_district_code를 붙이고,
+#   주소 분해가 실패한 매물의 district_code를 채웁니다(스냅샷 적재 때 함께 계산).
+#   적재 때는 동봉/캐시된 경계만 씁니다(네트워크를 기다리지 않음).
+# - listing_districts: 경계가 없던 때 적재된 행을 rewrite()로 채우고 스냅샷 전체의 자치구 코드를 반환
+#   (스냅샷 버전/경계 버전마다 한 번만 검사, 대시보드의 스냅샷 조회 경로에서 호출)
+#
+# 사용법:
+#   python room_features.py            # 스냅샷 동기화 후 전체 매물 재계산
+#   python room_features.py --full     # DB 전체 재적재 후 재계산
+#
+# 마트 데이터 위치는 환경 변수 MART_DATA_SOURCE로 바꿀 수 있습니다(기본: data 폴더).
+# =============================================================================
+import argparse
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from boundary_geometry import assign_features
+from data_loader import open_source
+from room_data import ingest_room_rows
+from safety_data import get_dataset
+from seoul_boundary import boundary_names, load_boundary
+from seoul_regions import district_codes, extract_regions
+from spatial_index import get_mart_index
+
+# 마트 데이터 소스 (폴더 또는 data.zip)
+MART_SOURCE = os.environ.get("MART_DATA_SOURCE", "data")
+
+# 마트 수를 셀 반경 (미터)
+MART_RADII_M = (300, 500, 1000)
+
+# 만들어지는 컬럼 -> 화면 라벨
+MART_FEATURE_LABELS = {
+    "mart_nearest_m": "가까운 마트 거리(m)",
+    "mart_nearest_name": "가까운 마트",
+    **{f"mart_count_{r}m": f"{r:,}m 내 마트 수" for r in MART_RADII_M},
+}
+# 화면에 보이지 않는 컬럼: 가장 가까운 마트의 마트 데이터셋 위치(iloc, 없으면 <NA>)
+MART_FEATURE_COLUMNS = (*MART_FEATURE_LABELS, "mart_nearest_pos")
+
+# (스냅샷 버전, 경계 버전) -> 자치구 배정 결과 (최신 한 개만 보관)
+_DISTRICTS = {}
+_DISTRICTS_LOCK = threading.Lock()
+
+
+# ---------------------------------------------------------------------
+# [1] 계산
+# ---------------------------------------------------------------------
+def _coords(df):
+    """매물 DataFrame의 (위도, 경도) float64 배열 (변환 불가/결측은 NaN)."""
+    return tuple(
+        pd.to_numeric(df[c], errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+        for c in ("latitude", "longitude")
+    )
+
+
+def mart_features(df, index, names, radii=MART_RADII_M):
+    """
+    매물 DataFrame(latitude/longitude)의 마트 접근성 컬럼을 DataFrame으로 반환합니다.
+    - index: 마트 SpatialIndex, names: 인덱스 위치 순서의 마트 이름 배열
+    - mart_nearest_pos: 가장 가까운 마트의 위치(마트 데이터셋 iloc). 이름이 같은 체인점도 구별됩니다.
+    - 좌표가 없는 매물은 거리/이름/위치가 결측, 개수는 0
+    """
+    lats, lons = _coords(df)
+    pos, dist = index.knearest_many(lats, lons, k=1)
+    pos, dist = pos[:, 0], dist[:, 0]
+    counts = index.count_within(lats, lons, radii)
+
+    names = pd.Categorical(np.asarray(names, dtype=object))
+    codes = np.where(pos >= 0, names.codes[np.maximum(pos, 0)], -1)
+    out = pd.DataFrame({
+        "mart_nearest_m": dist.astype("float32"),
+        "mart_nearest_name": pd.Categorical.from_codes(codes, dtype=names.dtype),
+        "mart_nearest_pos": pd.array(np.where(pos >= 0, pos, 0), dtype="Int32"),
+    }, index=df.index)
+    out.loc[pos < 0, "mart_nearest_pos"] = pd.NA
+    for i, r in enumerate(radii):
+        out[f"mart_count_{r}m"] = counts[:, i].astype("int16")
+    return out
+
+
+def attach_mart_features(df, source=None):
+    """
+    마트 접근성 컬럼을 붙인(이미 있으면 다시 계산한) DataFrame(얕은 복사본)을 반환합니다.
+    - 위경도 컬럼이나 마트 데이터가 없으면 df를 그대로 반환합니다.
+    """
+    if df.empty or not {"latitude", "longitude"} <= set(df.columns):
+        return df
+    source = source or open_source(MART_SOURCE)
+    try:
+        marts = get_dataset(source, "mart").frame
+    except FileNotFoundError:
+        return df
+    features = mart_features(df, get_mart_index(source), marts["name"].to_numpy())
+    out = df.copy(deep=False)
+    for c in features.columns:
+        out[c] = features[c]
+    return out
+
+
+# ---------------------------------------------------------------------
+# [2] 자치구 공간 조인
+# ---------------------------------------------------------------------
+def spatial_district_codes(df, boundary):
+    """
+    매물 위경도가 속한 자치구 경계의 district_code(Int16) Series를 반환합니다.
+    - 경계 밖(서울 외)이거나 좌표가 없으면 <NA>
+    """
+    lats, lons = _coords(df)
+    pos = assign_features(lats, lons, boundary)
+    codes = district_codes(pd.Series(boundary_names(boundary), dtype=object)).array
+    codes = pd.array(list(codes) + [None], dtype="Int16")
+    return pd.Series(codes[np.where(pos >= 0, pos, len(codes) - 1)], index=df.index, name="geo_district_code")
+
+
+def _address_district_codes(df):
+    """주소 분해로 얻은 district_code(Int16) Series (주소 컬럼이 없으면 기존 district_code 또는 전부 결측)."""
+    if "property_address" in df.columns:
+        return extract_regions(df["property_address"])["district_code"]
+    if "district_code" in df.columns:
+        return df["district_code"].astype("Int16")
+    return pd.Series(pd.NA, index=df.index, dtype="Int16")
+
+
+def local_boundary():
+    """동봉/캐시된 자치구 경계 (없으면 None). 적재/페이지 경로에서는 네트워크를 쓰지 않습니다."""
+    try:
+        return load_boundary(open_source(MART_SOURCE), download=False)
+    except OSError:
+        return None
+
+
+def attach_districts(df, boundary=None):
+    """
+    geo_district_code(경계 판정)를 붙이고, 주소 분해로 자치구를 못 찾은 행의 district_code를
+    경계 판정 결과로 채운 DataFrame(얕은 복사본)을 반환합니다.
+    - district_code는 매번 주소에서 다시 만들므로 경계가 바뀐 뒤 다시 적용해도 주소 결과가 우선합니다.
+    - boundary를 주지 않으면 동봉/캐시된 경계만 쓰고, 없거나 위경도 컬럼이 없으면 df를 그대로 반환합니다.
+      (그때 빠진 행은 경계가 생긴 뒤 listing_districts가 스냅샷 전체에 채움)
+    """
+    if df.empty or not {"latitude", "longitude"} <= set(df.columns):
+        return df
+    boundary = boundary or local_boundary()
+    if boundary is None:
+        return df
+    geo_codes = spatial_district_codes(df, boundary)
+    out = df.copy(deep=False)
+    out["geo_district_code"] = geo_codes
+    out["district_code"] = _address_district_codes(df).fillna(geo_codes)
+    return out
+
+
+def ingest_listing_features(df):
+    """스냅샷 적재용 전처리: ingest_room_rows + 마트 접근성 + 경계 기반 자치구(동봉/캐시 경계가 있을 때)."""
+    return attach_districts(attach_mart_features(ingest_room_rows(df)))
+
+
+def _missing_districts(df, boundary):
+    """경계 판정이 빠졌는데(컬럼 없음/결측) 실제로는 경계 안에 드는 행이 있는지 여부."""
+    lats, lons = _coords(df)
+    todo = ~(np.isnan(lats) | np.isnan(lons))
+    if "geo_district_code" in df.columns:
+        todo &= df["geo_district_code"].isna().to_numpy()
+    return bool(todo.any()) and bool((assign_features(lats[todo], lons[todo], boundary) >= 0).any())
+
+
+def listing_districts(snapshot, boundary=None):
+    """
+    스냅샷 전체 매물의 자치구 코드를 DataFrame(geo_district_code, district_code)으로 반환합니다.
+    - 경계가 없던 때 적재된 행(경계 판정이 빠진 행)이 있으면 rewrite()로 스냅샷 전체에 채웁니다.
+    - 이 검사는 (스냅샷 버전, 경계 버전)마다 한 번만 하고, 이후에는 캐시된 결과를 반환합니다.
+    - boundary를 주지 않으면 동봉/캐시된 경계만 씁니다. 경계가 없으면 None.
+    """
+    boundary = boundary or local_boundary()
+    if boundary is None:
+        return None
+    df = snapshot.frame()
+    key = (snapshot.version, boundary.version)
+    if key in _DISTRICTS:
+        return _DISTRICTS[key]
+    with _DISTRICTS_LOCK:
+        if _missing_districts(df, boundary):
+            df = snapshot.rewrite(lambda frame: attach_districts(frame, boundary))
+        out = df[["geo_district_code", "district_code"]] if "geo_district_code" in df.columns else None
+        _DISTRICTS.clear()
+        _DISTRICTS[(snapshot.version, boundary.version)] = out
+    return out
+
+
+# ---------------------------------------------------------------------
+# [3] 일괄 작업
+# ---------------------------------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description="매물별 마트 접근성 컬럼 일괄 계산")
+    parser.add_argument("--full", action="store_true", help="DB에서 전체 재적재 후 계산")
+    args = parser.parse_args()
+
+    # room_snapshot이 이 모듈의 ingest_listing_features를 쓰므로 실행할 때 import
+    from room_snapshot import get_room_snapshot
+
+    snapshot = get_room_snapshot()
+    fetched = snapshot.refresh(full=args.full)
+    # 일괄 작업은 경계 파일이 없으면 내려받아 캐시에 저장 (대시보드/적재 경로는 이 캐시를 씀)
+    try:
+        boundary = load_boundary(open_source(MART_SOURCE))
+    except OSError as e:
+        print(f"자치구 경계를 읽지 못해 공간 조인을 건너뜁니다: {e}")
+        boundary = None
+    t0 = time.perf_counter()
+    df = snapshot.rewrite(lambda frame: attach_districts(attach_mart_features(frame), boundary))
+    ms = (time.perf_counter() - t0) * 1000
+    print(f"동기화 {fetched:,}행 · 매물 {len(df):,}행 마트 접근성/자치구 계산 {ms:,.1f} ms")
+    present = [c for c in MART_FEATURE_COLUMNS if c in df.columns]
+    if present:
+        print(df[present].describe(include="all").to_string())
+    else:
+        print(f"마트 데이터({MART_SOURCE})를 찾지 못해 컬럼을 만들지 않았습니다.")
+
+    if "geo_district_code" in df.columns:
+        parsed = _address_district_codes(df)
+        filled = int((parsed.isna() & df["geo_district_code"].notna()).sum())
+        print(f"자치구: 주소로 못 찾은 {int(parsed.isna().sum()):,}행 중 {filled:,}행을 경계로 배정")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+# room_snapshot.py | room 테이블 로컬 스냅샷 + 증분 동기화
+# =============================================================================
+# 기능 요약:
+# - RoomSnapshot: room 테이블 전체를 로컬 Arrow(컬럼형) 파일로 보관하고,
+#   refresh 때는 워터마크(created_at, id)보다 새로운 행만 DB에서 가져옵니다.
+# - 가져온 행은 id / property_url 기준으로 기존 행을 덮어쓰며 병합하고,
+#   새 스냅샷 파일을 다 쓴 뒤 메타 파일 교체 한 번으로 원자적으로 바꿉니다.
+#   (읽는 쪽은 항상 완성된 이전 또는 새 스냅샷만 봅니다)
+# - 새로고침 비용은 테이블 크기가 아니라 새로 들어온 매물 수에 비례합니다.
+# - DB 조회는 RoomDB.read_chunked(청크 스트리밍 + 작은 dtype)로 합니다.
+# - transform(기본: room_features.ingest_listing_features)은 새로 가져온 행에만 적용되어
+#   복합 텍스트 필드 분해, 편의시설 비트마스크, 마트 접근성, 경계 기반 자치구를 동기화 때 한 번만 계산해 저장합니다.
+# - rewrite: 스냅샷 전체에 함수를 적용해 새 버전으로 저장 (마트 데이터 변경 후 일괄 재계산 등)
+#
+# pyarrow가 없으면 파일 없이 메모리 스냅샷으로만 동작합니다.
+# =============================================================================
+import functools
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+
+import data_loader
+from room_db import RoomQuery, get_room_db
+from room_features import ingest_listing_features
+
+SNAPSHOT_DIR = Path(".cache") / "room_snapshot"
+
+# 같은 세션 재실행마다 DB를 두드리지 않도록, 마지막 동기화 후 이 시간(초) 동안은 재사용
+DEFAULT_MIN_INTERVAL = 60
+
+
+# ---------------------------------------------------------------------
+# [1] 병합 / 워터마크 헬퍼
+# ---------------------------------------------------------------------
+def merge_rows(base, new, keys=("id", "property_url")):
+    """
+    base에 new를 병합합니다. keys 중 하나라도 같은 행은 new 쪽이 남습니다.
+    - 키 값이 결측인 행은 중복으로 보지 않습니다.
+    """
+    if base is None or base.empty:
+        merged = new
+    elif new.empty:
+        return base
+    else:
+        # 카테고리 컬럼은 양쪽 카테고리를 합쳐 두어야 이어 붙인 뒤에도 category로 유지됨
+        base, new = base.copy(deep=False), new.copy(deep=False)
+        for c in base.columns.intersection(new.columns):
+            if isinstance(base[c].dtype, pd.CategoricalDtype) and isinstance(new[c].dtype, pd.CategoricalDtype):
+                cats = base[c].cat.categories.union(new[c].cat.categories, sort=False)
+                base[c] = base[c].cat.set_categories(cats)
+                new[c] = new[c].cat.set_categories(cats)
+        merged = pd.concat([base, new], ignore_index=True)
+    for k in keys:
+        if k in merged.columns:
+            dup = merged[k].notna() & merged.duplicated(k, keep="last")
+            if dup.any():
+                merged = merged[~dup]
+    return merged.reset_index(drop=True)
+
+
+def compute_watermark(df):
+    """스냅샷의 워터마크 {"created_at": 'YYYY-MM-DD HH:MM:SS' | None, "id": int | None}."""
+    mark = {"created_at": None, "id": None}
+    if df is None or df.empty:
+        return mark
+    if "created_at" in df.columns:
+        ts = pd.to_datetime(df["created_at"], errors="coerce").max()
+        if pd.notna(ts):
+            mark["created_at"] = ts.strftime("%Y-%m-%d %H:%M:%S")
+    if "id" in df.columns:
+        max_id = pd.to_numeric(df["id"], errors="coerce").max()
+        if pd.notna(max_id):
+            mark["id"] = int(max_id)
+    return mark
+
+
+def incremental_query(mark, table="room"):
+    """워터마크 이후(created_at 또는 id가 더 큰) 행만 조회하는 RoomQuery."""
+    q = RoomQuery(table)
+    clauses, params = [], []
+    if mark.get("created_at") is not None:
+        clauses.append("created_at > ?")
+        params.append(mark["created_at"])
+    if mark.get("id") is not None:
+        clauses.append("id > ?")
+        params.append(mark["id"])
+    if clauses:
+        q.where(f"({' OR '.join(clauses)})", *params)
+    return q
+
+
+# ---------------------------------------------------------------------
+# [2] 스냅샷
+# ---------------------------------------------------------------------
+class RoomSnapshot:
+    """
+    room 테이블의 로컬 컬럼형 스냅샷.
+    - frame(): 현재 스냅샷 (필요하면 먼저 증분 동기화, DB 장애 시 저장된 스냅샷)
+    - refresh(full=False): 워터마크 이후 행만 받아 병합 (full=True면 전체 재적재)
+    - rewrite(fn): 스냅샷 전체에 fn을 적용해 새 버전으로 저장
+    - version: 스냅샷 버전 (스냅샷에서 계산한 값의 캐시 키)
+    - transform: 가져온 행에 적용할 함수 (DataFrame -> DataFrame)
+    - 반환 DataFrame은 스냅샷의 얕은 복사본이므로 컬럼 추가/교체는 안전합니다.
+    """
+
+    def __init__(self, db, table="room", snapshot_dir=SNAPSHOT_DIR,
+                 keys=("id", "property_url"), min_interval=DEFAULT_MIN_INTERVAL, transform=None):
+        self.db = db
+        self.transform = transform
+        self.table = table
+        self.dir = Path(snapshot_dir)
+        self.meta_path = self.dir / f"{table}.json"
+        self.keys = tuple(keys)
+        self.min_interval = min_interval
+        self._df = None
+        self._meta = None
+        self._synced = 0.0
+        self._lock = threading.Lock()
+        self.last_sync = {}
+
+    # --- 파일 -------------------------------------------------------
+    def _load(self):
+        """디스크의 스냅샷을 읽습니다(없거나 깨졌으면 None)."""
+        if data_loader.pa is None:
+            return None, None
+        meta = data_loader._read_meta(self.meta_path)
+        if not meta:
+            return None, None
+        try:
+            return data_loader._read_arrow(self.dir / meta["file"]), meta
+        except (OSError, KeyError, data_loader.pa.ArrowInvalid):
+            return None, None
+
+    def _save(self, df, meta):
+        """새 버전 파일을 쓰고 메타 파일을 교체하여 스냅샷을 원자적으로 바꿉니다."""
+        if data_loader.pa is None:
+            return
+        old_file = (self._meta or {}).get("file")
+        meta["file"] = f"{self.table}.{meta['version']}.arrow"
+        data_loader._write_arrow(df, self.dir / meta["file"])
+        data_loader._write_meta(self.meta_path, meta)
+        if old_file and old_file != meta["file"]:
+            try:
+                (self.dir / old_file).unlink()
+            except OSError:
+                # 다른 프로세스가 아직 열고 있으면(Windows) 그대로 둠
+                pass
+
+    # --- 동기화 -----------------------------------------------------
+    def refresh(self, full=False):
+        """DB와 동기화하고 이번에 가져온 행 수를 반환합니다."""
+        with self._lock:
+            t0 = time.perf_counter()
+            if self._df is None and not full:
+                self._df, self._meta = self._load()
+
+            # read_chunked는 결과 캐시를 거치지 않음 (같은 워터마크라도 새 행이 있을 수 있음)
+            full = full or self._df is None
+            if full:
+                new = self.db.read_chunked(*RoomQuery(self.table).build())
+            else:
+                mark = {k: self._meta.get(k) for k in ("created_at", "id")}
+                new = self.db.read_chunked(*incremental_query(mark, self.table).build())
+            if self.transform is not None and not new.empty:
+                new = self.transform(new)
+            merged = merge_rows(None if full else self._df, new, self.keys)
+
+            if full or not new.empty:
+                meta = dict(
+                    compute_watermark(merged), rows=len(merged),
+                    version=(self._meta or {}).get("version", 0) + 1,
+                    synced_at=time.strftime("%Y-%m-%d %H:%M:%S"),
+                )
+                self._save(merged, meta)
+                # 메모리의 참조 교체도 한 번에 (읽는 쪽은 이전 또는 새 프레임만 봄)
+                self._df, self._meta = merged, meta
+
+            self._synced = time.monotonic()
+            self.last_sync = dict(
+                fetched=len(new), rows=len(self._df), full=full,
+                ms=(time.perf_counter() - t0) * 1000,
+                created_at=self._meta.get("created_at"), id=self._meta.get("id"),
+            )
+            return len(new)
+
+    def rewrite(self, fn):
+        """스냅샷 전체를 fn(DataFrame -> DataFrame)으로 바꿔 새 버전으로 저장하고 반환합니다(워터마크는 유지)."""
+        with self._lock:
+            if self._df is None:
+                self._df, self._meta = self._load()
+            if self._df is None:
+                raise RuntimeError("스냅샷이 없습니다. 먼저 refresh()로 동기화하세요.")
+            df = fn(self._df).reset_index(drop=True)
+            meta = dict(
+                self._meta, rows=len(df), version=self._meta.get("version", 0) + 1,
+                synced_at=time.strftime("%Y-%m-%d %H:%M:%S"),
+            )
+            self._save(df, meta)
+            self._df, self._meta = df, meta
+            return df.copy(deep=False)
+
+    @property
+    def version(self):
+        """현재 스냅샷 버전 (refresh/rewrite로 내용이 바뀔 때마다 1씩 증가, 없으면 0)."""
+        return (self._meta or {}).get("version", 0)
+
+    def frame(self, max_age=None):
+        """
+        스냅샷을 반환합니다. 마지막 동기화가 max_age초보다 오래됐으면 먼저 증분 동기화.
+        - DB 동기화에 실패해도 메모리/디스크에 스냅샷이 있으면 그것을 반환하고,
+          오류는 last_sync["error"]에 남깁니다. 실패 후에도 min_interval 동안은 다시 시도하지 않습니다.
+        - 스냅샷이 전혀 없을 때만 예외를 그대로 올립니다.
+        """
+        max_age = self.min_interval if max_age is None else max_age
+        if self._df is None or time.monotonic() - self._synced > max_age:
+            try:
+                self.refresh()
+            except Exception as e:
+                # 드라이버/접속/쿼리 오류 모두 같은 처리 (DB 종류마다 예외 타입이 다름)
+                with self._lock:
+                    if self._df is None:
+                        self._df, self._meta = self._load()
+                    if self._df is None:
+                        raise
+                    self._synced = time.monotonic()
+                    self.last_sync = dict(
+                        fetched=0, rows=len(self._df), full=False, ms=0.0,
+                        created_at=self._meta.get("created_at"), id=self._meta.get("id"),
+                        error=f"{type(e).__name__}: {e}",
+                    )
+        return self._df.copy(deep=False)
+
+
+@functools.lru_cache(maxsize=None)
+def get_room_snapshot():
+    """대시보드 전체 세션이 공유하는 room 스냅샷을 반환합니다."""
+    return RoomSnapshot(get_room_db(), transform=ingest_listing_features)
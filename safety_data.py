@@ -0,0 +1,226 @@
+# safety_data.py | 치안 데이터(CCTV/경찰/범죄/마트) 전처리 + 공유 레지스트리
+# =============================================================================
+# 기능 요약:
+# - to_numeric_df / extract_year_cols / police_sum_by_year: 기존 전처리 헬퍼
+#   (쉼표 천 단위 숫자는 CSV를 읽을 때 thousands=","로 바로 숫자형으로 파싱하고,
+#    남은 문자열 컬럼만 parse_thousands로 한 번에 변환합니다)
+# - get_dataset: 데이터셋을 프로세스당 한 번만 읽고 정리한 뒤 읽기 전용으로
+#   고정(freeze)하여, 모든 Streamlit 세션이 같은 DataFrame을 공유하도록 합니다.
+# - registry_report: 레지스트리에 올라간 데이터셋별 메모리 사용량을 보고합니다.
+# - Dataset.district_code: 표의 자치구 키(자치구별/구분/경찰서/주소)를
+#   적재할 때 한 번 정수 코드로 바꿔 두어, 매물(district_code)과 정수 키로 비교할 수 있게 합니다.
+#
+# ⚠️ get_dataset이 돌려주는 DataFrame은 세션 간에 공유되므로 inplace 수정 금지.
+#    필터링/컬럼 추가는 새 DataFrame을 만들어 사용하세요.
+# =============================================================================
+import re
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from seoul_regions import district_codes
+
+# ---------------------------------------------------------------------
+# [1] 전처리 헬퍼
+# ---------------------------------------------------------------------
+def parse_thousands(s):
+    """
+    '1,234' 형태의 쉼표 천 단위 문자열 Series를 숫자형으로 변환합니다.
+    - 정규식 대신 고정 문자열 치환(.str.replace, regex=False)으로 한 번에 처리합니다.
+    - 이미 숫자형이면 그대로 반환합니다(복사 없음).
+    """
+    if pd.api.types.is_numeric_dtype(s.dtype):
+        return s
+    # 문자열이 아닌 값(숫자/결측)은 치환 결과가 NaN이 되므로 원래 값으로 되돌림
+    return pd.to_numeric(s.str.replace(",", "", regex=False).fillna(s), errors="coerce")
+
+def to_numeric_df(df, cols):
+    """쉼표를 제거하고 지정된 컬럼들을 숫자형으로 변환합니다(숫자형 컬럼은 건너뜀)."""
+    out = df.copy(deep=False)
+    for c in cols:
+        out[c] = parse_thousands(out[c])
+    return out
+
+def extract_year_cols(df, include_preinstalled=False):
+    """
+    '년'이 포함된 컬럼만 추출합니다.
+    - include_preinstalled=False: '이전'이 들어간 누계형 컬럼은 제외합니다.
+    """
+    year_cols = [c for c in df.columns if "년" in str(c)]
+    if not include_preinstalled:
+        year_cols = [c for c in year_cols if "이전" not in str(c)]
+    return year_cols
+
+# 경찰 컬럼명 "2018년 지구대" -> (연도, 유형)
+POLICE_HEADER_PATTERN = re.compile(r"(20[0-3]\d)\s*년?\s*(.*)")
+
+def police_by_type(df):
+    """
+    경찰 데이터의 연도 세부 컬럼을 (연도, 유형) MultiIndex 컬럼 하나로 정리합니다.
+    - 헤더는 한 번만 파싱하고, 값은 한 번에 숫자형으로 변환합니다.
+    - 인덱스는 원본과 같으므로 식별 컬럼(경찰서/구분)과 그대로 맞춰 쓸 수 있습니다.
+    - 예: detail[2024] -> 2024년 유형별(지구대/파출소/치안센터) 값
+    """
+    keys, cols = [], []
+    for col in df.columns:
+        m = POLICE_HEADER_PATTERN.search(str(col))
+        if m:
+            keys.append((int(m.group(1)), m.group(2).strip() or "합계"))
+            cols.append(col)
+
+    detail = to_numeric_df(df[cols], cols)
+    detail.columns = pd.MultiIndex.from_tuples(keys, names=["연도", "유형"])
+    return detail.sort_index(axis=1, level="연도", sort_remaining=False)
+
+def police_year_totals(detail):
+    """police_by_type 결과를 연도별로 합산한 '{YYYY}년' 컬럼 DataFrame을 반환합니다."""
+    totals = detail.T.groupby(level="연도").sum().T
+    totals.columns = [f"{y}년" for y in totals.columns]
+    return totals
+
+def police_sum_by_year(df, detail=None):
+    """
+    경찰 데이터에서 같은 연도의 세부 컬럼(지구대, 파출소 등)을 합쳐
+    '{YYYY}년' 단일 컬럼으로 만들고 원본 세부 컬럼은 제거합니다.
+    - 이미 만든 police_by_type 결과(detail)가 있으면 재사용합니다.
+    """
+    if detail is None:
+        detail = police_by_type(df)
+    id_cols = [c for c in df.columns if not POLICE_HEADER_PATTERN.search(str(c))]
+    return pd.concat([df[id_cols], police_year_totals(detail)], axis=1)
+
+# ---------------------------------------------------------------------
+# [2] 데이터셋별 정리 함수: raw -> (정리된 DataFrame, 연도 컬럼 목록, 세부 DataFrame)
+# ---------------------------------------------------------------------
+def prepare_cctv(raw):
+    """CCTV: 총계 컬럼과 '계' 행을 제거하고 연도 컬럼을 숫자형으로 변환합니다."""
+    year_cols = extract_year_cols(raw, include_preinstalled=False)
+    drop_cols = [c for c in ["총 계", "총계", "합계"] if c in raw.columns]
+    df = to_numeric_df(raw.drop(columns=drop_cols, errors="ignore"), year_cols)
+    if "구분" in df.columns:
+        df = df[df["구분"] != "계"]
+    return df, year_cols, None
+
+def prepare_police(raw):
+    """
+    경찰: (연도, 유형) 세부 표를 만들고, 같은 표에서 '{YYYY}년' 합계를 구합니다.
+    - 세부 표는 Dataset.detail로 공유되어 유형별 드릴다운에 재파싱 없이 쓰입니다.
+    """
+    detail = police_by_type(raw)
+    df = police_sum_by_year(raw, detail)
+    return df, [c for c in df.columns if "년" in c], detail
+
+def prepare_crime(raw):
+    """범죄: '…년' 컬럼을 정수형으로 변환합니다(결측은 0)."""
+    df = raw.copy()
+    year_cols = [c for c in df.columns if str(c).endswith("년")]
+    for c in year_cols:
+        df[c] = pd.to_numeric(df[c], errors="coerce").fillna(0).astype(int)
+    return df, year_cols, None
+
+def prepare_mart(raw):
+    """마트: 위도/경도가 없는 점포를 제거합니다."""
+    return raw.dropna(subset=["latitude", "longitude"]), [], None
+
+# 데이터셋 이름 -> (기본 파일명, 정리 함수, read_csv 옵션)
+# 쉼표 천 단위 숫자("2,339")는 CSV 파서가 읽는 시점에 바로 숫자형으로 변환
+DATASETS = {
+    "cctv": ("cctv.csv", prepare_cctv, {"thousands": ","}),
+    "police": ("police.csv", prepare_police, {"thousands": ","}),
+    "crime": ("crime.csv", prepare_crime, {"thousands": ","}),
+    "mart": ("martdata.csv", prepare_mart, {}),
+}
+
+# ---------------------------------------------------------------------
+# [3] 공유 레지스트리
+# ---------------------------------------------------------------------
+Dataset = namedtuple("Dataset", ["name", "member", "raw", "frame", "year_cols", "detail", "load_ms", "district_code"])
+
+# 자치구 키로 쓸 컬럼 (앞에 있을수록 우선)
+DISTRICT_KEY_COLUMNS = ("자치구별", "자치구", "구분", "경찰서", "address1")
+
+_REGISTRY = {}
+_REGISTRY_LOCK = threading.Lock()
+_KEY_LOCKS = {}
+
+def freeze_frame(df):
+    """
+    NumPy 기반 컬럼을 읽기 전용 배열로 바꾼 DataFrame을 반환합니다.
+    - 공유 데이터에 대한 실수로 인한 제자리 수정(df.loc[...] = ...)이 오류로 드러납니다.
+    - 확장 dtype(문자열/카테고리 등)은 그대로 둡니다.
+    """
+    columns = {}
+    for i in range(df.shape[1]):
+        s = df.iloc[:, i]
+        if isinstance(s.dtype, np.dtype):
+            arr = s.to_numpy(copy=True)
+            arr.flags.writeable = False
+            columns[i] = arr
+        else:
+            columns[i] = s.array
+    out = pd.DataFrame(columns, index=df.index, copy=False)
+    # 위치 번호로 만든 뒤 원래 컬럼(MultiIndex/중복 이름 포함)을 그대로 복원
+    out.columns = df.columns
+    out.attrs.update(df.attrs)
+    return out
+
+def get_dataset(source, name, member=None):
+    """
+    데이터셋을 프로세스당 한 번만 읽고 정리하여 공유합니다.
+    - source: data_loader.open_source()가 반환한 데이터 소스
+    - name: DATASETS의 키 ("cctv", "police", "crime", "mart")
+    - member: 기본 파일명 대신 읽을 파일명 (예: "crime2.csv")
+    """
+    default_member, prepare, read_kwargs = DATASETS[name]
+    member = member or default_member
+    key = (source, name, member)
+
+    entry = _REGISTRY.get(key)
+    if entry is not None:
+        return entry
+
+    # 같은 데이터셋을 여러 세션이 동시에 요청해도 한 번만 로드
+    with _REGISTRY_LOCK:
+        key_lock = _KEY_LOCKS.setdefault(key, threading.Lock())
+    with key_lock:
+        entry = _REGISTRY.get(key)
+        if entry is None:
+            t0 = time.perf_counter()
+            raw = source.read_csv(member, **read_kwargs)
+            frame, year_cols, detail = prepare(raw)
+            key_col = next((c for c in DISTRICT_KEY_COLUMNS if c in frame.columns), None)
+            entry = Dataset(
+                name=name, member=member,
+                raw=freeze_frame(raw), frame=freeze_frame(frame),
+                year_cols=tuple(year_cols),
+                detail=None if detail is None else freeze_frame(detail),
+                load_ms=(time.perf_counter() - t0) * 1000,
+                district_code=None if key_col is None else district_codes(frame[key_col]),
+            )
+            _REGISTRY[key] = entry
+    return entry
+
+def registry_report():
+    """레지스트리 항목별 행/열 수, 메모리 사용량(바이트), 로드 시간을 DataFrame으로 반환합니다."""
+    rows = []
+    for entry in list(_REGISTRY.values()):
+        raw_bytes = int(entry.raw.memory_usage(deep=True).sum())
+        frame_bytes = int(entry.frame.memory_usage(deep=True).sum())
+        if entry.detail is not None:
+            frame_bytes += int(entry.detail.memory_usage(deep=True).sum())
+        rows.append({
+            "데이터셋": entry.name, "파일": entry.member,
+            "행": len(entry.frame), "열": entry.frame.shape[1],
+            "원본(bytes)": raw_bytes, "정리본(bytes)": frame_bytes,
+            "합계(bytes)": raw_bytes + frame_bytes, "로드(ms)": round(entry.load_ms, 2),
+        })
+    return pd.DataFrame(rows)
+
+def clear_registry():
+    """레지스트리를 비웁니다(데이터 파일 교체 후 다시 읽을 때 사용)."""
+    with _REGISTRY_LOCK:
+        _REGISTRY.clear()
+        _KEY_LOCKS.clear()
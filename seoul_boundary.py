@@ -0,0 +1,173 @@
+# seoul_boundary.py | 서울 자치구 경계(GeoJSON) 로컬 저장소
+# =============================================================================
+# 기능 요약:
+# - load_boundary: 자치구 경계 GeoJSON을 프로세스당 한 번만 읽고 파싱해 두고,
+#   모든 세션/재실행이 같은 메모리 객체를 씁니다. (Choropleth 레이어와 라벨 위치가 같은 객체에서 계산됨)
+# - 읽는 순서: 데이터 소스(data 폴더/data.zip)에 동봉된 파일 -> 로컬 캐시(.cache/geo)
+#   -> 둘 다 없을 때만 원격 URL에서 한 번 내려받아(타임아웃 있음) 캐시에 저장
+# - refresh=True: 원격에서 다시 내려받아 캐시와 메모리 객체를 교체 (수동 갱신용)
+# - 내려받기는 전역 잠금 밖에서 하고(같은 키는 한 스레드만), 실패하면 백오프 시간 동안
+#   기억해 두었다가 재실행마다 네트워크를 기다리지 않고 바로 오류를 냅니다(오프라인 대비).
+# - Boundary.version: 파일 내용 해시. 경계로부터 계산한 값(라벨 위치 등)의 캐시 키로 씁니다.
+#
+# 사용법 (경계 파일을 미리 내려받아 캐시에 저장 / 갱신 / 데이터 소스에 동봉):
+#   python seoul_boundary.py [--refresh]
+#   python seoul_boundary.py --bundle dashboard/data.zip   # zip(또는 data 폴더)에 경계 파일 추가
+#
+# ⚠️ Boundary.geojson은 세션 간에 공유되므로 제자리 수정 금지.
+# =============================================================================
+import argparse
+import hashlib
+import json
+import threading
+import time
+import urllib.request
+import zipfile
+from collections import namedtuple
+from pathlib import Path
+
+import data_loader
+
+# 원본 경계 파일 (통계청 2013 서울 자치구, 단순화 버전)
+SEOUL_GEOJSON_URL = "https://raw.githubusercontent.com/southkorea/seoul-maps/master/kostat/2013/json/seoul_municipalities_geo_simple.json"
+SEOUL_GEOJSON_FILE = "seoul_municipalities_geo_simple.json"
+
+# 내려받은 경계 파일을 보관할 디렉터리
+BOUNDARY_CACHE_DIR = Path(".cache") / "geo"
+
+# 원격 요청 타임아웃 (초)
+DEFAULT_TIMEOUT = 10
+
+# 내려받기 실패 후 다시 시도하기까지의 대기 시간 (초): 실패할 때마다 두 배, 최대 MAX
+RETRY_BACKOFF = 30
+RETRY_BACKOFF_MAX = 3600
+
+Boundary = namedtuple("Boundary", ["geojson", "version", "origin"])
+
+_BOUNDARIES = {}
+# 키 -> (다음 시도 가능 시각(monotonic), 연속 실패 횟수, 마지막 오류)
+_FAILURES = {}
+# 키 -> 내려받기 잠금 (같은 키는 한 스레드만 내려받고 나머지는 결과를 기다림)
+_DOWNLOAD_LOCKS = {}
+_LOCK = threading.Lock()
+
+
+# ---------------------------------------------------------------------
+# [1] 읽기 / 내려받기
+# ---------------------------------------------------------------------
+def _parse(raw, origin):
+    return Boundary(
+        geojson=json.loads(raw.decode("utf-8-sig")),
+        version=hashlib.sha1(raw).hexdigest()[:12],
+        origin=origin,
+    )
+
+
+def download_boundary(url=SEOUL_GEOJSON_URL, cache_dir=BOUNDARY_CACHE_DIR, timeout=DEFAULT_TIMEOUT):
+    """원격 경계 파일을 내려받아 캐시에 원자적으로 저장하고 바이트를 반환합니다."""
+    with urllib.request.urlopen(url, timeout=timeout) as resp:
+        raw = resp.read()
+    json.loads(raw.decode("utf-8-sig"))  # 깨진 응답은 캐시에 남기지 않음
+
+    def write(tmp):
+        Path(tmp).write_bytes(raw)
+    data_loader._write_atomic(Path(cache_dir) / SEOUL_GEOJSON_FILE, write)
+    return raw
+
+
+def _read_local(source, cache_dir):
+    """동봉 파일 또는 캐시 파일의 (바이트, 출처)를 반환합니다(없으면 (None, None))."""
+    if source is not None and SEOUL_GEOJSON_FILE in source:
+        location = getattr(source, "path", None) or getattr(source, "root", "")
+        return source.read_bytes(SEOUL_GEOJSON_FILE), f"{location}:{SEOUL_GEOJSON_FILE}"
+    cached = Path(cache_dir) / SEOUL_GEOJSON_FILE
+    if cached.is_file():
+        return cached.read_bytes(), str(cached)
+    return None, None
+
+
+# ---------------------------------------------------------------------
+# [2] 공유 저장소
+# ---------------------------------------------------------------------
+def load_boundary(source=None, refresh=False, cache_dir=BOUNDARY_CACHE_DIR, timeout=DEFAULT_TIMEOUT, download=True):
+    """
+    서울 자치구 경계를 반환합니다(프로세스당 한 번 파싱, 이후 같은 객체).
+    - source: data_loader.open_source()의 데이터 소스 (동봉 파일을 먼저 찾음)
+    - refresh: True면 원격에서 다시 내려받아 교체 (실패 백오프 무시)
+    - 동봉/캐시 파일이 없고 최근 내려받기가 실패했다면 백오프가 끝날 때까지 바로 OSError
+    - download=False: 동봉/캐시 파일만 읽고 없으면 FileNotFoundError (적재 경로처럼 네트워크를 기다리면 안 될 때)
+    """
+    key = (source, str(cache_dir))
+    entry = _BOUNDARIES.get(key)
+    if entry is not None and not refresh:
+        return entry
+    with _LOCK:
+        entry = _BOUNDARIES.get(key)
+        if entry is not None and not refresh:
+            return entry
+        if not refresh:
+            raw, origin = _read_local(source, cache_dir)
+            if raw is not None:
+                entry = _BOUNDARIES[key] = _parse(raw, origin)
+                return entry
+            if not download:
+                raise FileNotFoundError(f"동봉/캐시된 자치구 경계 파일({SEOUL_GEOJSON_FILE})이 없습니다.")
+        download_lock = _DOWNLOAD_LOCKS.setdefault(key, threading.Lock())
+
+    # 네트워크는 전역 잠금 밖에서 (다른 키/세션의 조회를 막지 않음)
+    with download_lock:
+        entry = _BOUNDARIES.get(key)
+        if entry is not None and not refresh:
+            return entry
+        failure = _FAILURES.get(key)
+        if failure is not None and not refresh and time.monotonic() < failure[0]:
+            wait = failure[0] - time.monotonic()
+            raise OSError(f"자치구 경계 내려받기 실패 ({wait:,.0f}초 뒤 재시도): {failure[2]}")
+        try:
+            raw = download_boundary(cache_dir=cache_dir, timeout=timeout)
+        except (OSError, ValueError) as e:
+            attempts = failure[1] + 1 if failure else 1
+            backoff = min(RETRY_BACKOFF * 2 ** (attempts - 1), RETRY_BACKOFF_MAX)
+            _FAILURES[key] = (time.monotonic() + backoff, attempts, e)
+            raise OSError(f"자치구 경계 내려받기 실패 ({backoff:,}초 뒤 재시도): {e}") from e
+        entry = _parse(raw, SEOUL_GEOJSON_URL)
+        with _LOCK:
+            _FAILURES.pop(key, None)
+            _BOUNDARIES[key] = entry
+    return entry
+
+
+def bundle_boundary(target, raw):
+    """경계 파일을 데이터 소스(zip 또는 폴더)에 동봉합니다. 이후 load_boundary가 네트워크 없이 읽습니다."""
+    target = Path(target)
+    if target.suffix.lower() == ".zip":
+        with zipfile.ZipFile(target, "a", compression=zipfile.ZIP_DEFLATED) as zf:
+            if SEOUL_GEOJSON_FILE not in zf.namelist():
+                zf.writestr(SEOUL_GEOJSON_FILE, raw)
+    else:
+        def write(tmp):
+            Path(tmp).write_bytes(raw)
+        data_loader._write_atomic(target / SEOUL_GEOJSON_FILE, write)
+
+
+def boundary_names(boundary, key="name"):
+    """경계 feature의 properties[key] 목록 (자치구 이름)."""
+    return [f["properties"].get(key) for f in boundary.geojson["features"]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="서울 자치구 경계 GeoJSON 캐시")
+    parser.add_argument("--refresh", action="store_true", help="원격에서 다시 내려받기")
+    parser.add_argument("--source", default=None, help="동봉 파일을 찾을 데이터 폴더/zip")
+    parser.add_argument("--bundle", default=None, help="경계 파일을 추가할 데이터 폴더/zip (예: dashboard/data.zip)")
+    args = parser.parse_args()
+    source = data_loader.open_source(args.source) if args.source else None
+    boundary = load_boundary(source, refresh=args.refresh)
+    print(f"{boundary.origin} · 버전 {boundary.version} · 자치구 {len(boundary.geojson['features'])}개")
+    if args.bundle:
+        bundle_boundary(args.bundle, json.dumps(boundary.geojson, ensure_ascii=False).encode("utf-8"))
+        print(f"{args.bundle}에 {SEOUL_GEOJSON_FILE} 동봉")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+# seoul_regions.py | 서울 행정구역(시/구/동) 주소 분해 + 자치구 정수 코드
+# =============================================================================
+# 기능 요약:
+# - SEOUL_DISTRICTS: 25개 자치구 이름 -> 행정구역 코드(시군구 5자리, 예: 동작구 11590)
+# - RegionTrie: 시/구 이름(별칭, 띄어쓴 표기 포함)을 글자 단위 트라이로 미리 만들어 두고,
+#   주소 앞부분에서 가장 긴 일치를 한 번 훑어 찾습니다("서울특별시 동작구 사당동 72-9",
+#   "서울시동작구사당동" 모두 처리).
+# - extract_regions: 주소 컬럼 전체를 고유값에만 분해한 뒤 코드로 펼쳐
+#   district_code(Int16) / gu(고정 카테고리) / dong(카테고리) 컬럼을 만듭니다.
+# - district_codes: 치안 표의 키(자치구별 "중구", 구분 "중 구", 경찰서 "중부")를
+#   같은 district_code로 바꿔, 매물과 치안 표를 문자열 비교 없이 정수 키로 조인합니다.
+# =============================================================================
+import functools
+import re
+
+import numpy as np
+import pandas as pd
+
+# ---------------------------------------------------------------------
+# [1] 행정구역 표
+# ---------------------------------------------------------------------
+# 서울특별시 표기 (주소 맨 앞에 올 수 있는 형태)
+SEOUL_CITY_NAMES = ("서울특별시", "서울시", "서울")
+
+# 자치구 -> 시군구 코드 (코드 순)
+SEOUL_DISTRICTS = {
+    "종로구": 11110, "중구": 11140, "용산구": 11170, "성동구": 11200, "광진구": 11215,
+    "동대문구": 11230, "중랑구": 11260, "성북구": 11290, "강북구": 11305, "도봉구": 11320,
+    "노원구": 11350, "은평구": 11380, "서대문구": 11410, "마포구": 11440, "양천구": 11470,
+    "강서구": 11500, "구로구": 11530, "금천구": 11545, "영등포구": 11560, "동작구": 11590,
+    "관악구": 11620, "서초구": 11650, "강남구": 11680, "송파구": 11710, "강동구": 11740,
+}
+DISTRICT_NAMES = tuple(SEOUL_DISTRICTS)
+DISTRICT_BY_CODE = {code: name for name, code in SEOUL_DISTRICTS.items()}
+
+# 경찰서(police.csv '경찰서' 컬럼, "서" 생략) -> 관할 자치구
+POLICE_STATION_DISTRICTS = {
+    "중부": "중구", "남대문": "중구", "종로": "종로구", "혜화": "종로구", "용산": "용산구",
+    "성동": "성동구", "광진": "광진구", "동대문": "동대문구", "중랑": "중랑구", "성북": "성북구",
+    "종암": "성북구", "강북": "강북구", "도봉": "도봉구", "노원": "노원구", "은평": "은평구",
+    "서부": "은평구", "서대문": "서대문구", "마포": "마포구", "양천": "양천구", "강서": "강서구",
+    "구로": "구로구", "금천": "금천구", "영등포": "영등포구", "동작": "동작구", "관악": "관악구",
+    "서초": "서초구", "방배": "서초구", "강남": "강남구", "수서": "강남구", "송파": "송파구",
+    "강동": "강동구",
+}
+
+# 구 다음에 오는 법정동/행정동 ("사당동", "상도1동", "청파동2가", "영등포동5가")
+_DONG_PATTERN = re.compile(r"\s*([가-힣]+\d*[동가](?:\d+가)?)(?![가-힣])")
+
+# ---------------------------------------------------------------------
+# [2] 트라이
+# ---------------------------------------------------------------------
+class RegionTrie:
+    """
+    글자 단위 트라이. 이름 안의 공백은 무시합니다('중 구' == '중구').
+    - 값은 ("city", None) / ("gu", 코드) 처럼 (단계, 값) 튜플
+    """
+
+    _END = ""
+
+    def __init__(self):
+        self.root = {}
+
+    def insert(self, name, value):
+        node = self.root
+        for ch in name:
+            if not ch.isspace():
+                node = node.setdefault(ch, {})
+        node[self._END] = value
+        return self
+
+    def match(self, text, start=0):
+        """text[start:]의 앞부분과 가장 길게 일치하는 이름의 (값, 끝 위치)를 반환합니다(없으면 (None, start))."""
+        node, best, end, i = self.root, None, start, start
+        n = len(text)
+        while i < n and text[i].isspace():
+            i += 1
+        while i < n:
+            ch = text[i]
+            if ch.isspace():
+                i += 1
+                continue
+            node = node.get(ch)
+            if node is None:
+                break
+            i += 1
+            if self._END in node:
+                best, end = node[self._END], i
+        return best, end
+
+
+def build_region_trie():
+    """서울 시 표기와 자치구 이름으로 트라이를 만듭니다."""
+    trie = RegionTrie()
+    for name in SEOUL_CITY_NAMES:
+        trie.insert(name, ("city", None))
+    for name, code in SEOUL_DISTRICTS.items():
+        trie.insert(name, ("gu", code))
+    return trie
+
+
+REGION_TRIE = build_region_trie()
+
+# ---------------------------------------------------------------------
+# [3] 주소 분해
+# ---------------------------------------------------------------------
+@functools.lru_cache(maxsize=65536)
+def tokenize_address(address):
+    """
+    주소 문자열 하나를 (자치구 코드, 동)으로 분해합니다(찾지 못한 부분은 None).
+    - 시 표기는 생략 가능, 자치구를 찾은 경우에만 바로 뒤의 동을 읽습니다.
+    """
+    if not isinstance(address, str):
+        return None, None
+    value, pos = REGION_TRIE.match(address)
+    if value is not None and value[0] == "city":
+        value, pos = REGION_TRIE.match(address, pos)
+    if value is None or value[0] != "gu":
+        return None, None
+    m = _DONG_PATTERN.match(address, pos)
+    return value[1], (m.group(1) if m else None)
+
+
+def extract_regions(s):
+    """
+    주소 Series -> district_code(Int16), gu(자치구 이름, 25개 고정 카테고리), dong(카테고리).
+    - 분해는 고유 주소에만 하고(+ tokenize_address 캐시) 정수 코드로 원래 길이로 펼칩니다.
+    - gu의 카테고리 순서가 고정이므로 gu.cat.codes도 스냅샷과 무관하게 같은 자치구를 가리킵니다.
+    """
+    codes, uniques = pd.factorize(s)
+    parsed = [tokenize_address(a) for a in uniques] + [(None, None)]
+    codes = np.where(codes < 0, len(uniques), codes)
+
+    gu_code = pd.array([p[0] for p in parsed], dtype="Int16")
+    dong = pd.Series([p[1] for p in parsed], dtype=object).astype("category")
+    district = gu_code[codes]
+    return pd.DataFrame({
+        "district_code": district,
+        "gu": pd.Categorical(
+            pd.Series(district).map(DISTRICT_BY_CODE), categories=DISTRICT_NAMES,
+        ),
+        "dong": pd.Categorical.from_codes(dong.cat.codes.to_numpy()[codes], dtype=dong.dtype),
+    }, index=s.index)
+
+
+def attach_regions(df, address_col="property_address"):
+    """주소 컬럼이 있으면 district_code / gu / dong 컬럼을 추가한 DataFrame(얕은 복사본)을 반환합니다."""
+    if address_col not in df.columns:
+        return df
+    out = df.copy(deep=False)
+    regions = extract_regions(out[address_col])
+    for c in regions.columns:
+        out[c] = regions[c]
+    return out
+
+# ---------------------------------------------------------------------
+# [4] 치안 표 조인 키
+# ---------------------------------------------------------------------
+@functools.lru_cache(maxsize=1024)
+def district_code_of(name):
+    """자치구 이름("중 구" 포함), 주소, 경찰서 이름("중부", "중부서")을 자치구 코드로 바꿉니다(없으면 None)."""
+    if not isinstance(name, str):
+        return None
+    code, _ = tokenize_address(name)
+    if code is not None:
+        return code
+    station = re.sub(r"\s+", "", name)
+    # "강서", "수서"처럼 이름이 '서'로 끝나는 경찰서가 있으므로 원래 이름을 먼저 찾음
+    gu = POLICE_STATION_DISTRICTS.get(station) or POLICE_STATION_DISTRICTS.get(re.sub(r"(경찰)?서$", "", station))
+    return SEOUL_DISTRICTS[gu] if gu else None
+
+
+def district_codes(s):
+    """키 컬럼 Series를 district_code(Int16) Series로 바꿉니다(표 하나당 한 번, 이후 조인은 정수 비교)."""
+    codes, uniques = pd.factorize(s)
+    mapped = pd.array([district_code_of(v) for v in uniques] + [None], dtype="Int16")
+    return pd.Series(mapped[np.where(codes < 0, len(uniques), codes)], index=s.index, name="district_code")
@@ -0,0 +1,190 @@
+# spatial_index.py | 위경도 점 공간 인덱스 (k-최근접 / 반경 질의)
+# =============================================================================
+# 기능 요약:
+# - SpatialIndex: 점을 단위 구 위의 3차원 좌표(x, y, z)로 바꾼 뒤 정육면체 격자 칸으로
+#   해시하여 칸별로 정렬해 둡니다. 질의는 기준점 주변 칸의 점만 꺼내 정확한 거리를 계산합니다.
+#   (경도 경계/극 근처에서도 왜곡이 없고, 외부 라이브러리 없이 NumPy만 사용)
+# - query_radius / knearest: 점 하나에 대한 반경 / k-최근접 질의
+# - knearest_many / count_within: 매물 전체 같은 대량 질의를 같은 칸끼리 묶어 행렬 연산으로 처리
+# - get_mart_index: martdata.csv(마트 데이터셋)에 대한 인덱스를 프로세스당 한 번만 만듭니다.
+#
+# 반환하는 위치(position)는 인덱스를 만들 때 넘긴 배열의 위치(iloc)입니다.
+# =============================================================================
+import functools
+
+import numpy as np
+
+from geo import EARTH_RADIUS_M, haversine_m
+from safety_data import get_dataset
+
+# 기본 격자 칸 크기 (미터)
+DEFAULT_CELL_M = 500.0
+
+# 칸 좌표를 키 하나(int64)로 묶을 때 축마다 쓰는 비트 수 (칸 크기 10m 이상이면 충분)
+_AXIS_BITS = 21
+_AXIS_OFFSET = 1 << (_AXIS_BITS - 1)
+
+
+# ---------------------------------------------------------------------
+# [1] 좌표 변환 헬퍼
+# ---------------------------------------------------------------------
+def unit_xyz(lats, lons):
+    """위경도 배열 -> 단위 구 위의 (N, 3) 좌표."""
+    lat = np.radians(np.asarray(lats, dtype=np.float64))
+    lon = np.radians(np.asarray(lons, dtype=np.float64))
+    cos_lat = np.cos(lat)
+    return np.column_stack([cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)])
+
+
+def _chord(meters):
+    """대원 거리(m) -> 단위 구 위의 직선(현) 거리."""
+    return 2 * np.sin(np.minimum(np.asarray(meters, dtype=np.float64) / (2 * EARTH_RADIUS_M), np.pi / 2))
+
+
+def _cell_keys(cells):
+    """(N, 3) 정수 칸 좌표 -> int64 키."""
+    c = cells.astype(np.int64) + _AXIS_OFFSET
+    return (c[:, 0] << (2 * _AXIS_BITS)) | (c[:, 1] << _AXIS_BITS) | c[:, 2]
+
+
+# ---------------------------------------------------------------------
+# [2] 인덱스
+# ---------------------------------------------------------------------
+class SpatialIndex:
+    """
+    위경도 점 집합에 대한 격자 해시 인덱스.
+    - 좌표가 결측인 점은 인덱스에 넣지 않습니다(질의 결과에 나오지 않음).
+    - cell_m: 격자 칸 크기(미터). 자주 쓰는 질의 반경과 비슷하게 두면 가장 빠릅니다.
+    """
+
+    def __init__(self, lats, lons, cell_m=DEFAULT_CELL_M):
+        if cell_m < 10:
+            raise ValueError("cell_m은 10m 이상이어야 합니다.")
+        self.lats = np.asarray(lats, dtype=np.float64)
+        self.lons = np.asarray(lons, dtype=np.float64)
+        self.cell_m = float(cell_m)
+        self.h = float(_chord(cell_m))
+
+        valid = np.flatnonzero(~(np.isnan(self.lats) | np.isnan(self.lons)))
+        keys = _cell_keys(np.floor(unit_xyz(self.lats[valid], self.lons[valid]) / self.h))
+        order = np.argsort(keys, kind="stable")
+        # 칸 키 순으로 정렬한 점 위치 + 칸별 [시작, 끝) 구간 (CSR 형식)
+        self.order = valid[order]
+        self.keys, starts = np.unique(keys[order], return_index=True)
+        self.starts = starts
+        self.ends = np.append(starts[1:], len(order))
+
+    def __len__(self):
+        return len(self.order)
+
+    # --- 후보 추리기 -------------------------------------------------
+    def _candidates(self, cell, span):
+        """칸 cell 주변 ±span칸 안의 점 위치 배열 (span이 크면 전체 점)."""
+        if (2 * span + 1) ** 3 >= 8 * len(self.keys):
+            return self.order
+        r = np.arange(-span, span + 1)
+        offsets = np.stack(np.meshgrid(r, r, r, indexing="ij"), axis=-1).reshape(-1, 3)
+        wanted = _cell_keys(cell + offsets)
+        i = np.searchsorted(self.keys, wanted)
+        found = i < len(self.keys)
+        i = i[found][self.keys[i[found]] == wanted[found]]
+        if len(i) == 0:
+            return self.order[:0]
+        return np.concatenate([self.order[s:e] for s, e in zip(self.starts[i], self.ends[i])])
+
+    def _cell_of(self, lats, lons):
+        return np.floor(unit_xyz(lats, lons) / self.h).astype(np.int64)
+
+    def _span_for(self, radius_m):
+        return max(1, int(np.ceil(_chord(radius_m) / self.h)))
+
+    # --- 단일 질의 ---------------------------------------------------
+    def query_radius(self, lat, lon, radius_m):
+        """(lat, lon)에서 radius_m 미터 안의 점 (위치, 거리) 배열을 가까운 순으로 반환합니다."""
+        cand = self._candidates(self._cell_of([lat], [lon])[0], self._span_for(radius_m))
+        d = haversine_m(lat, lon, self.lats[cand], self.lons[cand])
+        keep = d <= radius_m
+        cand, d = cand[keep], d[keep]
+        order = np.argsort(d, kind="stable")
+        return cand[order], d[order]
+
+    def knearest(self, lat, lon, k=1):
+        """(lat, lon)에서 가장 가까운 k개 점의 (위치, 거리) 배열을 가까운 순으로 반환합니다."""
+        pos, dist = self.knearest_many([lat], [lon], k)
+        keep = pos[0] >= 0
+        return pos[0][keep], dist[0][keep]
+
+    # --- 대량 질의 ---------------------------------------------------
+    def _group_by_cell(self, lats, lons):
+        """질의 점을 칸별로 묶어 (칸 좌표, 그 칸에 속한 질의 위치) 목록을 만듭니다."""
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        ok = np.flatnonzero(~(np.isnan(lats) | np.isnan(lons)))
+        cells = self._cell_of(lats[ok], lons[ok])
+        keys = _cell_keys(cells)
+        order = np.argsort(keys, kind="stable")
+        _, first, counts = np.unique(keys[order], return_index=True, return_counts=True)
+        for f, c in zip(first, counts):
+            yield cells[order[f]], ok[order[f:f + c]]
+
+    def knearest_many(self, lats, lons, k=1):
+        """
+        질의 점마다 가장 가까운 k개 점을 찾아 (위치 (M, k), 거리 (M, k))를 반환합니다.
+        - 점이 k개보다 적거나 질의 좌표가 결측이면 남는 칸은 위치 -1, 거리 NaN
+        - 같은 칸의 질의는 후보를 한 번만 모아 (질의 수 x 후보 수) 거리 행렬로 계산하고,
+          k번째 거리가 탐색 범위 안에 들 때까지 범위를 두 배씩 넓힙니다.
+        """
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        out_pos = np.full((len(lats), k), -1, dtype=np.int64)
+        out_dist = np.full((len(lats), k), np.nan)
+        if len(self) == 0 or k <= 0:
+            return out_pos, out_dist
+        for cell, q in self._group_by_cell(lats, lons):
+            span = 1
+            while True:
+                cand = self._candidates(cell, span)
+                d = haversine_m(lats[q, None], lons[q, None], self.lats[cand], self.lons[cand])
+                kk = min(k, len(cand))
+                everything = len(cand) == len(self)
+                if kk > 0:
+                    if kk < len(cand):
+                        part = np.argpartition(d, kk - 1, axis=1)[:, :kk]
+                    else:
+                        part = np.broadcast_to(np.arange(kk), d.shape)
+                    dk = np.take_along_axis(d, part, axis=1)
+                    # 질의 점이 칸 안 어디에 있든 ±span칸 창은 (span x 칸 크기) 반경을 모두 덮음
+                    if everything or (kk == k and (_chord(dk.max(axis=1)) <= span * self.h).all()):
+                        srt = np.argsort(dk, axis=1, kind="stable")
+                        out_pos[q, :kk] = cand[np.take_along_axis(part, srt, axis=1)]
+                        out_dist[q, :kk] = np.take_along_axis(dk, srt, axis=1)
+                        break
+                elif everything:
+                    break
+                span *= 2
+        return out_pos, out_dist
+
+    def count_within(self, lats, lons, radii_m):
+        """질의 점마다 반경 radii_m(여러 개 가능) 안의 점 개수를 (M, 반경 수) int32 배열로 반환합니다."""
+        radii = np.atleast_1d(np.asarray(radii_m, dtype=np.float64))
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        out = np.zeros((len(lats), len(radii)), dtype=np.int32)
+        if len(self) == 0:
+            return out
+        span = self._span_for(radii.max())
+        for cell, q in self._group_by_cell(lats, lons):
+            cand = self._candidates(cell, span)
+            d = haversine_m(lats[q, None], lons[q, None], self.lats[cand], self.lons[cand])
+            out[q] = (d[:, :, None] <= radii).sum(axis=1)
+        return out
+
+
+# ---------------------------------------------------------------------
+# [3] 마트 인덱스
+# ---------------------------------------------------------------------
+@functools.lru_cache(maxsize=None)
+def get_mart_index(source, cell_m=DEFAULT_CELL_M):
+    """마트 데이터셋(get_dataset(source, "mart").frame)의 공간 인덱스를 프로세스당 한 번만 만듭니다."""
+    frame = get_dataset(source, "mart").frame
+    return SpatialIndex(frame["latitude"].to_numpy(), frame["longitude"].to_numpy(), cell_m)